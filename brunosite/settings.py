@@ -51,6 +51,7 @@ JAZZMIN_SETTINGS = {
         "auth.user": "fas fa-user",
         "auth.Group": "fas fa-users",
         "health.DailyEntry": "fas fa-calendar-day",
+        "health.DailyEntryRollup": "fas fa-table",
         "health.Medication": "fas fa-pills",
         "health.MedicationDose": "fas fa-syringe",
         "health.LymphNodeMeasurement": "fas fa-ruler",
@@ -138,6 +139,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "health.middleware.DogOnboardingMiddleware",
 ]
 
 ROOT_URLCONF = "brunosite.urls"
@@ -153,6 +155,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "django.template.context_processors.i18n",
+                "health.context_processors.dogs",
             ],
         },
     },
@@ -175,10 +178,43 @@ if DATABASE_URL:
         }
     }
 else:
+    # Writers take the lock when their transaction begins and wait up to
+    # 20 seconds for it, instead of failing with "database is locked" when
+    # a read lock has to be upgraded mid-transaction. Tests use a file as
+    # well: SQLite's shared-cache in-memory database reports contention
+    # immediately instead of waiting.
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": str(BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {
+                "transaction_mode": "IMMEDIATE",
+                "timeout": 20,
+                "init_command": "PRAGMA journal_mode=WAL;",
+            },
+            "TEST": {"NAME": str(BASE_DIR / "test_db.sqlite3")},
+        }
+    }
+
+# Cached payloads and the per-dog generation counters (health.caching)
+# must be shared by every worker and by management commands, or a bump in
+# one process never reaches the others and they serve stale pages until
+# the entries expire. Docker runs Redis; without REDIS_URL the cache lives
+# in the database (`python manage.py createcachetable`).
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "health_cache",
         }
     }
 
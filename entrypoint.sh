@@ -9,6 +9,9 @@ done
 echo "Running migrations..."
 python manage.py migrate --noinput
 
+# Only needed when the cache lives in the database (no REDIS_URL)
+python manage.py createcachetable
+
 echo "Loading food database..."
 python manage.py loaddata foods --verbosity=1 2>/dev/null || echo "Foods fixture already loaded or not found"
 
@@ -21,8 +24,17 @@ if not User.objects.filter(username='nestor').exists():
 if not User.objects.filter(username='alberto').exists():
     User.objects.create_user('alberto', password='helpbruno')
     print('Created user: alberto')
+from health.models import DogProfile
+nestor = User.objects.get(username='nestor')
+bruno = DogProfile.objects.filter(user=nestor).first() or DogProfile.objects.create(user=nestor, name='Bruno', weight_kg=22)
+bruno.caregivers.add(User.objects.get(username='alberto'))
 print('Users ready')
 EOF
 
-echo "Starting server..."
+# SERVER_MODE=asgi runs Uvicorn workers so streaming responses don't each
+# hold a worker; the views are sync either way. wsgi keeps the sync workers
+echo "Starting server (${SERVER_MODE:-wsgi})..."
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    exec gunicorn --bind 0.0.0.0:8000 --worker-class uvicorn_worker.UvicornWorker brunosite.asgi:application
+fi
 exec gunicorn --bind 0.0.0.0:8000 brunosite.wsgi:application
@@ -0,0 +1,130 @@
+"""
+Medication adherence per day and per week: expected doses against doses logged.
+
+Expected doses come from each medication's frequency (one slot per hour
+in Medication.SLOT_HOURS) on every day it was scheduled. That is from the
+day after it was added, or from its first logged dose if earlier, so the
+day it was added is not counted as missed. It runs up to today, or up to
+its last logged dose once it is inactive, since no stop date is recorded.
+As-needed medications have no slots and are left out.
+
+Logged doses are read from the stored MedicationAdherence rows, one per
+medication and day with doses, so a window of months is a single query
+however many doses it holds. cached_adherence() keeps the result per dog,
+window and day under the dog's cache generation (see health.caching).
+"""
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .caching import generation
+from .models import DailyEntryRollup, Medication, MedicationAdherence
+
+DEFAULT_DAYS = 91
+ADHERENCE_TIMEOUT = 60 * 60 * 24
+
+
+def parse_medication(value):
+    """The ?medication= id, or None for all medications, raising ValueError if not an id."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('medication must be a medication id')
+
+
+def scheduled_days(medication, today):
+    """
+    (first, last) day the medication had expected doses, or None. The
+    medication needs first_dose and last_dose annotations (local dates).
+    """
+    if not medication.slot_hours:
+        return None
+    first = timezone.localtime(medication.created_at).date() + timedelta(days=1)
+    if medication.first_dose and medication.first_dose < first:
+        first = medication.first_dose
+    last = today if medication.active else medication.last_dose
+    if last is None or last < first:
+        return None
+    return first, last
+
+
+def _cell(expected, taken, on_time):
+    return {
+        'expected': expected,
+        'taken': taken,
+        'on_time': on_time,
+        'adherence': round(taken / expected * 100) if expected else None,
+    }
+
+
+def adherence(dog, days, today=None, medication_id=None):
+    """
+    Expected, taken and on-time doses with the percentage taken, per day
+    (oldest first) and per week (from Monday) over the days up to today.
+    """
+    today = today or date.today()
+    start = today - timedelta(days=days - 1)
+    medications = Medication.objects.for_dog(dog).annotate(
+        first_dose=Min('adherence__date'), last_dose=Max('adherence__date'),
+    ).order_by('name')
+    if medication_id is not None:
+        medications = medications.filter(pk=medication_id)
+        if not medications:
+            raise ValueError('Unknown medication')
+
+    totals = {start + timedelta(days=i): [0, 0, 0] for i in range(days)}
+    spans = {}
+    scheduled = []
+    for medication in medications:
+        span = scheduled_days(medication, today)
+        if span is None:
+            continue
+        spans[medication.pk] = span
+        scheduled.append({
+            'id': medication.pk,
+            'name': medication.name,
+            'frequency': medication.frequency,
+            'slots': len(medication.slot_hours),
+        })
+        day = max(span[0], start)
+        while day <= span[1]:
+            totals[day][0] += len(medication.slot_hours)
+            day += timedelta(days=1)
+
+    rows = MedicationAdherence.objects.filter(
+        medication_id__in=spans, date__gte=start, date__lte=today
+    ).values_list('medication_id', 'date', 'taken', 'on_time')
+    for medication_id, day, taken, on_time in rows:
+        first, last = spans[medication_id]
+        if first <= day <= last:
+            totals[day][1] += taken
+            totals[day][2] += on_time
+
+    weeks = {}
+    for day, counts in totals.items():
+        week = weeks.setdefault(DailyEntryRollup.period_start('week', day), [0, 0, 0])
+        for i, count in enumerate(counts):
+            week[i] += count
+    return {
+        'start': start.isoformat(),
+        'end': today.isoformat(),
+        'medications': scheduled,
+        'heatmap': [{'date': day.isoformat(), **_cell(*counts)} for day, counts in totals.items()],
+        'weeks': [{'start': week.isoformat(), **_cell(*counts)} for week, counts in weeks.items()],
+        'total': _cell(*(sum(counts[i] for counts in totals.values()) for i in range(3))),
+    }
+
+
+def cached_adherence(dog, days, today=None, medication_id=None):
+    """adherence(), rebuilt only after the dog's records change or the day turns."""
+    today = today or date.today()
+    key = f'adherence:{dog.pk}:{medication_id or "all"}:{days}:{today.isoformat()}:{generation(dog.pk)}'
+    result = cache.get(key)
+    if result is None:
+        result = adherence(dog, days, today, medication_id)
+        cache.set(key, result, ADHERENCE_TIMEOUT)
+    return result
@@ -1,47 +1,116 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.shortcuts import redirect, render
+from django.urls import path
+
+from .imports import import_rows, read_rows
 from .models import (
-    DailyEntry, Medication, MedicationDose, LymphNodeMeasurement,
+    DailyEntry, DailyEntryRollup, Medication, MedicationAdherence, MedicationDose, LymphNodeMeasurement,
     CBPIAssessment, CORQAssessment, VCOGCTCAEEvent, TreatmentSession,
     DogProfile, Food, Meal, MealItem, SupplementDose, DailyNutritionSummary,
     SiteSettings, MedicalRecord, LabValue,
-    Provider, TimelineEntry, TimelineAttachment
+    Provider, TimelineEntry, TimelineAttachment, AssessmentSchedule
 )
 
 
+class HistoryImportForm(forms.Form):
+    file = forms.FileField(help_text='CSV or XLSX with a header row naming the fields')
+    kind = forms.ChoiceField(choices=[('entries', 'Daily entries'), ('nodes', 'Lymph node measurements')])
+    dog = forms.ModelChoiceField(queryset=DogProfile.objects.none())
+    overwrite = forms.BooleanField(required=False, help_text='Replace days already recorded')
+
+    def __init__(self, *args, user, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only the dogs the importing user owns or cares for
+        self.fields['dog'].queryset = DogProfile.objects.for_user(user).order_by('pk')
+
+
 @admin.register(DailyEntry)
 class DailyEntryAdmin(admin.ModelAdmin):
-    list_display = ['date', 'good_day', 'happiness_score', 'overall_score', 'user']
-    list_filter = ['good_day', 'date']
+    list_display = ['date', 'dog', 'good_day', 'happiness_score', 'overall_score', 'user']
+    list_filter = ['dog', 'good_day', 'date']
     date_hierarchy = 'date'
+    change_list_template = 'admin/health/dailyentry/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='health_dailyentry_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        """Upload a spreadsheet of historical entries or node measurements."""
+        if not self.has_add_permission(request):
+            return redirect('admin:health_dailyentry_changelist')
+        form = HistoryImportForm(request.POST or None, request.FILES or None, user=request.user)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            kind = form.cleaned_data['kind']
+            try:
+                result = import_rows(
+                    kind, read_rows(upload, upload.name), form.cleaned_data['dog'], request.user,
+                    overwrite=form.cleaned_data['overwrite'],
+                )
+            except ValueError as e:
+                form.add_error('file', str(e))
+            else:
+                self.message_user(request, (
+                    f"Imported {kind}: {result['created']} created, {result['updated']} updated, "
+                    f"{result['skipped']} skipped, {len(result['errors'])} invalid"
+                ))
+                for line, message in result['errors'][:20]:
+                    self.message_user(request, f'Line {line}: {message}', messages.WARNING)
+                return redirect('admin:health_dailyentry_changelist')
+        return render(request, 'admin/health/dailyentry/import.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import history',
+            'form': form,
+        })
+
+
+@admin.register(DailyEntryRollup)
+class DailyEntryRollupAdmin(admin.ModelAdmin):
+    list_display = ['dog', 'period', 'start', 'entries_count', 'good_days', 'mixed_days', 'bad_days', 'updated_at']
+    list_filter = ['dog', 'period']
+    date_hierarchy = 'start'
+    readonly_fields = [f.name for f in DailyEntryRollup._meta.fields]
 
 
 @admin.register(Medication)
 class MedicationAdmin(admin.ModelAdmin):
     list_display = ['name', 'dosage', 'frequency', 'active']
-    list_filter = ['active', 'frequency']
+    list_filter = ['dog', 'active', 'frequency']
 
 
 @admin.register(MedicationDose)
 class MedicationDoseAdmin(admin.ModelAdmin):
     list_display = ['medication', 'given_at', 'user']
-    list_filter = ['medication', 'given_at']
+    list_filter = ['medication__dog', 'medication', 'given_at']
+
+
+@admin.register(MedicationAdherence)
+class MedicationAdherenceAdmin(admin.ModelAdmin):
+    list_display = ['medication', 'date', 'doses', 'taken', 'on_time', 'updated_at']
+    list_filter = ['dog', 'medication']
+    date_hierarchy = 'date'
+    readonly_fields = [f.name for f in MedicationAdherence._meta.fields]
 
 
 @admin.register(LymphNodeMeasurement)
 class LymphNodeMeasurementAdmin(admin.ModelAdmin):
     list_display = ['date', 'source', 'status', 'mandibular_left', 'mandibular_right', 'popliteal_left', 'popliteal_right']
-    list_filter = ['source', 'status', 'date']
+    list_filter = ['dog', 'source', 'status', 'date']
     date_hierarchy = 'date'
 
 
 @admin.register(CBPIAssessment)
 class CBPIAssessmentAdmin(admin.ModelAdmin):
     list_display = ['date', 'source', 'pain_severity_score', 'pain_interference_score', 'overall_quality_of_life', 'user']
-    list_filter = ['source', 'overall_quality_of_life', 'date']
+    list_filter = ['dog', 'source', 'overall_quality_of_life', 'date']
     date_hierarchy = 'date'
     fieldsets = (
         ('Assessment Info', {
-            'fields': ('user', 'date', 'source')
+            'fields': ('dog', 'user', 'date', 'source')
         }),
         ('Pain Severity (0-10, 0=no pain)', {
             'fields': ('worst_pain', 'least_pain', 'average_pain', 'current_pain')
@@ -59,11 +128,11 @@ class CBPIAssessmentAdmin(admin.ModelAdmin):
 @admin.register(CORQAssessment)
 class CORQAssessmentAdmin(admin.ModelAdmin):
     list_display = ['date', 'source', 'vitality_score', 'companionship_score', 'pain_score', 'mobility_score', 'total_score', 'global_qol']
-    list_filter = ['source', 'date']
+    list_filter = ['dog', 'source', 'date']
     date_hierarchy = 'date'
     fieldsets = (
         ('Assessment Info', {
-            'fields': ('user', 'date', 'source')
+            'fields': ('dog', 'user', 'date', 'source')
         }),
         ('Vitality (1-5, higher=better)', {
             'fields': ('energy_level', 'playfulness', 'interest_in_surroundings', 'appetite')
@@ -86,11 +155,11 @@ class CORQAssessmentAdmin(admin.ModelAdmin):
 @admin.register(VCOGCTCAEEvent)
 class VCOGCTCAEEventAdmin(admin.ModelAdmin):
     list_display = ['date', 'source', 'category', 'event', 'grade', 'resolved', 'user']
-    list_filter = ['source', 'category', 'grade', 'resolved', 'date']
+    list_filter = ['dog', 'source', 'category', 'grade', 'resolved', 'date']
     date_hierarchy = 'date'
     fieldsets = (
         ('Event Info', {
-            'fields': ('user', 'date', 'source', 'category', 'event', 'grade')
+            'fields': ('dog', 'user', 'date', 'source', 'category', 'event', 'grade')
         }),
         ('Treatment Context', {
             'fields': ('treatment',)
@@ -104,18 +173,19 @@ class VCOGCTCAEEventAdmin(admin.ModelAdmin):
 @admin.register(TreatmentSession)
 class TreatmentSessionAdmin(admin.ModelAdmin):
     list_display = ['date', 'source', 'treatment_type', 'protocol', 'agent', 'cycle_number', 'user']
-    list_filter = ['source', 'treatment_type', 'protocol', 'date']
+    list_filter = ['dog', 'source', 'treatment_type', 'protocol', 'date']
     date_hierarchy = 'date'
 
 
 @admin.register(DogProfile)
 class DogProfileAdmin(admin.ModelAdmin):
     list_display = ['name', 'weight_kg', 'target_weight_kg', 'user', 'updated_at']
+    filter_horizontal = ['caregivers']
     readonly_fields = ['daily_food_min_g', 'daily_food_max_g', 'daily_calcium_min_mg',
                       'daily_calcium_max_mg', 'daily_omega3_min_mg', 'daily_omega3_max_mg']
     fieldsets = (
         ('Profile', {
-            'fields': ('user', 'name', 'weight_kg', 'target_weight_kg')
+            'fields': ('user', 'caregivers', 'name', 'weight_kg', 'target_weight_kg')
         }),
         ('Calculated Daily Targets', {
             'fields': ('daily_food_min_g', 'daily_food_max_g',
@@ -156,7 +226,7 @@ class MealItemInline(admin.TabularInline):
 @admin.register(Meal)
 class MealAdmin(admin.ModelAdmin):
     list_display = ['date', 'meal_type', 'time', 'appetite', 'total_grams', 'user']
-    list_filter = ['meal_type', 'appetite', 'date']
+    list_filter = ['dog', 'meal_type', 'appetite', 'date']
     date_hierarchy = 'date'
     inlines = [MealItemInline]
 
@@ -164,7 +234,7 @@ class MealAdmin(admin.ModelAdmin):
 @admin.register(SupplementDose)
 class SupplementDoseAdmin(admin.ModelAdmin):
     list_display = ['date', 'supplement_type', 'product_name', 'dose_amount', 'user']
-    list_filter = ['supplement_type', 'date']
+    list_filter = ['dog', 'supplement_type', 'date']
     date_hierarchy = 'date'
 
 
@@ -172,11 +242,11 @@ class SupplementDoseAdmin(admin.ModelAdmin):
 class DailyNutritionSummaryAdmin(admin.ModelAdmin):
     list_display = ['date', 'total_food_g', 'total_protein_g', 'total_fat_g', 'total_carbs_g',
                    'total_calcium_mg', 'total_omega3_mg', 'multivitamin_given']
-    list_filter = ['carbs_warning', 'calcium_low', 'omega3_low', 'date']
+    list_filter = ['dog', 'carbs_warning', 'calcium_low', 'omega3_low', 'date']
     date_hierarchy = 'date'
     fieldsets = (
         ('Date & User', {
-            'fields': ('user', 'date')
+            'fields': ('dog', 'user', 'date')
         }),
         ('Food Totals', {
             'fields': ('total_food_g', 'total_protein_g', 'total_fat_g', 'total_carbs_g', 'meals_count')
@@ -217,13 +287,13 @@ class LabValueInline(admin.TabularInline):
 @admin.register(MedicalRecord)
 class MedicalRecordAdmin(admin.ModelAdmin):
     list_display = ['date', 'record_type', 'source', 'title', 'clinic_name', 'ai_parsed', 'user']
-    list_filter = ['record_type', 'source', 'ai_parsed', 'date']
+    list_filter = ['dog', 'record_type', 'source', 'ai_parsed', 'date']
     date_hierarchy = 'date'
     search_fields = ['title', 'clinic_name', 'veterinarian']
     inlines = [LabValueInline]
     fieldsets = (
         ('Record Info', {
-            'fields': ('user', 'date', 'record_type', 'title', 'file')
+            'fields': ('dog', 'user', 'date', 'record_type', 'title', 'file')
         }),
         ('Source', {
             'fields': ('source', 'clinic_name', 'veterinarian')
@@ -242,12 +312,12 @@ class MedicalRecordAdmin(admin.ModelAdmin):
 @admin.register(LabValue)
 class LabValueAdmin(admin.ModelAdmin):
     list_display = ['date', 'test_name', 'value', 'unit', 'is_abnormal', 'is_critical', 'source', 'user']
-    list_filter = ['test_name', 'is_abnormal', 'is_critical', 'source', 'date']
+    list_filter = ['dog', 'test_name', 'is_abnormal', 'is_critical', 'source', 'date']
     date_hierarchy = 'date'
     search_fields = ['test_name', 'custom_test_name']
     fieldsets = (
         ('Basic Info', {
-            'fields': ('user', 'medical_record', 'date', 'source')
+            'fields': ('dog', 'user', 'medical_record', 'date', 'source')
         }),
         ('Test Results', {
             'fields': ('test_name', 'custom_test_name', 'value', 'unit')
@@ -298,13 +368,13 @@ class ProviderAdmin(admin.ModelAdmin):
 @admin.register(TimelineEntry)
 class TimelineEntryAdmin(admin.ModelAdmin):
     list_display = ['date', 'time', 'entry_type', 'title', 'provider', 'bruno_mood', 'user']
-    list_filter = ['entry_type', 'bruno_mood', 'provider', 'date']
+    list_filter = ['dog', 'entry_type', 'bruno_mood', 'provider', 'date']
     date_hierarchy = 'date'
     search_fields = ['title', 'content', 'tags']
     inlines = [TimelineAttachmentInline]
     fieldsets = (
         ('When', {
-            'fields': ('user', 'date', 'time')
+            'fields': ('dog', 'user', 'date', 'time')
         }),
         ('What', {
             'fields': ('entry_type', 'title', 'content')
@@ -320,3 +390,11 @@ class TimelineAttachmentAdmin(admin.ModelAdmin):
     list_display = ['timeline_entry', 'file_type', 'title', 'uploaded_at']
     list_filter = ['file_type', 'uploaded_at']
     search_fields = ['title', 'description']
+
+
+@admin.register(AssessmentSchedule)
+class AssessmentScheduleAdmin(admin.ModelAdmin):
+    list_display = ['dog', 'instrument', 'cadence_days', 'last_done', 'next_due']
+    list_editable = ['cadence_days']
+    list_filter = ['instrument', 'dog']
+    date_hierarchy = 'next_due'
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class HealthConfig(AppConfig):
     name = "health"
+
+    def ready(self):
+        from . import signals  # noqa: F401
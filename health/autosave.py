@@ -0,0 +1,94 @@
+"""
+Field-level autosave for the daily tracker.
+
+Each star tap sends only the changed field. Changes from one user are
+merged in the cache and written to the database once per coalescing
+window, or when the client asks for a flush (idle timer, page hide).
+
+Queueing and flushing hold a per-batch lock taken with cache.add(), which
+is atomic on every backend, so two quick taps cannot overwrite each
+other's merge and a change queued during a flush lands in the next batch
+instead of being deleted with the current one. The batch lives in the
+shared cache (see settings.CACHES), so other workers see it and it
+survives a restart.
+
+A request gives up with TimeoutError after LOCK_WAIT seconds rather than
+hang when the cache keeps refusing the lock. Each holder stores its own
+token in the lock and only deletes a lock still holding it, so a flush
+that outlived LOCK_TIMEOUT does not release the next holder's lock.
+"""
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+from .models import DailyEntry
+
+# Seconds a batch of pending changes may wait before it is written
+COALESCE_WINDOW = 5
+
+# Pending changes are kept at most this long if nothing flushes them
+PENDING_TIMEOUT = 60 * 60 * 24
+
+# A lock left by a crashed request expires after this many seconds
+LOCK_TIMEOUT = 10
+LOCK_POLL = 0.01
+# Longest a request waits for the lock; past LOCK_TIMEOUT so an expired lock is reclaimed
+LOCK_WAIT = LOCK_TIMEOUT + 2
+
+
+def _pending_key(dog, user, entry_date):
+    return f'tracker-pending:{dog.pk}:{user.pk}:{entry_date.isoformat()}'
+
+
+@contextmanager
+def _locked(key):
+    lock = f'{key}:lock'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(lock, token, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f'Could not lock {key} within {LOCK_WAIT} seconds')
+        time.sleep(LOCK_POLL)
+    try:
+        yield
+    finally:
+        if cache.get(lock) == token:
+            cache.delete(lock)
+
+
+def queue_changes(dog, user, entry_date, values):
+    """
+    Merge values into the user's pending changes to the dog's entry for
+    entry_date.
+
+    Returns True once the oldest pending change is older than
+    COALESCE_WINDOW, meaning the caller should flush.
+    """
+    key = _pending_key(dog, user, entry_date)
+    now = time.time()
+    with _locked(key):
+        pending = cache.get(key) or {'since': now, 'values': {}}
+        pending['values'].update(values)
+        cache.set(key, pending, PENDING_TIMEOUT)
+    return now - pending['since'] >= COALESCE_WINDOW
+
+
+def flush_changes(dog, user, entry_date):
+    """
+    Write the user's pending changes to the dog's entry for entry_date,
+    touching only the changed columns. Returns the entry, or None if
+    nothing was pending.
+    """
+    key = _pending_key(dog, user, entry_date)
+    # The write stays under the lock so flushes reach the database in the
+    # order their changes were queued
+    with _locked(key):
+        pending = cache.get(key)
+        if not pending:
+            return None
+        cache.delete(key)
+        if not pending['values']:
+            return None
+        return DailyEntry.upsert(dog, entry_date, user, pending['values'])
@@ -0,0 +1,45 @@
+"""
+Cache generations for payloads cached per dog.
+
+Cached values are stored under a key that includes the dog's current
+generation. Writes to the dog's records bump the generation once their
+transaction commits, so stale copies are never read again and simply
+expire; no cache keys need to be tracked or deleted.
+
+table_state() is the cheaper validator the polled JSON endpoints use for
+conditional GETs: the newest timestamp and row count of the rows a
+response is built from, read with one aggregate query.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+
+
+def _generation_key(dog_id):
+    return f'dog-generation:{dog_id}'
+
+
+def generation(dog_id):
+    """The dog's current cache generation."""
+    return cache.get_or_set(_generation_key(dog_id), time.time_ns, None)
+
+
+def bump_generation(dog_id):
+    """Invalidate everything cached for the dog once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(_generation_key(dog_id), time.time_ns(), None))
+
+
+def table_state(queryset, *fields):
+    """
+    (latest, count) for the queryset: the newest value of its timestamp
+    fields (updated_at by default, may span to-one relations) and its
+    row count, in one aggregate query.
+    """
+    fields = fields or ('updated_at',)
+    state = queryset.order_by().aggregate(
+        count=Count('pk'), **{f'latest_{i}': Max(field) for i, field in enumerate(fields)}
+    )
+    count = state.pop('count')
+    return max((value for value in state.values() if value is not None), default=None), count
@@ -0,0 +1,38 @@
+"""
+Category sub-scores over a date range.
+
+The categories are declared once in DailyEntry.CATEGORY_FIELDS. A range
+is computed in a single pass over one values_list query of the rating
+columns, so no model instances are built however many days are asked for.
+"""
+from .models import DailyEntry, _mean
+
+# Trend windows the category API serves, in days
+TREND_DAYS = (30, 90, 365)
+
+
+def category_series(dog, start, end):
+    """
+    Daily category scores for the dog's entries from start to end inclusive.
+
+    Returns {'dates': [...], 'overall': [...], <category>: [...]} with one
+    value per entry (None where no rating in the category was given), and
+    'averages' holding each category's mean over the range.
+    """
+    columns = [f for fields in DailyEntry.CATEGORY_FIELDS.values() for f in fields]
+    rows = DailyEntry.objects.for_dog(dog).filter(
+        date__range=(start, end)
+    ).order_by('date').values_list('date', 'overall_score', *columns)
+
+    series = {'dates': [], 'overall': []}
+    series.update((category, []) for category in DailyEntry.CATEGORY_FIELDS)
+    for day, overall, *ratings in rows:
+        series['dates'].append(day.isoformat())
+        series['overall'].append(overall)
+        for category, score in DailyEntry.category_averages(dict(zip(columns, ratings))).items():
+            series[category].append(score)
+
+    series['averages'] = {
+        category: _mean(values) for category, values in series.items() if category != 'dates'
+    }
+    return series
@@ -0,0 +1,257 @@
+"""
+Date-aligned chart series for api_chart_data's batch mode.
+
+?types=daily,nodes,cbpi,corq&days=90 returns every requested series in
+one response: a shared, sorted date axis plus one column per series
+value, with null where a series has no reading on that date. All series
+are read over the same date window, one values_list query each; CBPI
+and CORQ scores come from their stored columns.
+
+chart_data() builds the single-chart ?type= payloads. event_counts()
+serves ?type=events from a single GROUP BY over period, category, event
+and grade, so the query count does not grow with the VCOG-CTCAE choice
+lists.
+
+Both take a resolution from health.resampling: long spans are bucketed
+by week or month and line series are capped at MAX_POINTS points.
+"""
+from datetime import timedelta
+
+from django.db.models import Count
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import CBPIAssessment, CORQAssessment, DailyEntry, LymphNodeMeasurement, VCOGCTCAEEvent
+from .resampling import MAX_POINTS, bucket, bucket_columns, label, lttb, period_start, thin
+
+
+def _daily(dog, start_date):
+    rows = DailyEntry.objects.for_dog(dog).filter(
+        date__gte=start_date
+    ).values_list('date', 'happiness_score', 'overall_score')
+    return {day: {'happiness': happiness, 'overall': overall} for day, happiness, overall in rows}
+
+
+def _nodes(dog, start_date):
+    """One measurement per date; a clinic reading is preferred to a home one."""
+    rows = LymphNodeMeasurement.objects.for_dog(dog).filter(
+        date__gte=start_date
+    ).order_by('date', 'source').values_list('date', *LymphNodeMeasurement.NODE_FIELDS)
+    values = {}
+    for day, *sizes in rows:
+        values.setdefault(day, {
+            field: float(size) if size is not None else None
+            for field, size in zip(LymphNodeMeasurement.NODE_FIELDS, sizes)
+        })
+    return values
+
+
+# Stored score column of each CBPI and CORQ chart column
+CBPI_COLUMNS = {'severity': 'pain_severity_score', 'interference': 'pain_interference_score'}
+CORQ_COLUMNS = {
+    'vitality': 'vitality_score',
+    'companionship': 'companionship_score',
+    'pain': 'pain_score',
+    'mobility': 'mobility_score',
+    'total': 'total_score',
+}
+
+
+def _scores(model, columns, dog, start_date):
+    """The stored scores by date; the latest assessment of a date wins."""
+    rows = model.objects.for_dog(dog).filter(
+        date__gte=start_date
+    ).order_by('date', 'created_at').values_list('date', *columns.values())
+    return {day: dict(zip(columns, scores)) for day, *scores in rows}
+
+
+def _cbpi(dog, start_date):
+    return _scores(CBPIAssessment, CBPI_COLUMNS, dog, start_date)
+
+
+def _corq(dog, start_date):
+    return _scores(CORQAssessment, CORQ_COLUMNS, dog, start_date)
+
+
+# type: (loader returning {date: {column: value}}, columns)
+SERIES = {
+    'daily': (_daily, ['happiness', 'overall']),
+    'nodes': (_nodes, LymphNodeMeasurement.NODE_FIELDS),
+    'cbpi': (_cbpi, list(CBPI_COLUMNS)),
+    'corq': (_corq, list(CORQ_COLUMNS)),
+}
+
+# Column LTTB judges a thinned series by; others use each point's largest value
+THIN_KEYS = {'daily': 'overall', 'cbpi': 'severity', 'corq': 'total'}
+
+
+# type: model each chart is read from, for the endpoint's validator
+MODELS = {
+    'daily': DailyEntry,
+    'nodes': LymphNodeMeasurement,
+    'cbpi': CBPIAssessment,
+    'corq': CORQAssessment,
+    'events': VCOGCTCAEEvent,
+}
+
+
+def window(dog, chart_type, start_date):
+    """The rows a chart of chart_type is built from."""
+    return MODELS[chart_type].objects.for_dog(dog).filter(date__gte=start_date)
+
+
+def parse_types(value):
+    """Series names from a comma-separated ?types= value, raising ValueError if unknown."""
+    types = [t.strip() for t in value.split(',') if t.strip()]
+    unknown = [t for t in types if t not in SERIES]
+    if not types or unknown:
+        raise ValueError(f'types must be a comma-separated list of {", ".join(SERIES)}')
+    return list(dict.fromkeys(types))
+
+
+def series_table(dog, types, start_date, resolution='day'):
+    """
+    {'dates': [...], 'labels': [...], 'series': {type: {column: [...]}}}
+    for the dog's readings from start_date on, bucketed to resolution.
+    Only when the shared date axis would run past MAX_POINTS is each
+    series thinned to its share of it.
+    """
+    loaded = {t: bucket(SERIES[t][0](dog, start_date), SERIES[t][1], resolution) for t in types}
+    if len(set().union(*loaded.values())) > MAX_POINTS:
+        loaded = {t: thin(values, THIN_KEYS.get(t), MAX_POINTS // len(types)) for t, values in loaded.items()}
+    dates = sorted(set().union(*loaded.values()))
+    return {
+        'dates': [d.isoformat() for d in dates],
+        'labels': [label(d, resolution) for d in dates],
+        'resolution': resolution,
+        'series': {
+            t: {
+                column: [loaded[t].get(d, {}).get(column) for d in dates]
+                for column in bucket_columns(SERIES[t][1], resolution)
+            }
+            for t in types
+        },
+    }
+
+
+def event_counts(dog, start_date, today, resolution='week'):
+    """
+    Adverse event counts from start_date on: totals per grade and category,
+    an event x grade matrix and counts per week (starting on Monday) or,
+    at month resolution, per month, empty periods included.
+    """
+    grades = [grade for grade, _ in VCOGCTCAEEvent.GRADE_CHOICES]
+    grade_counts = {f'grade_{grade}': 0 for grade in grades}
+    category_counts = {category: 0 for category, _ in VCOGCTCAEEvent.CATEGORY_CHOICES}
+    matrix = {}
+    periods = {}
+    start = period_start(start_date, resolution)
+    while start <= today:
+        periods[start] = dict.fromkeys(grades, 0)
+        start = period_start(start + timedelta(days=31 if resolution == 'month' else 7), resolution)
+
+    trunc = TruncMonth if resolution == 'month' else TruncWeek
+    rows = window(dog, 'events', start_date).values(
+        'category', 'event', 'grade', period=trunc('date')
+    ).annotate(count=Count('pk')).order_by()
+    for row in rows:
+        count = row['count']
+        grade_counts[f"grade_{row['grade']}"] = grade_counts.get(f"grade_{row['grade']}", 0) + count
+        category_counts[row['category']] = category_counts.get(row['category'], 0) + count
+        matrix.setdefault(row['event'], dict.fromkeys(grades, 0))[row['grade']] += count
+        periods.setdefault(row['period'], dict.fromkeys(grades, 0))[row['grade']] += count
+
+    labels = dict(VCOGCTCAEEvent.EVENT_CHOICES)
+    events = [event for event in labels if event in matrix]
+    events += sorted(set(matrix) - set(events))
+    starts = sorted(periods)
+    return {
+        'grades': grade_counts,
+        'categories': category_counts,
+        'matrix': {
+            'events': events,
+            'labels': [labels.get(event, event) for event in events],
+            'grades': grades,
+            'counts': [[matrix[event][grade] for grade in grades] for event in events],
+        },
+        'periods': {
+            'resolution': resolution,
+            'starts': [start.isoformat() for start in starts],
+            'labels': [label(start, resolution) for start in starts],
+            'counts': [sum(periods[start].values()) for start in starts],
+            'grades': {f'grade_{grade}': [periods[start][grade] for start in starts] for grade in grades},
+        },
+    }
+
+
+def _day_chart(dog, chart_type, start_date):
+    if chart_type == 'daily':
+        rows = window(dog, 'daily', start_date).order_by('date').values_list(
+            'date', 'happiness_score', 'overall_score'
+        )
+        return {
+            'labels': [d.strftime('%m/%d') for d, happiness, overall in rows],
+            'happiness': [happiness or 0 for d, happiness, overall in rows],
+            'overall': [overall or 0 for d, happiness, overall in rows],
+        }
+
+    if chart_type in ('cbpi', 'corq'):
+        columns = CBPI_COLUMNS if chart_type == 'cbpi' else CORQ_COLUMNS
+        rows = window(dog, chart_type, start_date).order_by('date').values_list('date', *columns.values())
+        return {
+            'labels': [row[0].strftime('%m/%d') for row in rows],
+            **{column: [row[i] for row in rows] for i, column in enumerate(columns, 1)},
+        }
+
+    measurements = window(dog, 'nodes', start_date).order_by('date')
+    return {
+        'labels': [m.date.strftime('%m/%d') for m in measurements],
+        **{
+            field: [float(getattr(m, field)) if getattr(m, field) else None for m in measurements]
+            for field in LymphNodeMeasurement.NODE_FIELDS
+        },
+    }
+
+
+def _thin_lists(data, key=None):
+    """data's parallel lists restricted to the points LTTB keeps."""
+    if len(data['labels']) <= MAX_POINTS:
+        return data
+    columns = [column for column in data if column != 'labels']
+    if key is not None:
+        ys = data[key]
+    else:
+        ys = [max((v for v in row if v is not None), default=None) for row in zip(*(data[c] for c in columns))]
+    kept = lttb(ys)
+    return {column: [values[i] for i in kept] for column, values in data.items()}
+
+
+def chart_data(dog, chart_type, start_date, end_date, resolution='day'):
+    """
+    The ?type= payload for one chart at resolution, raising ValueError if
+    chart_type is unknown.
+
+    At day resolution the chart has one point per reading; week and month
+    report each column's mean with column_min and column_max per period.
+    """
+    if chart_type == 'events':
+        # Events are counted per period; day resolution counts per week
+        resolution = 'month' if resolution == 'month' else 'week'
+        data = event_counts(dog, start_date, end_date, resolution)
+    elif chart_type not in SERIES:
+        raise ValueError('Unknown chart type')
+    elif resolution == 'day':
+        data = _thin_lists(_day_chart(dog, chart_type, start_date), THIN_KEYS.get(chart_type))
+    else:
+        loader, columns = SERIES[chart_type]
+        values = thin(bucket(loader(dog, start_date), columns, resolution), THIN_KEYS.get(chart_type))
+        starts = sorted(values)
+        data = {
+            'labels': [label(start, resolution) for start in starts],
+            'dates': [start.isoformat() for start in starts],
+            **{
+                column: [values[start][column] for start in starts]
+                for column in bucket_columns(columns, resolution)
+            },
+        }
+    data['resolution'] = resolution
+    return data
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from .models import DogProfile
+
+
+def dogs(request):
+    """The user's dogs for the header switcher, queried only when a template uses them."""
+    return {'all_dogs': SimpleLazyObject(
+        lambda: list(DogProfile.objects.for_user(request.user).order_by('pk'))
+        if request.user.is_authenticated else []
+    )}
@@ -0,0 +1,203 @@
+"""
+Dashboard context assembled in a fixed number of queries.
+
+DashboardSnapshot reads each part of the dashboard with one aggregate or
+bounded query, whatever the size of the dog's history:
+
+1. summary: the latest CORQ and the month's good/mixed/bad counts, as
+   subqueries on a single row
+2. the dog's assessment schedules, for the reminders and latest dates
+3. the overall score trend over TREND_DAYS (see health.trends)
+4. today's entry and the lowest-scoring day of the last 30 days
+5. recent adverse events
+6. recent treatments
+7. today's nutrition summary
+8. active medications, each annotated with whether a dose was given today
+9. upcoming and overdue appointments
+10. the latest CORQ, only when there is no score for today to show
+
+cached_context() keeps the result per user and day until the dog's
+records change (see health.caching and health.signals).
+"""
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.translation import get_language, gettext as _, gettext_noop
+
+from .caching import generation
+from .trends import trends
+
+from .models import (
+    AssessmentSchedule, CORQAssessment, DailyEntry, DailyEntryRollup, DailyNutritionSummary,
+    DogProfile, Medication, MedicationDose, TimelineEntry,
+    TreatmentSession, VCOGCTCAEEvent,
+)
+
+DASHBOARD_TIMEOUT = 60 * 60 * 24
+TREND_DAYS = 14
+
+# Page each instrument's reminder links to; cadences live on AssessmentSchedule
+REMINDER_URLS = {
+    'cbpi': 'health:cbpi',
+    'corq': 'health:corq',
+    'nodes': 'health:nodes',
+}
+
+# (lowest score, status colour, message), checked in order
+ENTRY_STATUS = [
+    (4, 'green', gettext_noop('Great day!')),
+    (3, 'yellow', gettext_noop('Good day')),
+    (2, 'orange', gettext_noop('Difficult day')),
+    (0, 'red', gettext_noop('Hard day - monitor closely')),
+]
+CORQ_STATUS = [
+    (60, 'green', gettext_noop('Good quality of life')),
+    (45, 'yellow', gettext_noop('Fair - monitor closely')),
+    (30, 'orange', gettext_noop('Declining - consult vet')),
+    (0, 'red', gettext_noop('Poor - urgent consultation needed')),
+]
+
+
+def _latest(model, dog, field):
+    return Subquery(model.objects.for_dog(dog).order_by('-date').values(field)[:1])
+
+
+def _status(score, thresholds):
+    for lowest, colour, message in thresholds:
+        if score >= lowest:
+            return colour, _(message)
+
+
+class DashboardSnapshot:
+    """The dashboard for one dog and user on one day."""
+
+    def __init__(self, dog, user, today=None):
+        self.dog = dog
+        self.user = user
+        self.today = today or date.today()
+
+    def summary(self):
+        """The latest CORQ and month counts in one row."""
+        dog, today = self.dog, self.today
+        month = DailyEntryRollup.objects.for_dog(dog).filter(
+            period='month', start=DailyEntryRollup.period_start('month', today)
+        )
+        return DogProfile.objects.filter(pk=dog.pk).values(
+            latest_corq_id=_latest(CORQAssessment, dog, 'pk'),
+            good_days=Coalesce(Subquery(month.values('good_days')), 0),
+            mixed_days=Coalesce(Subquery(month.values('mixed_days')), 0),
+            bad_days=Coalesce(Subquery(month.values('bad_days')), 0),
+        ).get()
+
+    def context(self):
+        dog, today = self.dog, self.today
+        thirty_days_ago = today - timedelta(days=30)
+        summary = self.summary()
+
+        # Today's entry and the hardest day of the last 30 days in one read
+        worst = Subquery(DailyEntry.objects.for_dog(dog).filter(
+            date__gte=thirty_days_ago, overall_score__isnull=False
+        ).order_by('overall_score', '-date').values('pk')[:1])
+        today_entry = worst_day = None
+        for entry in DailyEntry.objects.for_dog(dog).filter(Q(date=today) | Q(pk=worst)).annotate(
+            is_worst=ExpressionWrapper(Q(pk=worst), output_field=BooleanField())
+        ):
+            if entry.date == today:
+                today_entry = entry
+            if entry.is_worst:
+                worst_day = entry
+
+        # For star display: round to nearest integer
+        today_scores = {}
+        for category in ['mood', 'appetite', 'energy', 'pain', 'overall']:
+            today_scores[category] = None
+            today_scores[f'{category}_stars'] = None
+        if today_entry:
+            for category, score in today_entry.category_scores().items():
+                today_scores[category] = score
+                if score:
+                    today_scores[f'{category}_stars'] = round(score)
+
+        schedules = {s.instrument: s for s in AssessmentSchedule.objects.for_dog(dog)}
+        assessment_reminders = []
+        for schedule in schedules.values():
+            if schedule.next_due <= today:
+                assessment_reminders.append({
+                    'name': schedule.get_instrument_display(),
+                    'days': (today - schedule.last_done).days if schedule.last_done else None,
+                    'overdue': schedule.last_done is None or schedule.next_due < today,
+                    'url': REMINDER_URLS[schedule.instrument],
+                })
+
+        # Change per week of the fitted line; noise or too few days read as stable
+        overall = trends(dog, ['overall'], TREND_DAYS, today)['overall']
+        trend = 'stable' if overall['trend'] == 'insufficient' else overall['trend']
+        trend_value = round(overall['weekly_change'], 1) if trend != 'stable' else 0
+
+        qol_status, qol_message = 'gray', _('No entry yet today')
+        if today_scores['overall']:
+            qol_status, qol_message = _status(today_scores['overall'], ENTRY_STATUS)
+        elif summary['latest_corq_id']:
+            latest_corq = CORQAssessment.objects.get(pk=summary['latest_corq_id'])
+            qol_status, qol_message = _status(latest_corq.total_score, CORQ_STATUS)
+
+        active_meds = list(Medication.objects.for_dog(dog).filter(active=True).annotate(
+            given_today=Exists(MedicationDose.objects.filter(
+                medication=OuterRef('pk'), given_at__date=today
+            ))
+        ))
+
+        # Upcoming (next 7 days) and overdue (past, still scheduled) appointments
+        scheduled = TimelineEntry.objects.for_dog(dog).filter(user=self.user, status='scheduled')
+        upcoming = scheduled.filter(
+            date__gte=today, date__lte=today + timedelta(days=7)
+        ).order_by('date', 'time').values('pk')[:5]
+        overdue = scheduled.filter(date__lt=today).order_by('date').values('pk')[:3]
+        appointments = list(TimelineEntry.objects.filter(
+            Q(pk__in=Subquery(upcoming)) | Q(pk__in=Subquery(overdue))
+        ).order_by('date', 'time'))
+
+        return {
+            'today_entry': today_entry,
+            'today_scores': today_scores,
+            'latest_cbpi_date': schedules['cbpi'].last_done if 'cbpi' in schedules else None,
+            'latest_node_date': schedules['nodes'].last_done if 'nodes' in schedules else None,
+            'assessment_reminders': assessment_reminders,
+            'recent_events': list(VCOGCTCAEEvent.objects.for_dog(dog).filter(
+                date__gte=thirty_days_ago
+            ).order_by('-date')[:5]),
+            'recent_treatments': list(TreatmentSession.objects.for_dog(dog).filter(
+                date__gte=thirty_days_ago
+            ).order_by('-date')[:5]),
+            'good_days': summary['good_days'],
+            'mixed_days': summary['mixed_days'],
+            'bad_days': summary['bad_days'],
+            'total_days': summary['good_days'] + summary['mixed_days'] + summary['bad_days'],
+            'worst_day': worst_day,
+            'today_nutrition': DailyNutritionSummary.objects.for_dog(dog).filter(date=today).first(),
+            'dog_profile': dog,
+            'active_meds': active_meds,
+            'doses_given': {med.pk for med in active_meds if med.given_today},
+            'trend': trend,
+            'trend_value': trend_value,
+            'qol_status': qol_status,
+            'qol_message': qol_message,
+            'upcoming_appointments': [a for a in appointments if a.date >= today],
+            'overdue_appointments': [a for a in appointments if a.date < today],
+        }
+
+
+def cached_context(dog, user, today=None):
+    """
+    The snapshot context, cached per dog, user, day and language under the
+    dog's cache generation so it is rebuilt only after a write.
+    """
+    today = today or date.today()
+    key = f'dashboard:{dog.pk}:{user.pk}:{today.isoformat()}:{get_language()}:{generation(dog.pk)}'
+    context = cache.get(key)
+    if context is None:
+        context = DashboardSnapshot(dog, user, today).context()
+        cache.set(key, context, DASHBOARD_TIMEOUT)
+    return context
@@ -0,0 +1,78 @@
+"""
+Keyset pagination for the history page and its JSON API.
+
+Pages are read newest first and continue from a cursor naming the last
+row already shown, never from an OFFSET, so every page is an index range
+scan of `limit` rows however much history there is.
+
+- Daily entries are unique per (dog, date); the cursor is the last date.
+- Node measurements are unique per (dog, date, source); the cursor is
+  "<date>:<source>".
+"""
+from datetime import date
+
+from .models import DailyEntry, LymphNodeMeasurement
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+ENTRY_FIELDS = ['date', 'good_day', 'happiness_score', 'overall_score']
+NODE_FIELDS = ['date', 'source', 'status', *LymphNodeMeasurement.NODE_FIELDS]
+
+
+def parse_limit(value, default=PAGE_SIZE):
+    """Page size from a query parameter, clamped to 1..MAX_PAGE_SIZE."""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _split(rows, limit, cursor_for):
+    rows = list(rows[:limit + 1])
+    next_cursor = cursor_for(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def entry_page(dog, before=None, limit=PAGE_SIZE):
+    """
+    One page of the dog's daily entries older than the `before` cursor.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = DailyEntry.objects.for_dog(dog).order_by('-date')
+    if before:
+        try:
+            queryset = queryset.filter(date__lt=date.fromisoformat(before))
+        except ValueError:
+            raise ValueError('Invalid cursor')
+    return _split(queryset.values(*ENTRY_FIELDS), limit, lambda r: r['date'].isoformat())
+
+
+def node_page(dog, before=None, limit=PAGE_SIZE):
+    """
+    One page of the dog's node measurements older than the `before` cursor.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = LymphNodeMeasurement.objects.for_dog(dog).order_by('-date', '-source')
+    if before:
+        try:
+            day, source = before.split(':', 1)
+            day = date.fromisoformat(day)
+        except ValueError:
+            raise ValueError('Invalid cursor')
+        # date <= day keeps this an index range scan; the exclude drops the
+        # rows of that day already shown (at most one per source)
+        queryset = queryset.filter(date__lte=day).exclude(date=day, source__gte=source)
+    rows, next_cursor = _split(
+        queryset.values(*NODE_FIELDS), limit,
+        lambda r: f"{r['date'].isoformat()}:{r['source']}",
+    )
+    statuses = dict(LymphNodeMeasurement.STATUS_CHOICES)
+    for row in rows:
+        row['status_display'] = statuses.get(row['status'], '')
+    return rows, next_cursor
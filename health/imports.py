@@ -0,0 +1,321 @@
+"""
+Bulk import of historical daily entries, lymph node measurements and
+backdated CBPI/CORQ assessments.
+
+Rows are streamed from a CSV or XLSX file and written in batches: each
+batch is validated, checked against the existing rows with one query and
+inserted with one bulk_create in its own transaction, so memory stays
+bounded by the batch size however long the file is.
+
+Columns are matched by header name, case-insensitively:
+- entries: date plus any of DailyEntry.TRACKED_FIELDS
+- nodes: date, source, status, notes and the LymphNodeMeasurement.NODE_FIELDS
+Other columns are ignored.
+
+Assessments (import_assessments()) are all or nothing instead: a stack
+of paper questionnaires from the clinic is either entered whole or, if
+any sheet has an item out of range, not at all.
+"""
+import csv
+import io
+from datetime import date, datetime, time
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import bump_generation
+from .models import (
+    SOURCE_CHOICES, AssessmentSchedule, CBPIAssessment, CORQAssessment, DailyEntry, DailyEntryRollup,
+    LymphNodeMeasurement,
+)
+
+BATCH_SIZE = 500
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x'}
+BOOLEAN_FIELDS = ['breakfast', 'lunch', 'dinner', 'treats']
+
+# Assessment item: (lowest, highest) accepted value
+CBPI_RANGES = {
+    **dict.fromkeys(CBPIAssessment.SEVERITY_FIELDS + CBPIAssessment.INTERFERENCE_FIELDS, (0, 10)),
+    'overall_quality_of_life': (1, 5),
+}
+CORQ_RANGES = {
+    **dict.fromkeys([f for fields in CORQAssessment.FACTOR_FIELDS.values() for f in fields], (1, 5)),
+    'global_qol': (0, 100),
+}
+
+
+def read_rows(file, filename):
+    """
+    Yield (line_number, row) for each non-blank data row of a binary CSV
+    or XLSX file, with row keys taken from the lower-cased header.
+    """
+    if filename.lower().endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError('Reading .xlsx files needs the openpyxl package')
+        rows = load_workbook(file, read_only=True, data_only=True).active.iter_rows(values_only=True)
+    else:
+        rows = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+
+    header = next(rows, None)
+    if header is None:
+        return
+    keys = [_text(h).lower() for h in header]
+    for line, row in enumerate(rows, start=2):
+        if any(_text(v) for v in row):
+            yield line, dict(zip(keys, row))
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(_text(value))
+    except ValueError:
+        raise ValueError(f'invalid date {_text(value)!r}')
+
+
+def _parse_past_date(value):
+    day = _parse_date(value)
+    if day > date.today():
+        raise ValueError(f'date {day} is in the future')
+    return day
+
+
+def _parse_rating(field, value):
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        raise ValueError(f'{field} must be a number')
+    if not number.is_integer():
+        raise ValueError(f'{field} must be a whole number')
+    return int(number)
+
+
+def _parse_size(field, value):
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        size = Decimal(text).quantize(Decimal('0.1'), ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f'{field} must be a number')
+    if not 0 <= size < 1000:
+        raise ValueError(f'{field} is out of range')
+    return size
+
+
+def _parse_choice(field, value, choices, default=''):
+    text = _text(value).lower() or default
+    if text not in {key for key, _ in choices} | {''}:
+        raise ValueError(f'{field} must be one of {", ".join(key for key, _ in choices)}')
+    return text
+
+
+def entry_from_row(dog, user, row):
+    """
+    Build an unsaved DailyEntry from an import row, raising ValueError if
+    invalid. Its fields are stamped as written at the start of the row's
+    day, so a later offline edit of the same day still wins a sync.
+    """
+    values = {}
+    for field in DailyEntry.TRACKED_FIELDS:
+        if field not in row:
+            continue
+        value = row[field]
+        if field in DailyEntry.RATING_FIELDS:
+            values[field] = _parse_rating(field, value)
+        elif field in BOOLEAN_FIELDS:
+            values[field] = _text(value).lower() in TRUE_VALUES
+        elif field == 'good_day':
+            values[field] = _parse_choice(field, value, DailyEntry.GOOD_DAY_CHOICES)
+        else:
+            values[field] = _text(value)
+    DailyEntry.validate_tracked_values(values)
+    day = _parse_past_date(row.get('date'))
+    entry = DailyEntry(dog=dog, user=user, date=day, **values)
+    entry.refresh_scores()
+    entry.stamp_fields(entry.changed_fields(), when=timezone.make_aware(datetime.combine(day, time.min)))
+    return entry
+
+
+def node_from_row(dog, user, row):
+    """Build an unsaved LymphNodeMeasurement from an import row, raising ValueError if invalid."""
+    values = {
+        field: _parse_size(field, row[field])
+        for field in LymphNodeMeasurement.NODE_FIELDS if field in row
+    }
+    return LymphNodeMeasurement(
+        dog=dog, user=user, date=_parse_past_date(row.get('date')),
+        source=_parse_choice('source', row.get('source'), SOURCE_CHOICES, default='home'),
+        status=_parse_choice('status', row.get('status'), LymphNodeMeasurement.STATUS_CHOICES),
+        notes=_text(row.get('notes')),
+        **values,
+    )
+
+
+def _assessment_from_row(model, ranges, dog, user, row):
+    values = {}
+    for field, (low, high) in ranges.items():
+        value = _parse_rating(field, row.get(field))
+        if value is None:
+            raise ValueError(f'{field} is required')
+        if not low <= value <= high:
+            raise ValueError(f'{field} must be between {low} and {high}')
+        values[field] = value
+    day = _parse_past_date(row.get('date'))
+    assessment = model(
+        dog=dog, user=user, date=day,
+        source=_parse_choice('source', row.get('source'), SOURCE_CHOICES, default='clinic'),
+        notes=_text(row.get('notes')),
+        **values,
+    )
+    assessment.refresh_scores()
+    return assessment
+
+
+def cbpi_from_row(dog, user, row):
+    """Build an unsaved CBPIAssessment from an import row, raising ValueError if invalid."""
+    return _assessment_from_row(CBPIAssessment, CBPI_RANGES, dog, user, row)
+
+
+def corq_from_row(dog, user, row):
+    """Build an unsaved CORQAssessment from an import row, raising ValueError if invalid."""
+    return _assessment_from_row(CORQAssessment, CORQ_RANGES, dog, user, row)
+
+
+# kind: (model, row builder)
+ASSESSMENT_KINDS = {
+    'cbpi': (CBPIAssessment, cbpi_from_row),
+    'corq': (CORQAssessment, corq_from_row),
+}
+
+# kind: (model, row builder, unique fields besides dog, fields an overwrite replaces)
+KINDS = {
+    'entries': (
+        DailyEntry, entry_from_row, ['date'],
+        [*DailyEntry.TRACKED_FIELDS, *DailyEntry.SCORE_FIELDS, 'field_updated_at', 'user', 'updated_at'],
+    ),
+    'nodes': (
+        LymphNodeMeasurement, node_from_row, ['date', 'source'],
+        [*LymphNodeMeasurement.NODE_FIELDS, 'status', 'notes', 'user', 'updated_at'],
+    ),
+}
+
+
+def import_rows(kind, rows, dog, user, overwrite=False, batch_size=BATCH_SIZE, progress=None):
+    """
+    Import (line_number, row) pairs for the dog, batch_size rows at a time.
+
+    Days already recorded are skipped, or with overwrite replaced by the
+    file's row (columns missing from the file are cleared). Invalid rows
+    are skipped and reported. progress, if given, is called with the
+    running result after each batch.
+
+    Returns {'created', 'updated', 'skipped', 'errors': [(line, message)]}.
+    """
+    model, build, key_fields, update_fields = KINDS[kind]
+    result = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': []}
+    rows = iter(rows)
+
+    while batch := list(islice(rows, batch_size)):
+        objects = {}
+        for line, row in batch:
+            try:
+                obj = build(dog, user, row)
+            except ValueError as e:
+                result['errors'].append((line, str(e)))
+                continue
+            # A later row for the same day replaces an earlier one
+            objects[tuple(getattr(obj, f) for f in key_fields)] = obj
+
+        with transaction.atomic():
+            existing = set(
+                model.objects.for_dog(dog).filter(
+                    date__in={obj.date for obj in objects.values()}
+                ).values_list(*key_fields)
+            )
+            if not overwrite:
+                result['skipped'] += sum(1 for key in objects if key in existing)
+                objects = {key: obj for key, obj in objects.items() if key not in existing}
+            if objects:
+                model.objects.bulk_create(
+                    objects.values(),
+                    batch_size=batch_size,
+                    update_conflicts=overwrite,
+                    ignore_conflicts=not overwrite,
+                    unique_fields=['dog', *key_fields] if overwrite else None,
+                    update_fields=update_fields if overwrite else None,
+                )
+            if model is DailyEntry and objects:
+                DailyEntryRollup.refresh_for_dates(dog.pk, [obj.date for obj in objects.values()])
+            if model is LymphNodeMeasurement and objects:
+                AssessmentSchedule.refresh(dog.pk, 'nodes')
+            bump_generation(dog.pk)
+
+        updated = sum(1 for key in objects if key in existing)
+        result['updated'] += updated
+        result['created'] += len(objects) - updated
+        if progress:
+            progress(result)
+
+    return result
+
+
+def import_assessments(kind, rows, dog, user, batch_size=BATCH_SIZE):
+    """
+    Import backdated CBPI or CORQ assessments from (line_number, row)
+    pairs, all or nothing. source defaults to clinic.
+
+    Rows are validated batch_size at a time. If any is invalid nothing is
+    written; otherwise every assessment is inserted in one transaction. A
+    later row with the same date and source replaces an earlier one, and a
+    row with the date and source of an assessment already recorded is
+    skipped, so running the same import twice adds nothing.
+
+    Returns {'created', 'skipped', 'errors': [(line, message)]}.
+    """
+    model, build = ASSESSMENT_KINDS[kind]
+    result = {'created': 0, 'skipped': 0, 'errors': []}
+    assessments = {}
+    count = 0
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        for line, row in batch:
+            try:
+                assessment = build(dog, user, row)
+            except ValueError as e:
+                result['errors'].append((line, str(e)))
+                continue
+            # A later row for the same day and source replaces an earlier one
+            assessments[(assessment.date, assessment.source)] = assessment
+            count += 1
+    if result['errors'] or not assessments:
+        return result
+
+    with transaction.atomic():
+        existing = set(
+            model.objects.for_dog(dog).filter(
+                date__in={key[0] for key in assessments}
+            ).values_list('date', 'source')
+        )
+        new = [a for key, a in assessments.items() if key not in existing]
+        model.objects.bulk_create(new, batch_size=batch_size)
+        AssessmentSchedule.refresh(dog.pk, kind)
+        bump_generation(dog.pk)
+    result['created'] = len(new)
+    result['skipped'] = count - len(new)
+    return result
@@ -0,0 +1,139 @@
+"""
+Household activity pushed to open pages over Server-Sent Events.
+
+Write views publish small change events for the dog ('entry' when the
+day's tracker entry is saved, 'dose' when a dose is recorded) once their
+transaction commits. Events are stored as LiveEvent rows, whose ids give
+every worker the same ordering for Last-Event-ID resumes; subscribers in
+the publishing process are woken at once, and those in other workers
+pick the event up within POLL_INTERVAL.
+
+Under ASGI, astream() holds the connection open for STREAM_DURATION. A
+sync worker cannot be held that long, so stream() sends what is pending
+and closes, and the browser reconnects after RETRY_MS.
+"""
+import asyncio
+import json
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import DailyEntry, LiveEvent
+
+POLL_INTERVAL = 5
+KEEPALIVE_INTERVAL = 15
+STREAM_DURATION = 5 * 60
+RETRY_MS = 5000
+EVENT_TTL = timedelta(days=1)
+BATCH_SIZE = 100
+MEAL_FIELDS = ['breakfast', 'lunch', 'dinner', 'treats']
+
+_waiters = set()
+_waiters_lock = threading.Lock()
+
+
+def publish(dog, kind, data):
+    """
+    Send an event to the dog's open pages once the current transaction
+    commits. data may be a callable, to read the committed state.
+    """
+    def send():
+        LiveEvent.objects.create(dog=dog, kind=kind, data=data() if callable(data) else data)
+        LiveEvent.objects.for_dog(dog).filter(created_at__lt=timezone.now() - EVENT_TTL).delete()
+        _notify()
+    transaction.on_commit(send)
+
+
+def publish_entry(dog, user, entry_date):
+    """The day's entry was saved; carries its category scores and meals as committed."""
+    def data():
+        entry = DailyEntry.objects.for_dog(dog).get(date=entry_date)
+        return {
+            'date': entry_date.isoformat(),
+            'user': user.username,
+            'scores': entry.category_scores(),
+            'meals': {field: getattr(entry, field) for field in MEAL_FIELDS},
+            'good_day': entry.good_day,
+        }
+    publish(dog, 'entry', data)
+
+
+def publish_dose(dog, user, dose):
+    publish(dog, 'dose', {
+        'medication': dose.medication_id,
+        'given_at': dose.given_at.isoformat(),
+        'user': user.username,
+    })
+
+
+def latest_id(dog_id):
+    return LiveEvent.objects.filter(dog_id=dog_id).aggregate(latest=Max('id'))['latest'] or 0
+
+
+def events_since(dog_id, last_id):
+    """(id, kind, data) for the dog's events after last_id, oldest first."""
+    return list(LiveEvent.objects.filter(
+        dog_id=dog_id, id__gt=last_id
+    ).order_by('id').values_list('id', 'kind', 'data')[:BATCH_SIZE])
+
+
+def format_event(event_id, kind, data):
+    return f'id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n'
+
+
+def stream(dog_id, last_id=None):
+    """
+    The dog's events after last_id, for a sync worker. A new connection
+    (no last_id) starts from the latest event rather than replaying.
+    """
+    yield f'retry: {RETRY_MS}\n\n'
+    if last_id is None:
+        # An id-only message sets the browser's Last-Event-ID without an event
+        yield f'id: {latest_id(dog_id)}\n\n'
+        return
+    for event in events_since(dog_id, last_id):
+        yield format_event(*event)
+
+
+async def astream(dog_id, last_id=None):
+    """The dog's events after last_id as they happen, for STREAM_DURATION."""
+    yield f'retry: {RETRY_MS}\n\n'
+    if last_id is None:
+        last_id = await sync_to_async(latest_id)(dog_id)
+        yield f'id: {last_id}\n\n'
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_DURATION
+    quiet_since = loop.time()
+    while loop.time() < deadline:
+        # Register before reading so an event published meanwhile still wakes us
+        waiter = (loop, asyncio.Event())
+        with _waiters_lock:
+            _waiters.add(waiter)
+        try:
+            for event in await sync_to_async(events_since)(dog_id, last_id):
+                last_id = event[0]
+                quiet_since = loop.time()
+                yield format_event(*event)
+            if loop.time() - quiet_since >= KEEPALIVE_INTERVAL:
+                quiet_since = loop.time()
+                yield ': keepalive\n\n'
+            try:
+                await asyncio.wait_for(waiter[1].wait(), min(POLL_INTERVAL, max(0, deadline - loop.time())))
+            except TimeoutError:
+                pass
+        finally:
+            with _waiters_lock:
+                _waiters.discard(waiter)
+
+
+def _notify():
+    """Wake this process's open streams."""
+    with _waiters_lock:
+        waiters = list(_waiters)
+    for loop, event in waiters:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(event.set)
@@ -0,0 +1,82 @@
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+
+def _default_paths():
+    return [
+        reverse('health:dashboard'),
+        reverse('health:api_chart_data') + '?types=daily,nodes&days=60',
+        reverse('health:api_tracker_bootstrap'),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Time pages in-process through the WSGI and the ASGI handler, as the '
+        'sync and Uvicorn workers serve them (SERVER_MODE in entrypoint.sh)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('user', help='Username the requests are made as')
+        parser.add_argument('paths', nargs='*', help='Paths to time (default: dashboard, charts, tracker)')
+        parser.add_argument('--requests', type=int, default=100, help='Timed requests per path and handler')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"No such user: {options['user']}")
+        paths = options['paths'] or _default_paths()
+        host = next((h for h in settings.ALLOWED_HOSTS if h and '*' not in h), 'localhost').lstrip('.')
+        count = options['requests']
+
+        client = Client(headers={'host': host})
+        client.force_login(user)
+        wsgi = {path: self._time(path, lambda: client.get(path), count) for path in paths}
+        client.logout()
+        asgi = asyncio.run(self._time_async(user, host, paths, count))
+
+        for path in paths:
+            self.stdout.write(
+                f'{path}\n'
+                f'  wsgi  median {wsgi[path][0]:7.2f} ms  p95 {wsgi[path][1]:7.2f} ms\n'
+                f'  asgi  median {asgi[path][0]:7.2f} ms  p95 {asgi[path][1]:7.2f} ms'
+            )
+
+    def _time(self, path, get, count):
+        self._check(path, get())
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            get()
+            timings.append((time.perf_counter() - start) * 1000)
+        return self._summary(timings)
+
+    async def _time_async(self, user, host, paths, count):
+        client = AsyncClient(headers={'host': host})
+        await client.aforce_login(user)
+        results = {}
+        for path in paths:
+            self._check(path, await client.get(path))
+            timings = []
+            for _ in range(count):
+                start = time.perf_counter()
+                await client.get(path)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[path] = self._summary(timings)
+        await client.alogout()
+        return results
+
+    def _check(self, path, response):
+        if response.status_code != 200:
+            raise CommandError(f'{path} answered {response.status_code}')
+
+    def _summary(self, timings):
+        timings.sort()
+        return statistics.median(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
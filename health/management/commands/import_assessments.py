@@ -0,0 +1,61 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from health.imports import ASSESSMENT_KINDS, BATCH_SIZE, import_assessments, read_rows
+from health.models import DogProfile
+
+
+class Command(BaseCommand):
+    help = (
+        'Import backdated CBPI or CORQ assessments (e.g. a stack of clinic questionnaires) '
+        'from a CSV, XLSX or JSON file, all or nothing'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(ASSESSMENT_KINDS))
+        parser.add_argument('path', help='CSV or XLSX with a header row, or a JSON array of objects')
+        parser.add_argument('--dog', type=int, help='DogProfile id (default: the first profile)')
+        parser.add_argument('--user', help='Username recorded on the rows (default: the dog owner)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        dogs = DogProfile.objects.order_by('pk')
+        dog = dogs.filter(pk=options['dog']).first() if options['dog'] else dogs.first()
+        if dog is None:
+            raise CommandError('No such dog profile')
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"No such user: {options['user']}")
+        else:
+            user = dog.user
+
+        try:
+            with open(options['path'], 'rb') as f:
+                if options['path'].lower().endswith('.json'):
+                    rows = _json_rows(f)
+                else:
+                    rows = read_rows(f, options['path'])
+                result = import_assessments(
+                    options['kind'], rows, dog, user, batch_size=options['batch_size'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for line, message in result['errors']:
+            self.stderr.write(f'Row {line}: {message}')
+        if result['errors']:
+            raise CommandError(f"Nothing imported: {len(result['errors'])} invalid rows")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {options['kind']} for {dog.name}: {result['created']} created, "
+            f"{result['skipped']} already recorded"
+        ))
+
+
+def _json_rows(file):
+    rows = json.load(file)
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError('The JSON file must hold an array of objects')
+    return enumerate(rows, start=1)
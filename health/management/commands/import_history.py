@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from health.imports import BATCH_SIZE, KINDS, import_rows, read_rows
+from health.models import DogProfile
+
+
+class Command(BaseCommand):
+    help = 'Import historical daily entries or lymph node measurements from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file with a header row')
+        parser.add_argument('--kind', choices=sorted(KINDS), default='entries')
+        parser.add_argument('--dog', type=int, help='DogProfile id (default: the first profile)')
+        parser.add_argument('--user', help='Username recorded on the rows (default: the dog owner)')
+        parser.add_argument('--overwrite', action='store_true', help='Replace days already recorded')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        dogs = DogProfile.objects.order_by('pk')
+        dog = dogs.filter(pk=options['dog']).first() if options['dog'] else dogs.first()
+        if dog is None:
+            raise CommandError('No such dog profile')
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"No such user: {options['user']}")
+        else:
+            user = dog.user
+
+        def progress(result):
+            done = result['created'] + result['updated'] + result['skipped'] + len(result['errors'])
+            self.stdout.write(f'{done} rows processed')
+
+        try:
+            with open(options['path'], 'rb') as f:
+                result = import_rows(
+                    options['kind'], read_rows(f, options['path']), dog, user,
+                    overwrite=options['overwrite'], batch_size=options['batch_size'],
+                    progress=progress,
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for line, message in result['errors']:
+            self.stderr.write(f'Line {line}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {options['kind']} for {dog.name}: {result['created']} created, "
+            f"{result['updated']} updated, {result['skipped']} skipped, "
+            f"{len(result['errors'])} invalid"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from health.models import MedicationAdherence
+
+
+class Command(BaseCommand):
+    help = 'Rematch every logged medication dose to its expected slots from scratch'
+
+    def handle(self, *args, **options):
+        count = MedicationAdherence.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} adherence rows'))
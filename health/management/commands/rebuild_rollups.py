@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from health.models import DailyEntryRollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the weekly and monthly daily entry rollups from scratch. '
+        'Signals keep them current, so this is only for repairing them by hand'
+    )
+
+    def handle(self, *args, **options):
+        count = DailyEntryRollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} rollups'))
@@ -0,0 +1,27 @@
+"""
+Sends users who have no dog profile yet to the add-dog page.
+
+Views find the dog they work on with views._current_dog(), which raises
+NoDogProfile instead of creating a profile as a side effect of a
+request. Pages redirect to add_dog; API calls and writes get a 409 the
+client can show.
+"""
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+from .views import NoDogProfile
+
+
+class DogOnboardingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, NoDogProfile):
+            return None
+        if request.method == 'GET' and '/api/' not in request.path:
+            return redirect('health:add_dog')
+        return JsonResponse({'status': 'error', 'message': str(exception)}, status=409)
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+MOOD_FIELDS = [
+    "tail_body_language", "interest_people", "interest_environment",
+    "enjoyment_favorites", "overall_spark",
+]
+RATING_FIELDS = MOOD_FIELDS + [
+    "appetite", "food_enjoyment", "nausea_signs", "weight_condition",
+    "energy_level", "willingness_move", "walking_comfort", "resting_comfort",
+    "breathing_comfort", "pain_signs", "sleep_quality", "response_touch",
+]
+
+
+def _average(entry, fields):
+    valid = [getattr(entry, f) for f in fields if getattr(entry, f) is not None]
+    if valid:
+        return round(sum(valid) / len(valid), 1)
+    return None
+
+
+def backfill_scores(apps, schema_editor):
+    DailyEntry = apps.get_model("health", "DailyEntry")
+    batch = []
+    for entry in DailyEntry.objects.only("id", *RATING_FIELDS).iterator(chunk_size=500):
+        entry.happiness_score = _average(entry, MOOD_FIELDS)
+        entry.overall_score = _average(entry, RATING_FIELDS)
+        batch.append(entry)
+        if len(batch) >= 500:
+            DailyEntry.objects.bulk_update(batch, ["happiness_score", "overall_score"])
+            batch = []
+    if batch:
+        DailyEntry.objects.bulk_update(batch, ["happiness_score", "overall_score"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0007_add_timeline_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailyentry",
+            name="happiness_score",
+            field=models.FloatField(
+                blank=True,
+                editable=False,
+                help_text="Average of the mood fields (1-5)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailyentry",
+            name="overall_score",
+            field=models.FloatField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="Average of all rating fields (1-5)",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailyentry",
+            index=models.Index(
+                fields=["date", "overall_score"], name="health_dail_date_score_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
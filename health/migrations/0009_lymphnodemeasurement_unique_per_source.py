@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:02
+
+from django.db import migrations, models
+
+
+NODE_FIELDS = ["mandibular_left", "mandibular_right", "popliteal_left", "popliteal_right"]
+
+
+def merge_group(measurements):
+    """
+    Merge same-day, same-source measurements (newest first) into the first
+    one: blank sizes and status are filled from older rows and distinct
+    notes are appended. Returns a description of each value that differs
+    between two rows, which cannot be merged.
+    """
+    keep, conflicts = measurements[0], []
+    for older in measurements[1:]:
+        for field in NODE_FIELDS + ["status"]:
+            mine, theirs = getattr(keep, field), getattr(older, field)
+            if mine in (None, ""):
+                setattr(keep, field, theirs)
+            elif theirs not in (None, "") and theirs != mine:
+                conflicts.append(
+                    f"{keep.date} ({keep.source}): {field} is {mine} in #{keep.pk} but {theirs} in #{older.pk}"
+                )
+        if older.notes and older.notes not in keep.notes:
+            keep.notes = "\n".join(filter(None, [keep.notes, older.notes]))
+    return conflicts
+
+
+def merge_duplicate_measurements(apps, schema_editor):
+    """
+    Merge measurements sharing a (date, source) into the most recently
+    created one. Nothing is changed if any of them disagree; the migration
+    stops and lists the rows to resolve first.
+    """
+    LymphNodeMeasurement = apps.get_model("health", "LymphNodeMeasurement")
+    groups = {}
+    for measurement in LymphNodeMeasurement.objects.order_by("date", "source", "-created_at", "-id"):
+        groups.setdefault((measurement.date, measurement.source), []).append(measurement)
+    groups = [group for group in groups.values() if len(group) > 1]
+    conflicts = [conflict for group in groups for conflict in merge_group(group)]
+    if conflicts:
+        raise ValueError(
+            "Duplicate lymph node measurements disagree and cannot be merged:\n"
+            + "\n".join(conflicts)
+            + "\nEdit or delete the conflicting rows in the admin, then run migrate again."
+        )
+    if groups:
+        LymphNodeMeasurement.objects.bulk_update([group[0] for group in groups], NODE_FIELDS + ["status", "notes"])
+        LymphNodeMeasurement.objects.filter(
+            id__in=[m.pk for group in groups for m in group[1:]]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0008_dailyentry_stored_scores"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_measurements, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="lymphnodemeasurement",
+            constraint=models.UniqueConstraint(
+                fields=("date", "source"), name="unique_node_measurement_per_source"
+            ),
+        ),
+    ]
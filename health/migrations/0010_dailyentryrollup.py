@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health', '0009_lymphnodemeasurement_unique_per_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyEntryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('start', models.DateField(help_text='Monday of the week or first day of the month')),
+                ('entries_count', models.PositiveIntegerField(default=0)),
+                ('good_days', models.PositiveIntegerField(default=0)),
+                ('mixed_days', models.PositiveIntegerField(default=0)),
+                ('bad_days', models.PositiveIntegerField(default=0)),
+                ('overall_sum', models.FloatField(default=0)),
+                ('overall_count', models.PositiveIntegerField(default=0)),
+                ('mood_sum', models.FloatField(default=0)),
+                ('mood_count', models.PositiveIntegerField(default=0)),
+                ('appetite_sum', models.FloatField(default=0)),
+                ('appetite_count', models.PositiveIntegerField(default=0)),
+                ('energy_sum', models.FloatField(default=0)),
+                ('energy_count', models.PositiveIntegerField(default=0)),
+                ('pain_sum', models.FloatField(default=0)),
+                ('pain_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['period', '-start'],
+                'constraints': [models.UniqueConstraint(fields=('period', 'start'), name='unique_rollup_period')],
+            },
+        ),
+    ]
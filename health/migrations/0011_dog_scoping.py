@@ -0,0 +1,84 @@
+# Generated by Django 6.0 on 2026-10-17 06:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0010_dailyentryrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cbpiassessment',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='corqassessment',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='dailyentry',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='dailyentryrollup',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='dailynutritionsummary',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='labvalue',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='lymphnodemeasurement',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='medicalrecord',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='medication',
+            name='dog',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='supplementdose',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='timelineentry',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='treatmentsession',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddField(
+            model_name='vcogctcaeevent',
+            name='dog',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-17 06:14
+
+from django.db import migrations
+
+
+MODELS = [
+    "CBPIAssessment", "CORQAssessment", "DailyEntry", "DailyEntryRollup",
+    "DailyNutritionSummary", "LabValue", "LymphNodeMeasurement", "Meal",
+    "MedicalRecord", "Medication", "SupplementDose", "TimelineEntry",
+    "TreatmentSession", "VCOGCTCAEEvent",
+]
+
+
+def assign_existing_rows(apps, schema_editor):
+    """
+    Give every existing record to the first dog profile, creating one
+    for the first user if the database has records but no profile.
+    """
+    DogProfile = apps.get_model("health", "DogProfile")
+    User = apps.get_model("auth", "User")
+    dog = DogProfile.objects.order_by("pk").first()
+    if dog is None:
+        user = User.objects.order_by("pk").first()
+        if user is None:
+            return
+        dog = DogProfile.objects.create(user=user, name="Bruno", weight_kg=22)
+    for model_name in MODELS:
+        apps.get_model("health", model_name).objects.filter(dog__isnull=True).update(dog=dog)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0011_dog_scoping"),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_existing_rows, migrations.RunPython.noop),
+    ]
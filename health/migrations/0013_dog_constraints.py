@@ -0,0 +1,161 @@
+# Generated by Django 6.0 on 2026-10-17 06:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0012_assign_dogs"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dailyentryrollup',
+            name='unique_rollup_period',
+        ),
+        migrations.RemoveConstraint(
+            model_name='lymphnodemeasurement',
+            name='unique_node_measurement_per_source',
+        ),
+        migrations.RemoveIndex(
+            model_name='dailyentry',
+            name='health_dail_date_score_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyentry',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='cbpiassessment',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='corqassessment',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='dailyentry',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='dailyentryrollup',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='dailynutritionsummary',
+            name='date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='dailynutritionsummary',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='labvalue',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='lymphnodemeasurement',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='meal',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='medicalrecord',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='medication',
+            name='dog',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='supplementdose',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='timelineentry',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='treatmentsession',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AlterField(
+            model_name='vcogctcaeevent',
+            name='dog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='health.dogprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='cbpiassessment',
+            index=models.Index(fields=['dog', 'date'], name='health_cbpi_dog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='corqassessment',
+            index=models.Index(fields=['dog', 'date'], name='health_corq_dog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyentry',
+            index=models.Index(fields=['dog', 'date', 'overall_score'], name='health_dail_dog_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labvalue',
+            index=models.Index(fields=['dog', 'date'], name='health_lab_dog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meal',
+            index=models.Index(fields=['dog', 'date'], name='health_meal_dog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicalrecord',
+            index=models.Index(fields=['dog', 'date'], name='health_record_dog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplementdose',
+            index=models.Index(fields=['dog', 'date'], name='health_supp_dog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['dog', 'date'], name='health_timeline_dog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentsession',
+            index=models.Index(fields=['dog', 'date'], name='health_treat_dog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vcogctcaeevent',
+            index=models.Index(fields=['dog', 'date'], name='health_event_dog_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyentry',
+            constraint=models.UniqueConstraint(fields=('dog', 'date'), name='unique_daily_entry_per_dog'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyentryrollup',
+            constraint=models.UniqueConstraint(fields=('dog', 'period', 'start'), name='unique_rollup_per_dog'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailynutritionsummary',
+            constraint=models.UniqueConstraint(fields=('dog', 'date'), name='unique_nutrition_summary_per_dog'),
+        ),
+        migrations.AddConstraint(
+            model_name='lymphnodemeasurement',
+            constraint=models.UniqueConstraint(fields=('dog', 'date', 'source'), name='unique_node_measurement_per_dog'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-17 07:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0014_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiveEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(max_length=20)),
+                ("data", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("dog", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to="health.dogprofile")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["dog", "id"], name="health_liveevent_dog_id_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,156 @@
+# Generated by Django 6.0 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+SEVERITY_FIELDS = ["worst_pain", "least_pain", "average_pain", "current_pain"]
+INTERFERENCE_FIELDS = [
+    "general_activity", "enjoyment_of_life", "ability_to_rise",
+    "ability_to_walk", "ability_to_run", "ability_to_climb",
+]
+FACTOR_FIELDS = {
+    "vitality": ["energy_level", "playfulness", "interest_in_surroundings", "appetite"],
+    "companionship": ["seeks_attention", "enjoys_interaction", "greets_family", "tail_wagging"],
+    "pain": ["shows_pain", "vocalizes_pain", "avoids_touch", "pants_restless"],
+    "mobility": ["walks_normally", "rises_easily", "climbs_stairs", "jumps"],
+}
+CBPI_SCORES = ["pain_severity_score", "pain_interference_score"]
+CORQ_SCORES = ["vitality_score", "companionship_score", "pain_score", "mobility_score", "total_score"]
+
+
+def _average(assessment, fields):
+    return round(sum(getattr(assessment, f) for f in fields) / len(fields), 2)
+
+
+def _backfill(model, fields, scores, refresh):
+    batch = []
+    for assessment in model.objects.only("id", *fields).iterator(chunk_size=500):
+        refresh(assessment)
+        batch.append(assessment)
+        if len(batch) >= 500:
+            model.objects.bulk_update(batch, scores)
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, scores)
+
+
+def backfill_scores(apps, schema_editor):
+    def refresh_cbpi(assessment):
+        assessment.pain_severity_score = _average(assessment, SEVERITY_FIELDS)
+        assessment.pain_interference_score = _average(assessment, INTERFERENCE_FIELDS)
+
+    def refresh_corq(assessment):
+        for factor, fields in FACTOR_FIELDS.items():
+            items = [getattr(assessment, f) for f in fields]
+            if factor == "pain":
+                items = [6 - item for item in items]
+            setattr(assessment, f"{factor}_score", sum(items))
+        assessment.total_score = sum(getattr(assessment, f"{factor}_score") for factor in FACTOR_FIELDS)
+
+    _backfill(
+        apps.get_model("health", "CBPIAssessment"),
+        SEVERITY_FIELDS + INTERFERENCE_FIELDS, CBPI_SCORES, refresh_cbpi,
+    )
+    _backfill(
+        apps.get_model("health", "CORQAssessment"),
+        [f for fields in FACTOR_FIELDS.values() for f in fields], CORQ_SCORES, refresh_corq,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0015_live_events"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cbpiassessment",
+            name="pain_severity_score",
+            field=models.FloatField(
+                default=0,
+                editable=False,
+                help_text="Average of pain severity items (PSS). Range 0-10.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="cbpiassessment",
+            name="pain_interference_score",
+            field=models.FloatField(
+                default=0,
+                editable=False,
+                help_text="Average of pain interference items (PIS). Range 0-10.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="corqassessment",
+            name="vitality_score",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Vitality factor score. Range 4-20, higher = better.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="corqassessment",
+            name="companionship_score",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Companionship factor score. Range 4-20, higher = better.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="corqassessment",
+            name="pain_score",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Pain factor score (reverse scored). Range 4-20, higher = less pain = better.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="corqassessment",
+            name="mobility_score",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Mobility factor score. Range 4-20, higher = better.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="corqassessment",
+            name="total_score",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Total CORQ score. Range 16-80, higher = better QoL.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="cbpiassessment",
+            index=models.Index(
+                fields=["dog", "pain_severity_score"], name="health_cbpi_dog_pss_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cbpiassessment",
+            index=models.Index(
+                fields=["dog", "pain_interference_score"], name="health_cbpi_dog_pis_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="corqassessment",
+            index=models.Index(
+                fields=["dog", "total_score"], name="health_corq_dog_total_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 6.0 on 2026-10-17 15:20
+
+import django.core.validators
+import django.db.models.deletion
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# instrument: (model, default cadence in days)
+INSTRUMENTS = {
+    "cbpi": ("CBPIAssessment", 7),
+    "corq": ("CORQAssessment", 14),
+    "nodes": ("LymphNodeMeasurement", 7),
+}
+
+
+def create_schedules(apps, schema_editor):
+    AssessmentSchedule = apps.get_model("health", "AssessmentSchedule")
+    DogProfile = apps.get_model("health", "DogProfile")
+    today = timezone.localdate()
+    schedules = []
+    for instrument, (model_name, cadence) in INSTRUMENTS.items():
+        latest = dict(
+            apps.get_model("health", model_name).objects.order_by()
+            .values("dog").annotate(latest=models.Max("date")).values_list("dog", "latest")
+        )
+        for dog_id in DogProfile.objects.values_list("pk", flat=True):
+            last_done = latest.get(dog_id)
+            schedules.append(AssessmentSchedule(
+                dog_id=dog_id,
+                instrument=instrument,
+                cadence_days=cadence,
+                last_done=last_done,
+                next_due=last_done + timedelta(days=cadence) if last_done else today,
+            ))
+    AssessmentSchedule.objects.bulk_create(schedules, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0016_assessment_scores"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssessmentSchedule",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "instrument",
+                    models.CharField(
+                        choices=[("cbpi", "CBPI Pain"), ("corq", "CORQ QoL"), ("nodes", "Lymph Nodes")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "cadence_days",
+                    models.PositiveIntegerField(
+                        help_text="Days between assessments",
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                ("last_done", models.DateField(blank=True, editable=False, null=True)),
+                ("next_due", models.DateField(editable=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "dog",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="health.dogprofile",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["next_due"],
+                "indexes": [models.Index(fields=["next_due", "dog"], name="health_schedule_due_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("dog", "instrument"), name="unique_schedule_per_instrument")
+                ],
+            },
+        ),
+        migrations.RunPython(create_schedules, migrations.RunPython.noop),
+    ]
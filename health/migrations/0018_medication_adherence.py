@@ -0,0 +1,93 @@
+# Generated by Django 6.0 on 2026-10-17 16:40
+
+import django.db.models.deletion
+from bisect import bisect_right
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+SLOT_HOURS = {"once": [9], "twice": [8, 20], "three": [8, 14, 20], "asNeeded": []}
+ON_TIME_HOURS = 2
+
+
+def _match(slot_hours, hours):
+    if not slot_hours:
+        return 0, 0
+    bounds = [(a + b) / 2 for a, b in zip(slot_hours, slot_hours[1:])]
+    nearest = {}
+    for hour in hours:
+        slot = bisect_right(bounds, hour)
+        gap = abs(hour - slot_hours[slot])
+        nearest[slot] = min(gap, nearest.get(slot, gap))
+    return len(nearest), sum(gap <= ON_TIME_HOURS for gap in nearest.values())
+
+
+def match_doses(apps, schema_editor):
+    Medication = apps.get_model("health", "Medication")
+    MedicationAdherence = apps.get_model("health", "MedicationAdherence")
+    MedicationDose = apps.get_model("health", "MedicationDose")
+    rows = []
+    for medication in Medication.objects.all():
+        days = {}
+        for given_at in MedicationDose.objects.filter(medication=medication).values_list("given_at", flat=True):
+            local = timezone.localtime(given_at)
+            days.setdefault(local.date(), []).append(local.hour + local.minute / 60)
+        for day, hours in days.items():
+            taken, on_time = _match(SLOT_HOURS.get(medication.frequency, []), hours)
+            rows.append(MedicationAdherence(
+                medication=medication, dog_id=medication.dog_id, date=day,
+                doses=len(hours), taken=taken, on_time=on_time,
+            ))
+    MedicationAdherence.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0017_assessment_schedules"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MedicationAdherence",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("doses", models.PositiveIntegerField(default=0)),
+                ("taken", models.PositiveIntegerField(default=0, help_text="Expected slots with a dose")),
+                (
+                    "on_time",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Slots with a dose within two hours of the slot time"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "dog",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="health.dogprofile",
+                    ),
+                ),
+                (
+                    "medication",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="adherence",
+                        to="health.medication",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "indexes": [models.Index(fields=["dog", "date"], name="health_adherence_dog_date_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("medication", "date"), name="unique_adherence_per_day")
+                ],
+            },
+        ),
+        migrations.RunPython(match_doses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0018_medication_adherence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailyentry",
+            name="field_updated_at",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
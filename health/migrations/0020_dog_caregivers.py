@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-17 18:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def share_existing_dogs(apps, schema_editor):
+    """
+    Until now every user could open every dog, so keep that for the
+    profiles and users that already exist; new users start with no access.
+    """
+    DogProfile = apps.get_model("health", "DogProfile")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Caregiver = DogProfile.caregivers.through
+    users = list(User.objects.values_list("pk", flat=True))
+    Caregiver.objects.bulk_create(
+        [
+            Caregiver(dogprofile_id=dog_id, user_id=user_id)
+            for dog_id, owner_id in DogProfile.objects.values_list("pk", "user_id")
+            for user_id in users
+            if user_id != owner_id
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0019_daily_entry_field_stamps"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dogprofile",
+            name="caregivers",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Other users who may view and record this dog's health",
+                related_name="cared_for_dogs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(share_existing_dogs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-17 19:30
+
+from datetime import timedelta
+
+from django.db import migrations
+
+
+# Rating fields averaged into each rollup category, as DailyEntry.CATEGORY_FIELDS
+CATEGORY_FIELDS = {
+    "mood": [
+        "tail_body_language", "interest_people", "interest_environment",
+        "enjoyment_favorites", "overall_spark",
+    ],
+    "appetite": ["appetite", "food_enjoyment"],
+    "energy": ["energy_level", "willingness_move"],
+    "pain": ["pain_signs", "breathing_comfort"],
+}
+DAY_COUNTS = {"yes": "good_days", "mixed": "mixed_days", "no": "bad_days"}
+
+
+def _mean(values):
+    valid = [v for v in values if v is not None]
+    if valid:
+        return round(sum(valid) / len(valid), 1)
+    return None
+
+
+def _start(period, day):
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Recompute every week and month rollup from the stored entries once, so
+    the server no longer rebuilds them on each start (rebuild_rollups is
+    kept for manual repair).
+    """
+    DailyEntry = apps.get_model("health", "DailyEntry")
+    DailyEntryRollup = apps.get_model("health", "DailyEntryRollup")
+    rating_fields = [f for fields in CATEGORY_FIELDS.values() for f in fields]
+    rollups = {}
+    rows = DailyEntry.objects.order_by().values("dog_id", "date", "good_day", "overall_score", *rating_fields)
+    for row in rows.iterator(chunk_size=2000):
+        scores = {category: _mean(row[f] for f in fields) for category, fields in CATEGORY_FIELDS.items()}
+        scores["overall"] = row["overall_score"]
+        for period in ("week", "month"):
+            key = (row["dog_id"], period, _start(period, row["date"]))
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = rollups[key] = DailyEntryRollup(dog_id=key[0], period=period, start=key[2])
+            rollup.entries_count += 1
+            if row["good_day"] in DAY_COUNTS:
+                field = DAY_COUNTS[row["good_day"]]
+                setattr(rollup, field, getattr(rollup, field) + 1)
+            for category, score in scores.items():
+                if score is not None:
+                    setattr(rollup, f"{category}_sum", getattr(rollup, f"{category}_sum") + score)
+                    setattr(rollup, f"{category}_count", getattr(rollup, f"{category}_count") + 1)
+    DailyEntryRollup.objects.all().delete()
+    DailyEntryRollup.objects.bulk_create(rollups.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0020_dog_caregivers"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,33 @@
-from datetime import date
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+from .caching import bump_generation
+
+
+def _mean(values):
+    """Average of the non-empty values rounded to one decimal, or None."""
+    valid = [v for v in values if v is not None]
+    if valid:
+        return round(sum(valid) / len(valid), 1)
+    return None
+
+
+class DogScopedQuerySet(models.QuerySet):
+    """
+    QuerySet for records that belong to one dog.
+
+    Each dated model has a (dog, date) index or unique constraint, so
+    for_dog() reads stay on an index range however many dogs share the
+    instance.
+    """
+
+    def for_dog(self, dog):
+        return self.filter(dog=dog)
 
 
 # Common choices for assessment source
@@ -19,6 +44,30 @@ class DailyEntry(models.Model):
         ('no', 'No'),
     ]
 
+    # Rating fields that feed the stored happiness/overall scores
+    MOOD_FIELDS = [
+        'tail_body_language', 'interest_people', 'interest_environment',
+        'enjoyment_favorites', 'overall_spark',
+    ]
+    RATING_FIELDS = MOOD_FIELDS + [
+        'appetite', 'food_enjoyment', 'nausea_signs', 'weight_condition',
+        'energy_level', 'willingness_move', 'walking_comfort', 'resting_comfort',
+        'breathing_comfort', 'pain_signs', 'sleep_quality', 'response_touch',
+    ]
+    SCORE_FIELDS = ['happiness_score', 'overall_score']
+    # Rating fields grouped into the dashboard categories
+    CATEGORY_FIELDS = {
+        'mood': MOOD_FIELDS,
+        'appetite': ['appetite', 'food_enjoyment'],
+        'energy': ['energy_level', 'willingness_move'],
+        'pain': ['pain_signs', 'breathing_comfort'],
+    }
+    MEAL_FIELDS = ['breakfast', 'lunch', 'dinner', 'treats']
+    NOTE_FIELDS = ['good_notes', 'hard_notes', 'other_notes']
+    # Fields the tracker form may write
+    TRACKED_FIELDS = ['good_day'] + RATING_FIELDS + MEAL_FIELDS + NOTE_FIELDS
+
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -90,40 +139,365 @@ class DailyEntry(models.Model):
     hard_notes = models.TextField(blank=True)
     other_notes = models.TextField(blank=True)
 
+    # Stored averages, kept in sync on save() so trends can run in SQL
+    happiness_score = models.FloatField(
+        null=True, blank=True, editable=False,
+        help_text="Average of the mood fields (1-5)"
+    )
+    overall_score = models.FloatField(
+        null=True, blank=True, editable=False, db_index=True,
+        help_text="Average of all rating fields (1-5)"
+    )
+    # {field: ISO time it was last written}, so offline sync can resolve
+    # conflicts per field instead of against the whole row's updated_at
+    field_updated_at = models.JSONField(default=dict, blank=True, editable=False)
+
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
-        unique_together = ['date']
         verbose_name_plural = 'Daily Entries'
+        constraints = [
+            models.UniqueConstraint(fields=['dog', 'date'], name='unique_daily_entry_per_dog'),
+        ]
+        indexes = [
+            models.Index(fields=['dog', 'date', 'overall_score'], name='health_dail_dog_score_idx'),
+        ]
 
     def __str__(self):
         return f"Entry for {self.date}"
 
-    @property
-    def happiness_score(self):
-        mood_fields = [
-            self.tail_body_language, self.interest_people,
-            self.interest_environment, self.enjoyment_favorites, self.overall_spark
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        entry = super().from_db(db, field_names, values)
+        entry._remember_values()
+        return entry
+
+    def _remember_values(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {f: getattr(self, f) for f in self.TRACKED_FIELDS if f not in deferred}
+
+    def save(self, *args, **kwargs):
+        """
+        Recalculate the stored scores and stamp the changed fields before
+        writing. The write and the rollup refresh (post_save) share one
+        transaction.
+        """
+        self.refresh_scores()
+        update_fields = kwargs.get('update_fields')
+        self.stamp_fields(self.changed_fields(update_fields))
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(self.SCORE_FIELDS) | {'field_updated_at'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._remember_values()
+
+    def changed_fields(self, fields=None):
+        """
+        Tracked fields (of fields, if given) that differ from the loaded
+        values, or from the field defaults for a new entry.
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        deferred = self.get_deferred_fields()
+        return [
+            f for f in self.TRACKED_FIELDS
+            if (fields is None or f in fields) and f not in deferred
+            and getattr(self, f) != loaded.get(f, self._meta.get_field(f).get_default())
         ]
-        valid = [f for f in mood_fields if f is not None]
-        if valid:
-            return round(sum(valid) / len(valid), 1)
-        return None
 
-    @property
-    def overall_score(self):
-        all_fields = [
-            self.tail_body_language, self.interest_people, self.interest_environment,
-            self.enjoyment_favorites, self.overall_spark, self.appetite,
-            self.food_enjoyment, self.nausea_signs, self.weight_condition,
-            self.energy_level, self.willingness_move, self.walking_comfort,
-            self.resting_comfort, self.breathing_comfort, self.pain_signs,
-            self.sleep_quality, self.response_touch
+    def stamp_fields(self, fields, when=None):
+        """Record fields as written at when (default now)."""
+        if fields:
+            when = (when or timezone.now()).isoformat()
+            self.field_updated_at = {**self.field_updated_at, **dict.fromkeys(fields, when)}
+
+    def written_since(self, field, moment):
+        """
+        True if the stored value of field was written at or after moment.
+        Imported fields are stamped with the start of their row's day (see
+        health.imports). Fields never stamped, written before stamps were
+        kept, fall back to the row's updated_at, unless they still hold
+        their default, which means nobody has set them.
+        """
+        stamp = self.field_updated_at.get(field)
+        if stamp:
+            return datetime.fromisoformat(stamp) >= moment
+        if getattr(self, field) == self._meta.get_field(field).get_default():
+            return False
+        return self.updated_at >= moment
+
+    def refresh_scores(self):
+        """
+        Recalculate happiness_score and overall_score from the rating fields.
+
+        Called by save(); bulk_create/bulk_update callers must call it themselves.
+        """
+        self.happiness_score = self._average(self.MOOD_FIELDS)
+        self.overall_score = self._average(self.RATING_FIELDS)
+
+    def _average(self, fields):
+        return _mean(getattr(self, f) for f in fields)
+
+    @classmethod
+    def category_averages(cls, values):
+        """Average of each CATEGORY_FIELDS group from a mapping of rating values."""
+        return {
+            category: _mean(values[f] for f in fields)
+            for category, fields in cls.CATEGORY_FIELDS.items()
+        }
+
+    def category_scores(self):
+        """This entry's category averages plus its stored overall score."""
+        scores = self.category_averages({f: getattr(self, f) for f in self.RATING_FIELDS})
+        scores['overall'] = self.overall_score
+        return scores
+
+    @classmethod
+    def validate_tracked_values(cls, values):
+        """
+        Check submitted tracker values, raising ValueError on unknown
+        fields, ratings outside 1-5, a good_day outside its choices, meals
+        that are not true/false or notes that are not text.
+        """
+        good_days = [''] + [choice for choice, _ in cls.GOOD_DAY_CHOICES]
+        for field, value in values.items():
+            if field not in cls.TRACKED_FIELDS:
+                raise ValueError(f'Unknown field: {field}')
+            if field in cls.RATING_FIELDS and value is not None:
+                if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= 5:
+                    raise ValueError(f'{field} must be between 1 and 5')
+            elif field == 'good_day' and not (isinstance(value, str) and value in good_days):
+                raise ValueError(f'good_day must be one of {", ".join(good_days[1:])} or empty')
+            elif field in cls.MEAL_FIELDS and not isinstance(value, bool):
+                raise ValueError(f'{field} must be true or false')
+            elif field in cls.NOTE_FIELDS and not isinstance(value, str):
+                raise ValueError(f'{field} must be text')
+        return values
+
+    @classmethod
+    def upsert(cls, dog, entry_date, user, values):
+        """
+        Create or update the entry for entry_date with a single
+        INSERT ... ON CONFLICT DO UPDATE, refreshing its rollups in the
+        same transaction and the dog's cached payloads after commit.
+
+        Only the keys in values are written to an existing row. Its stored
+        ratings and field stamps are read under a row lock first, so the
+        scores stay correct and the other fields keep their stamps. A first
+        write of the day has nothing to lock, so it rereads the row after
+        the insert and fixes the scores if another writer got there first.
+        """
+        entry = cls(dog=dog, date=entry_date, user=user, **values)
+        missing = [f for f in cls.RATING_FIELDS if f not in values]
+        with transaction.atomic():
+            row = cls.objects.select_for_update().filter(dog=dog, date=entry_date)
+            current = row.values('field_updated_at', *missing).first()
+            entry.field_updated_at = (current or {}).pop('field_updated_at', {})
+            for field, value in (current or {}).items():
+                setattr(entry, field, value)
+            entry.stamp_fields(values)
+            entry.refresh_scores()
+            cls.objects.bulk_create(
+                [entry],
+                update_conflicts=True,
+                unique_fields=['dog', 'date'],
+                update_fields=[*values, 'user', 'updated_at', *cls.SCORE_FIELDS] + (
+                    ['field_updated_at'] if current is not None else []
+                ),
+            )
+            if current is None:
+                # There was no row to lock, so a concurrent first write of
+                # the day may have inserted one in the meantime and the
+                # conflict update merged only our fields into it. Recompute
+                # the scores from the stored ratings and merge our stamps.
+                stored = row.values(*cls.RATING_FIELDS, *cls.SCORE_FIELDS, 'field_updated_at').get()
+                for field in cls.RATING_FIELDS:
+                    setattr(entry, field, stored[field])
+                entry.field_updated_at = {
+                    **stored['field_updated_at'], **{f: entry.field_updated_at[f] for f in values},
+                }
+                entry.refresh_scores()
+                fixed = {f: getattr(entry, f) for f in [*cls.SCORE_FIELDS, 'field_updated_at']}
+                if fixed != {f: stored[f] for f in fixed}:
+                    row.update(**fixed)
+            DailyEntryRollup.refresh_for_dates(dog.pk, [entry_date])
+            bump_generation(dog.pk)
+        return entry
+
+
+
+class DailyEntryRollup(models.Model):
+    """
+    Weekly and monthly totals of daily entries.
+
+    Rows are recomputed from the entries of the affected periods whenever
+    an entry is written or deleted, so summary views read one row instead
+    of counting entries on every page load. Category scores are stored as
+    sum/count pairs; use average() to read them.
+    """
+    PERIOD_CHOICES = [
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+    SCORE_CATEGORIES = ['overall', *DailyEntry.CATEGORY_FIELDS]
+    TOTAL_FIELDS = ['entries_count', 'good_days', 'mixed_days', 'bad_days'] + [
+        f'{category}_{part}' for category in SCORE_CATEGORIES for part in ('sum', 'count')
+    ]
+
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    start = models.DateField(help_text="Monday of the week or first day of the month")
+
+    entries_count = models.PositiveIntegerField(default=0)
+    good_days = models.PositiveIntegerField(default=0)
+    mixed_days = models.PositiveIntegerField(default=0)
+    bad_days = models.PositiveIntegerField(default=0)
+
+    overall_sum = models.FloatField(default=0)
+    overall_count = models.PositiveIntegerField(default=0)
+    mood_sum = models.FloatField(default=0)
+    mood_count = models.PositiveIntegerField(default=0)
+    appetite_sum = models.FloatField(default=0)
+    appetite_count = models.PositiveIntegerField(default=0)
+    energy_sum = models.FloatField(default=0)
+    energy_count = models.PositiveIntegerField(default=0)
+    pain_sum = models.FloatField(default=0)
+    pain_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DogScopedQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['period', '-start']
+        constraints = [
+            models.UniqueConstraint(fields=['dog', 'period', 'start'], name='unique_rollup_per_dog'),
         ]
-        valid = [f for f in all_fields if f is not None]
-        if valid:
-            return round(sum(valid) / len(valid), 1)
+
+    def __str__(self):
+        return f"{self.get_period_display()} of {self.start}"
+
+    @property
+    def rated_days(self):
+        """Days with a good/mixed/bad answer."""
+        return self.good_days + self.mixed_days + self.bad_days
+
+    @property
+    def good_day_percent(self):
+        if self.rated_days:
+            return round(self.good_days / self.rated_days * 100)
+        return 0
+
+    def average(self, category):
+        """Average daily score for a category over the period, or None."""
+        count = getattr(self, f'{category}_count')
+        if count:
+            return round(getattr(self, f'{category}_sum') / count, 1)
         return None
 
+    def reset(self):
+        for field in self.TOTAL_FIELDS:
+            setattr(self, field, 0)
+
+    def add_entry(self, row):
+        """Add one entry (a dict of DailyEntry values) to the totals."""
+        self.entries_count += 1
+        if row['good_day'] == 'yes':
+            self.good_days += 1
+        elif row['good_day'] == 'mixed':
+            self.mixed_days += 1
+        elif row['good_day'] == 'no':
+            self.bad_days += 1
+
+        scores = DailyEntry.category_averages(row)
+        scores['overall'] = row['overall_score']
+        for category, score in scores.items():
+            if score is not None:
+                setattr(self, f'{category}_sum', getattr(self, f'{category}_sum') + score)
+                setattr(self, f'{category}_count', getattr(self, f'{category}_count') + 1)
+
+    @staticmethod
+    def period_start(period, day):
+        if period == 'week':
+            return day - timedelta(days=day.weekday())
+        return day.replace(day=1)
+
+    @staticmethod
+    def period_end(period, start):
+        """First day after the period."""
+        if period == 'week':
+            return start + timedelta(days=7)
+        return (start + timedelta(days=32)).replace(day=1)
+
+    @classmethod
+    def for_date(cls, dog, period, day):
+        """The dog's rollup covering day, or an empty unsaved one."""
+        start = cls.period_start(period, day)
+        return cls.objects.for_dog(dog).filter(period=period, start=start).first() or cls(
+            dog=dog, period=period, start=start
+        )
+
+    @classmethod
+    def refresh_for_dates(cls, dog_id, dates):
+        """
+        Recompute the dog's week and month rollups covering dates.
+
+        The rollup rows are created if needed and locked before the entries
+        are read, so concurrent refreshes of the same period run one after
+        the other and the last one sees every committed entry.
+        """
+        keys = {
+            (period, cls.period_start(period, day))
+            for day in set(dates) for period in ('week', 'month')
+        }
+        if not keys:
+            return
+        starts = {period: [s for p, s in keys if p == period] for period in ('week', 'month')}
+        low = min(start for _, start in keys)
+        high = max(cls.period_end(period, start) for period, start in keys)
+        rating_fields = [f for fields in DailyEntry.CATEGORY_FIELDS.values() for f in fields]
+
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [cls(dog_id=dog_id, period=period, start=start) for period, start in keys],
+                ignore_conflicts=True,
+            )
+            rollups = {
+                (r.period, r.start): r
+                for r in cls.objects.select_for_update().filter(dog_id=dog_id).filter(
+                    models.Q(period='week', start__in=starts['week'])
+                    | models.Q(period='month', start__in=starts['month'])
+                )
+            }
+            for rollup in rollups.values():
+                rollup.reset()
+            rows = DailyEntry.objects.filter(
+                dog_id=dog_id, date__gte=low, date__lt=high
+            ).values(
+                'date', 'good_day', 'overall_score', *rating_fields
+            )
+            for row in rows:
+                for period in ('week', 'month'):
+                    rollup = rollups.get((period, cls.period_start(period, row['date'])))
+                    if rollup is not None:
+                        rollup.add_entry(row)
+            now = timezone.now()
+            for rollup in rollups.values():
+                rollup.updated_at = now
+            cls.objects.bulk_update(rollups.values(), cls.TOTAL_FIELDS + ['updated_at'])
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every rollup from scratch. Returns the number of rows."""
+        with transaction.atomic():
+            cls.objects.all().delete()
+            dates = {}
+            for dog_id, day in DailyEntry.objects.values_list('dog_id', 'date'):
+                dates.setdefault(dog_id, []).append(day)
+            for dog_id, days in dates.items():
+                cls.refresh_for_dates(dog_id, days)
+        return cls.objects.count()
+
 
 class Medication(models.Model):
     FREQUENCY_CHOICES = [
@@ -132,7 +506,10 @@ class Medication(models.Model):
         ('three', 'Three times daily'),
         ('asNeeded', 'As needed'),
     ]
+    # Local hour of each expected dose; as-needed medications have none
+    SLOT_HOURS = {'once': [9], 'twice': [8, 20], 'three': [8, 14, 20], 'asNeeded': []}
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     dosage = models.CharField(max_length=50)
     frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
@@ -140,9 +517,22 @@ class Medication(models.Model):
     active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.dosage})"
 
+    @property
+    def slot_hours(self):
+        return self.SLOT_HOURS.get(self.frequency, [])
+
+
+class MedicationDoseQuerySet(models.QuerySet):
+    """Doses belong to a dog through their medication."""
+
+    def for_dog(self, dog):
+        return self.filter(medication__dog=dog)
+
 
 class MedicationDose(models.Model):
     medication = models.ForeignKey(Medication, on_delete=models.CASCADE, related_name='doses')
@@ -150,6 +540,8 @@ class MedicationDose(models.Model):
     given_at = models.DateTimeField()
     notes = models.TextField(blank=True)
 
+    objects = MedicationDoseQuerySet.as_manager()
+
     class Meta:
         ordering = ['-given_at']
 
@@ -157,6 +549,116 @@ class MedicationDose(models.Model):
         return f"{self.medication.name} at {self.given_at}"
 
 
+class MedicationAdherence(models.Model):
+    """
+    One medication's logged doses matched to its expected slots on a day.
+
+    The day is split into one interval per slot at the midpoints between
+    slot hours, and each dose counts for the slot whose interval holds
+    its local time. A slot is taken if it holds a dose and on time if one
+    came within ON_TIME_HOURS of the slot hour. Rows exist only for days
+    with doses and are recomputed when doses or the medication change, so
+    adherence views read them instead of matching doses on every request.
+    """
+    ON_TIME_HOURS = 2
+
+    medication = models.ForeignKey(
+        Medication, on_delete=models.CASCADE, related_name='adherence', db_index=False
+    )
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
+    date = models.DateField()
+    doses = models.PositiveIntegerField(default=0)
+    taken = models.PositiveIntegerField(default=0, help_text="Expected slots with a dose")
+    on_time = models.PositiveIntegerField(
+        default=0, help_text="Slots with a dose within two hours of the slot time"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DogScopedQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['medication', 'date'], name='unique_adherence_per_day'),
+        ]
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_adherence_dog_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Adherence on {self.date}"
+
+    @classmethod
+    def match(cls, slot_hours, hours):
+        """(taken, on_time) for one day's doses, given as local hours."""
+        if not slot_hours:
+            return 0, 0
+        bounds = [(a + b) / 2 for a, b in zip(slot_hours, slot_hours[1:])]
+        nearest = {}
+        for hour in hours:
+            slot = bisect_right(bounds, hour)
+            gap = abs(hour - slot_hours[slot])
+            nearest[slot] = min(gap, nearest.get(slot, gap))
+        return len(nearest), sum(gap <= cls.ON_TIME_HOURS for gap in nearest.values())
+
+    @classmethod
+    def _rows(cls, medication, doses):
+        """Unsaved rows from the given_at times of the medication's doses."""
+        days = {}
+        for given_at in doses:
+            local = timezone.localtime(given_at)
+            days.setdefault(local.date(), []).append(local.hour + local.minute / 60)
+        rows = []
+        for day, hours in days.items():
+            taken, on_time = cls.match(medication.slot_hours, hours)
+            rows.append(cls(
+                medication=medication, dog_id=medication.dog_id, date=day,
+                doses=len(hours), taken=taken, on_time=on_time,
+            ))
+        return rows
+
+    @classmethod
+    def _store(cls, medication, rows, dates=None):
+        """Upsert rows and drop the medication's other rows on dates (all of them if None)."""
+        with transaction.atomic():
+            stale = cls.objects.filter(medication=medication)
+            if dates is not None:
+                stale = stale.filter(date__in=dates)
+            stale.exclude(date__in=[row.date for row in rows]).delete()
+            cls.objects.bulk_create(
+                rows, batch_size=500, update_conflicts=True, unique_fields=['medication', 'date'],
+                update_fields=['doses', 'taken', 'on_time', 'updated_at'],
+            )
+
+    @classmethod
+    def refresh_for_dates(cls, medication, dates):
+        """Recompute the medication's rows for the given local days."""
+        dates = set(dates)
+        if not dates:
+            return
+        doses = MedicationDose.objects.filter(
+            medication=medication,
+            given_at__gte=timezone.make_aware(datetime.combine(min(dates), time.min)),
+            given_at__lt=timezone.make_aware(datetime.combine(max(dates) + timedelta(days=1), time.min)),
+        ).values_list('given_at', flat=True)
+        cls._store(medication, [row for row in cls._rows(medication, doses) if row.date in dates], dates)
+
+    @classmethod
+    def refresh_medication(cls, medication):
+        """Recompute every row of the medication, e.g. after its frequency changed."""
+        doses = MedicationDose.objects.filter(medication=medication).values_list('given_at', flat=True)
+        cls._store(medication, cls._rows(medication, doses))
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every row from scratch. Returns the number of rows."""
+        with transaction.atomic():
+            cls.objects.all().delete()
+            for medication in Medication.objects.all():
+                cls.refresh_medication(medication)
+        return cls.objects.count()
+
+
 class LymphNodeMeasurement(models.Model):
     STATUS_CHOICES = [
         ('smaller', 'Smaller'),
@@ -164,9 +666,13 @@ class LymphNodeMeasurement(models.Model):
         ('larger', 'Larger'),
     ]
 
+    NODE_FIELDS = ['mandibular_left', 'mandibular_right', 'popliteal_left', 'popliteal_right']
+
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     source = models.CharField(
         max_length=10, choices=SOURCE_CHOICES, default='home',
         help_text="Where this measurement was taken"
@@ -192,12 +698,38 @@ class LymphNodeMeasurement(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, blank=True)
     notes = models.TextField(blank=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dog', 'date', 'source'], name='unique_node_measurement_per_dog'
+            ),
+        ]
 
     def __str__(self):
         return f"Node measurement on {self.date}"
 
+    @classmethod
+    def upsert(cls, dog, measurement_date, user, values, source='home'):
+        """
+        Create or update the dog's measurement for (measurement_date, source)
+        with a single INSERT ... ON CONFLICT DO UPDATE of the submitted fields.
+        bulk_create sends no post_save, so the nodes schedule is moved here.
+        """
+        measurement = cls(dog=dog, date=measurement_date, user=user, source=source, **values)
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [measurement],
+                update_conflicts=True,
+                unique_fields=['dog', 'date', 'source'],
+                update_fields=[*values, 'user', 'updated_at'],
+            )
+            AssessmentSchedule.refresh(dog.pk, 'nodes')
+        bump_generation(dog.pk)
+        return measurement
+
 
 class CBPIAssessment(models.Model):
     """
@@ -221,10 +753,18 @@ class CBPIAssessment(models.Model):
         (4, 'Very Good'),
         (5, 'Excellent'),
     ]
+    SEVERITY_FIELDS = ['worst_pain', 'least_pain', 'average_pain', 'current_pain']
+    INTERFERENCE_FIELDS = [
+        'general_activity', 'enjoyment_of_life', 'ability_to_rise',
+        'ability_to_walk', 'ability_to_run', 'ability_to_climb',
+    ]
+    SCORE_FIELDS = ['pain_severity_score', 'pain_interference_score']
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     source = models.CharField(
         max_length=10, choices=SOURCE_CHOICES, default='home',
         help_text="Where this assessment was completed"
@@ -282,28 +822,50 @@ class CBPIAssessment(models.Model):
 
     notes = models.TextField(blank=True)
 
+    # Stored factor scores, kept in sync on save() so charts and filters run in SQL
+    pain_severity_score = models.FloatField(
+        editable=False,
+        help_text="Average of pain severity items (PSS). Range 0-10."
+    )
+    pain_interference_score = models.FloatField(
+        editable=False,
+        help_text="Average of pain interference items (PIS). Range 0-10."
+    )
+
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
         verbose_name = 'CBPI Assessment'
         verbose_name_plural = 'CBPI Assessments'
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_cbpi_dog_date_idx'),
+            models.Index(fields=['dog', 'pain_severity_score'], name='health_cbpi_dog_pss_idx'),
+            models.Index(fields=['dog', 'pain_interference_score'], name='health_cbpi_dog_pis_idx'),
+        ]
 
     def __str__(self):
         return f"CBPI Assessment on {self.date}"
 
-    @property
-    def pain_severity_score(self):
-        """Average of pain severity items (PSS). Range 0-10."""
-        items = [self.worst_pain, self.least_pain, self.average_pain, self.current_pain]
-        return round(sum(items) / len(items), 2)
+    def save(self, *args, **kwargs):
+        """Recalculate the stored factor scores before writing."""
+        self.refresh_scores()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(self.SCORE_FIELDS)
+        super().save(*args, **kwargs)
 
-    @property
-    def pain_interference_score(self):
-        """Average of pain interference items (PIS). Range 0-10."""
-        items = [
-            self.general_activity, self.enjoyment_of_life, self.ability_to_rise,
-            self.ability_to_walk, self.ability_to_run, self.ability_to_climb
-        ]
-        return round(sum(items) / len(items), 2)
+    def refresh_scores(self):
+        """
+        Recalculate PSS and PIS from the items.
+
+        Called by save(); bulk_create/bulk_update callers must call it themselves.
+        """
+        self.pain_severity_score = self._average(self.SEVERITY_FIELDS)
+        self.pain_interference_score = self._average(self.INTERFERENCE_FIELDS)
+
+    def _average(self, fields):
+        return round(sum(getattr(self, f) for f in fields) / len(fields), 2)
 
 
 class CORQAssessment(models.Model):
@@ -332,10 +894,21 @@ class CORQAssessment(models.Model):
         (4, 'Often'),
         (5, 'Always'),
     ]
-
+    FACTOR_FIELDS = {
+        'vitality': ['energy_level', 'playfulness', 'interest_in_surroundings', 'appetite'],
+        'companionship': ['seeks_attention', 'enjoys_interaction', 'greets_family', 'tail_wagging'],
+        'pain': ['shows_pain', 'vocalizes_pain', 'avoids_touch', 'pants_restless'],
+        'mobility': ['walks_normally', 'rises_easily', 'climbs_stairs', 'jumps'],
+    }
+    # Factors whose items are reverse scored (higher frequency = worse)
+    REVERSED_FACTORS = {'pain'}
+    SCORE_FIELDS = ['vitality_score', 'companionship_score', 'pain_score', 'mobility_score', 'total_score']
+
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     source = models.CharField(
         max_length=10, choices=SOURCE_CHOICES, default='home',
         help_text="Where this assessment was completed"
@@ -421,43 +994,59 @@ class CORQAssessment(models.Model):
 
     notes = models.TextField(blank=True)
 
+    # Stored factor scores, kept in sync on save() so charts and filters run in SQL
+    vitality_score = models.IntegerField(
+        editable=False, help_text="Vitality factor score. Range 4-20, higher = better."
+    )
+    companionship_score = models.IntegerField(
+        editable=False, help_text="Companionship factor score. Range 4-20, higher = better."
+    )
+    pain_score = models.IntegerField(
+        editable=False,
+        help_text="Pain factor score (reverse scored). Range 4-20, higher = less pain = better."
+    )
+    mobility_score = models.IntegerField(
+        editable=False, help_text="Mobility factor score. Range 4-20, higher = better."
+    )
+    total_score = models.IntegerField(
+        editable=False, help_text="Total CORQ score. Range 16-80, higher = better QoL."
+    )
+
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
         verbose_name = 'CORQ Assessment'
         verbose_name_plural = 'CORQ Assessments'
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_corq_dog_date_idx'),
+            models.Index(fields=['dog', 'total_score'], name='health_corq_dog_total_idx'),
+        ]
 
     def __str__(self):
         return f"CORQ Assessment on {self.date}"
 
-    @property
-    def vitality_score(self):
-        """Vitality factor score. Range 4-20, higher = better."""
-        items = [self.energy_level, self.playfulness, self.interest_in_surroundings, self.appetite]
-        return sum(items)
-
-    @property
-    def companionship_score(self):
-        """Companionship factor score. Range 4-20, higher = better."""
-        items = [self.seeks_attention, self.enjoys_interaction, self.greets_family, self.tail_wagging]
-        return sum(items)
-
-    @property
-    def pain_score(self):
-        """Pain factor score (reverse scored). Range 4-20, higher = less pain = better."""
-        items = [self.shows_pain, self.vocalizes_pain, self.avoids_touch, self.pants_restless]
-        # Reverse score: 6 - item_score converts 1->5, 2->4, 3->3, 4->2, 5->1
-        return sum(6 - item for item in items)
+    def save(self, *args, **kwargs):
+        """Recalculate the stored factor scores before writing."""
+        self.refresh_scores()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(self.SCORE_FIELDS)
+        super().save(*args, **kwargs)
 
-    @property
-    def mobility_score(self):
-        """Mobility factor score. Range 4-20, higher = better."""
-        items = [self.walks_normally, self.rises_easily, self.climbs_stairs, self.jumps]
-        return sum(items)
+    def refresh_scores(self):
+        """
+        Recalculate the four factor scores and the total from the items.
 
-    @property
-    def total_score(self):
-        """Total CORQ score. Range 16-80, higher = better QoL."""
-        return self.vitality_score + self.companionship_score + self.pain_score + self.mobility_score
+        Called by save(); bulk_create/bulk_update callers must call it themselves.
+        """
+        for factor, fields in self.FACTOR_FIELDS.items():
+            items = [getattr(self, f) for f in fields]
+            if factor in self.REVERSED_FACTORS:
+                # Reverse score: 6 - item_score converts 1->5, 2->4, 3->3, 4->2, 5->1
+                items = [6 - item for item in items]
+            setattr(self, f'{factor}_score', sum(items))
+        self.total_score = self.vitality_score + self.companionship_score + self.pain_score + self.mobility_score
 
 
 class VCOGCTCAEEvent(models.Model):
@@ -529,9 +1118,11 @@ class VCOGCTCAEEvent(models.Model):
         ('other', 'Other'),
     ]
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     source = models.CharField(
         max_length=10, choices=SOURCE_CHOICES, default='home',
         help_text="Where this event was observed/reported"
@@ -553,24 +1144,44 @@ class VCOGCTCAEEvent(models.Model):
 
     notes = models.TextField(blank=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
         verbose_name = 'VCOG-CTCAE Event'
         verbose_name_plural = 'VCOG-CTCAE Events'
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_event_dog_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_event_display()} (Grade {self.grade}) on {self.date}"
 
 
+class DogProfileQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Dogs the user owns or is a caregiver of."""
+        return self.filter(
+            models.Q(user=user)
+            | models.Q(pk__in=DogProfile.caregivers.through.objects.filter(user=user).values('dogprofile_id'))
+        )
+
+
 class DogProfile(models.Model):
     """
-    Dog profile for calculating nutritional targets based on body weight.
+    A dog being tracked. Every health record belongs to one dog; the
+    profile's weight drives the nutritional targets. Only the owner and
+    the caregivers listed on the profile can see or record its health.
 
     Nutritional calculations based on:
     - Ogilvie GK et al. Cancer. 2000;88(8):1916-1928. (EPA/DHA dosing)
     - Case LP et al. Canine and Feline Nutrition. 3rd ed. 2011. (general nutrition)
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    caregivers = models.ManyToManyField(
+        User, blank=True, related_name='cared_for_dogs',
+        help_text="Other users who may view and record this dog's health"
+    )
     name = models.CharField(max_length=100, default='Bruno')
     weight_kg = models.DecimalField(
         max_digits=5, decimal_places=2,
@@ -583,6 +1194,8 @@ class DogProfile(models.Model):
     )
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DogProfileQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.weight_kg} kg)"
 
@@ -665,6 +1278,7 @@ class Food(models.Model):
 
     notes = models.TextField(blank=True)
     warning = models.TextField(blank=True, help_text="Warning message if status is limited/avoid")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['category', 'name']
@@ -696,11 +1310,13 @@ class Meal(models.Model):
         ('refused', 'Refused to eat'),
     ]
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     meal_type = models.CharField(max_length=20, choices=MEAL_TYPE_CHOICES)
     time = models.TimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Appetite tracking
     appetite = models.CharField(max_length=20, choices=APPETITE_CHOICES, blank=True)
@@ -709,8 +1325,13 @@ class Meal(models.Model):
 
     notes = models.TextField(blank=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date', '-time']
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_meal_dog_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_meal_type_display()} on {self.date}"
@@ -753,6 +1374,7 @@ class MealItem(models.Model):
     amount_g = models.IntegerField(help_text="Amount in grams")
     amount_display = models.CharField(max_length=50, blank=True,
         help_text="Human readable amount (e.g., '2 eggs', '1 cup')")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         name = self.food.name if self.food else self.custom_food_name
@@ -780,6 +1402,7 @@ class SupplementDose(models.Model):
         ('other', 'Other'),
     ]
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     supplement_type = models.CharField(max_length=20, choices=SUPPLEMENT_CHOICES)
@@ -797,8 +1420,13 @@ class SupplementDose(models.Model):
 
     notes = models.TextField(blank=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date', 'supplement_type']
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_supp_dog_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_supplement_type_display()} on {self.date}"
@@ -821,8 +1449,9 @@ class DailyNutritionSummary(models.Model):
     - Fat: 30-50% of calories
     - Carbs: <15-25% (ideally near zero)
     """
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    date = models.DateField(unique=True)
+    date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -852,10 +1481,15 @@ class DailyNutritionSummary(models.Model):
 
     notes = models.TextField(blank=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
         verbose_name = 'Daily Nutrition Summary'
         verbose_name_plural = 'Daily Nutrition Summaries'
+        constraints = [
+            models.UniqueConstraint(fields=['dog', 'date'], name='unique_nutrition_summary_per_dog'),
+        ]
 
     def __str__(self):
         return f"Nutrition Summary for {self.date}"
@@ -882,6 +1516,7 @@ class TreatmentSession(models.Model):
         ('other', 'Other'),
     ]
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -906,10 +1541,15 @@ class TreatmentSession(models.Model):
 
     notes = models.TextField(blank=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
         verbose_name = 'Treatment Session'
         verbose_name_plural = 'Treatment Sessions'
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_treat_dog_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_treatment_type_display()} - {self.agent or self.protocol} on {self.date}"
@@ -963,6 +1603,7 @@ class MedicalRecord(models.Model):
         ('other', 'Other'),
     ]
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField(help_text="Date of the test/report")
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -990,10 +1631,15 @@ class MedicalRecord(models.Model):
 
     notes = models.TextField(blank=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date', '-uploaded_at']
         verbose_name = 'Medical Record'
         verbose_name_plural = 'Medical Records'
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_record_dog_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_record_type_display()} - {self.date}"
@@ -1042,6 +1688,7 @@ class LabValue(models.Model):
         ('other', 'Other'),
     ]
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     medical_record = models.ForeignKey(
         MedicalRecord, on_delete=models.CASCADE,
@@ -1049,6 +1696,7 @@ class LabValue(models.Model):
     )
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     test_name = models.CharField(max_length=30, choices=LAB_TEST_CHOICES)
     custom_test_name = models.CharField(max_length=100, blank=True,
@@ -1079,10 +1727,15 @@ class LabValue(models.Model):
 
     notes = models.TextField(blank=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date', 'test_name']
         verbose_name = 'Lab Value'
         verbose_name_plural = 'Lab Values'
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_lab_dog_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_test_name_display()}: {self.value} {self.unit} ({self.date})"
@@ -1171,6 +1824,7 @@ class TimelineEntry(models.Model):
         ('cancelled', 'Cancelled'),
     ]
 
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     time = models.TimeField(null=True, blank=True)
@@ -1201,10 +1855,15 @@ class TimelineEntry(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DogScopedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date', '-time', '-created_at']
         verbose_name = 'Timeline Entry'
         verbose_name_plural = 'Timeline Entries'
+        indexes = [
+            models.Index(fields=['dog', 'date'], name='health_timeline_dog_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.title}"
@@ -1276,3 +1935,123 @@ class TimelineAttachment(models.Model):
 
     def filename(self):
         return self.file.name.split('/')[-1] if self.file else ''
+
+
+class LiveEvent(models.Model):
+    """
+    A change pushed to the household's open pages (see health.live).
+    The auto-increment id is the event id browsers resume from.
+    """
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
+    kind = models.CharField(max_length=20)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = DogScopedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['dog', 'id'], name='health_liveevent_dog_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} event {self.pk}"
+
+
+class AssessmentScheduleQuerySet(DogScopedQuerySet):
+    def due(self, today=None):
+        """Schedules due by today across all dogs, most overdue first, from the next_due index."""
+        return self.filter(next_due__lte=today or timezone.localdate()).order_by('next_due')
+
+
+class AssessmentSchedule(models.Model):
+    """
+    When each validated assessment is next due for a dog.
+
+    next_due is recomputed on save() from last_done and the cadence, and
+    refresh() moves last_done whenever the dog's records of the
+    instrument change (see health.signals), so due and overdue reminders
+    for every dog are one range query on next_due (due()). An instrument
+    never done, or whose records were all deleted, is due from the day
+    its schedule was created or emptied.
+    """
+    INSTRUMENT_CHOICES = [
+        ('cbpi', 'CBPI Pain'),
+        ('corq', 'CORQ QoL'),
+        ('nodes', 'Lymph Nodes'),
+    ]
+    DEFAULT_CADENCES = {'cbpi': 7, 'corq': 14, 'nodes': 7}
+    INSTRUMENT_MODELS = {
+        'cbpi': CBPIAssessment,
+        'corq': CORQAssessment,
+        'nodes': LymphNodeMeasurement,
+    }
+
+    dog = models.ForeignKey('DogProfile', on_delete=models.CASCADE, db_index=False)
+    instrument = models.CharField(max_length=10, choices=INSTRUMENT_CHOICES)
+    cadence_days = models.PositiveIntegerField(
+        validators=[MinValueValidator(1)],
+        help_text="Days between assessments"
+    )
+    last_done = models.DateField(null=True, blank=True, editable=False)
+    next_due = models.DateField(editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AssessmentScheduleQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['next_due']
+        constraints = [
+            models.UniqueConstraint(fields=['dog', 'instrument'], name='unique_schedule_per_instrument'),
+        ]
+        indexes = [
+            models.Index(fields=['next_due', 'dog'], name='health_schedule_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_instrument_display()} due {self.next_due}"
+
+    def save(self, *args, **kwargs):
+        """Recalculate next_due before writing."""
+        if self.last_done:
+            self.next_due = self.last_done + timedelta(days=self.cadence_days)
+        elif not self.next_due:
+            self.next_due = timezone.localdate()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'next_due'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def create_for_dog(cls, dog_id):
+        """The default schedules for a new dog, all due today."""
+        cls.objects.bulk_create([
+            cls(dog_id=dog_id, instrument=instrument, cadence_days=cadence, next_due=timezone.localdate())
+            for instrument, cadence in cls.DEFAULT_CADENCES.items()
+        ], ignore_conflicts=True)
+
+    @classmethod
+    def refresh(cls, dog_id, instrument, create=True):
+        """
+        Move last_done to the dog's latest record of the instrument.
+
+        Called from post_save and post_delete (with create=False, so a dog
+        being deleted gets no new schedule); bulk writers call it
+        themselves.
+        """
+        last_done = cls.INSTRUMENT_MODELS[instrument].objects.filter(
+            dog_id=dog_id
+        ).aggregate(latest=models.Max('date'))['latest']
+        schedule = cls.objects.filter(dog_id=dog_id, instrument=instrument).first()
+        if schedule is None:
+            if create:
+                cls(
+                    dog_id=dog_id, instrument=instrument,
+                    cadence_days=cls.DEFAULT_CADENCES[instrument], last_done=last_done,
+                ).save()
+        elif schedule.last_done != last_done:
+            schedule.last_done = last_done
+            if last_done is None:
+                # Nothing left to count from, so it is due again from today
+                schedule.next_due = timezone.localdate()
+            schedule.save(update_fields=['last_done', 'updated_at'])
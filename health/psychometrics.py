@@ -0,0 +1,152 @@
+"""
+Psychometric summaries of the CBPI and CORQ history, for the oncologist.
+
+Each instrument's history is read as an item matrix (one row per
+assessment, one column per item, plus the stored factor scores) with a
+single values_list query. From it:
+
+- Cronbach's alpha per factor, k/(k-1) * (1 - sum of item variances /
+  variance of the factor total);
+- corrected item-total correlations: each item against the sum of the
+  other items of its factor;
+- change from baseline (the first assessment) for every later one, with
+  flags where the change is clinically meaningful. For CBPI these are
+  the treatment-success thresholds of Brown et al. (2013): PSS down by
+  at least 1 and PIS down by at least 2. CORQ has no published minimal
+  important difference, so a change of at least half the standard
+  deviation of the dog's own totals is flagged (Norman et al., 2003).
+
+A dog's history is a few hundred assessments at most, so the matrix is
+plain lists. cached_psychometrics() keeps the result under the dog's
+cache generation (see health.caching).
+"""
+from statistics import mean, pstdev, pvariance
+
+from django.core.cache import cache
+
+from .caching import generation
+from .charts import CBPI_COLUMNS, CORQ_COLUMNS
+from .models import CBPIAssessment, CORQAssessment
+
+PSYCHOMETRICS_TIMEOUT = 60 * 60 * 24
+
+# instrument: (model, {factor: items}, {column: stored score}, reverse scored factors)
+INSTRUMENTS = {
+    'cbpi': (
+        CBPIAssessment,
+        {'severity': CBPIAssessment.SEVERITY_FIELDS, 'interference': CBPIAssessment.INTERFERENCE_FIELDS},
+        CBPI_COLUMNS,
+        set(),
+    ),
+    'corq': (CORQAssessment, CORQAssessment.FACTOR_FIELDS, CORQ_COLUMNS, CORQAssessment.REVERSED_FACTORS),
+}
+
+# CBPI column: (change that counts, True if a fall is the improvement)
+CBPI_THRESHOLDS = {'severity': (1, True), 'interference': (2, True)}
+HALF_SD = 0.5
+
+
+def cronbach_alpha(columns):
+    """Alpha of the item columns, or None with fewer than two items or no spread in the totals."""
+    k = len(columns)
+    if k < 2 or len(columns[0]) < 2:
+        return None
+    totals = [sum(row) for row in zip(*columns)]
+    total_variance = pvariance(totals)
+    if not total_variance:
+        return None
+    return round(k / (k - 1) * (1 - sum(pvariance(column) for column in columns) / total_variance), 3)
+
+
+def correlation(xs, ys):
+    """Pearson's r, or None when either side is constant."""
+    if len(xs) < 2:
+        return None
+    mean_x, mean_y = mean(xs), mean(ys)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    if not sxx or not syy:
+        return None
+    return round(sxy / (sxx * syy) ** 0.5, 3)
+
+
+def item_total(columns, items):
+    """{item: correlation with the sum of the factor's other items}."""
+    results = {}
+    for i, item in enumerate(items):
+        rest = [sum(row) - row[i] for row in zip(*columns)]
+        results[item] = correlation(columns[i], rest)
+    return results
+
+
+def _thresholds(instrument, scores):
+    if instrument == 'cbpi':
+        return CBPI_THRESHOLDS
+    spread = pstdev(scores['total']) if len(scores['total']) > 1 else 0
+    return {'total': (round(HALF_SD * spread, 2), False)} if spread else {}
+
+
+def changes(instrument, dates, scores):
+    """
+    The baseline and, for each later assessment, its change per score
+    column and flags ({column: 'improved' or 'worsened'}) where a change
+    reaches the threshold.
+    """
+    if not dates:
+        return None, []
+    thresholds = _thresholds(instrument, scores)
+    baseline = {column: values[0] for column, values in scores.items()}
+    rows = []
+    for i, day in enumerate(dates[1:], 1):
+        change = {column: round(values[i] - baseline[column], 2) for column, values in scores.items()}
+        flags = {}
+        for column, (threshold, falls) in thresholds.items():
+            improvement = -change[column] if falls else change[column]
+            if improvement >= threshold:
+                flags[column] = 'improved'
+            elif -improvement >= threshold:
+                flags[column] = 'worsened'
+        rows.append({
+            'date': day.isoformat(),
+            'scores': {column: values[i] for column, values in scores.items()},
+            'change': change,
+            'flags': flags,
+        })
+    return {'date': dates[0].isoformat(), 'scores': baseline}, rows
+
+
+def analyse(dog, instrument):
+    """Reliability, item-total correlations and changes from baseline for one instrument."""
+    model, factors, columns, reversed_factors = INSTRUMENTS[instrument]
+    items = [item for fields in factors.values() for item in fields]
+    rows = list(model.objects.for_dog(dog).order_by('date', 'created_at').values_list(
+        'date', *items, *columns.values()
+    ))
+    dates = [row[0] for row in rows]
+    matrix = [list(column) for column in zip(*(row[1:1 + len(items)] for row in rows))] or [[] for _ in items]
+    scores = {
+        column: [row[1 + len(items) + i] for row in rows] for i, column in enumerate(columns)
+    }
+
+    factor_results = {}
+    for factor, fields in factors.items():
+        factor_columns = [matrix[items.index(item)] for item in fields]
+        if factor in reversed_factors:
+            factor_columns = [[6 - value for value in column] for column in factor_columns]
+        factor_results[factor] = {
+            'alpha': cronbach_alpha(factor_columns),
+            'item_total': item_total(factor_columns, fields),
+        }
+    baseline, history = changes(instrument, dates, scores)
+    return {'assessments': len(rows), 'factors': factor_results, 'baseline': baseline, 'changes': history}
+
+
+def cached_psychometrics(dog):
+    """analyse() of every instrument, rebuilt only after the dog's records change."""
+    key = f'psychometrics:{dog.pk}:{generation(dog.pk)}'
+    results = cache.get(key)
+    if results is None:
+        results = {instrument: analyse(dog, instrument) for instrument in INSTRUMENTS}
+        cache.set(key, results, PSYCHOMETRICS_TIMEOUT)
+    return results
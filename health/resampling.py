@@ -0,0 +1,128 @@
+"""
+Server-side downsampling for long-range charts.
+
+Chart endpoints take ?resolution=auto|day|week|month. Week and month
+bucket the readings by period start and report each column's min, mean
+and max; auto picks the finest resolution that keeps the span within
+MAX_POINTS buckets. A line series still longer than MAX_POINTS (a long
+span at an explicit fine resolution) is thinned with Largest-Triangle-
+Three-Buckets (Steinarsson, 2013), which keeps the visually significant
+peaks and dips rather than every nth point.
+"""
+from datetime import timedelta
+
+RESOLUTIONS = ['auto', 'day', 'week', 'month']
+MAX_POINTS = 300
+
+LABEL_FORMATS = {'day': '%m/%d', 'week': '%m/%d', 'month': '%b %Y'}
+
+
+def parse_resolution(value):
+    """The ?resolution= value, 'auto' if missing, raising ValueError if unknown."""
+    value = value or 'auto'
+    if value not in RESOLUTIONS:
+        raise ValueError(f'resolution must be one of {", ".join(RESOLUTIONS)}')
+    return value
+
+
+def resolve(resolution, start_date, end_date):
+    """The concrete resolution for the span; auto is the finest within MAX_POINTS."""
+    if resolution != 'auto':
+        return resolution
+    days = (end_date - start_date).days + 1
+    if days <= MAX_POINTS:
+        return 'day'
+    if days / 7 <= MAX_POINTS:
+        return 'week'
+    return 'month'
+
+
+def period_start(day, resolution):
+    if resolution == 'week':
+        return day - timedelta(days=day.weekday())
+    if resolution == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def label(day, resolution):
+    return day.strftime(LABEL_FORMATS[resolution])
+
+
+def bucket(values, columns, resolution):
+    """
+    {date: {column: value}} regrouped by period start. Each column becomes
+    the mean of its readings in the period, with column_min and column_max
+    alongside; missing readings are ignored. Day resolution is returned
+    unchanged.
+    """
+    if resolution == 'day':
+        return values
+    readings = {}
+    for day, row in values.items():
+        cells = readings.setdefault(period_start(day, resolution), {column: [] for column in columns})
+        for column in columns:
+            if row.get(column) is not None:
+                cells[column].append(row[column])
+
+    buckets = {}
+    for start, cells in readings.items():
+        row = buckets[start] = {}
+        for column, found in cells.items():
+            row[column] = round(sum(found) / len(found), 2) if found else None
+            row[f'{column}_min'] = min(found) if found else None
+            row[f'{column}_max'] = max(found) if found else None
+    return buckets
+
+
+def bucket_columns(columns, resolution):
+    """The columns bucket() produces for columns."""
+    if resolution == 'day':
+        return list(columns)
+    return [name for column in columns for name in (column, f'{column}_min', f'{column}_max')]
+
+
+def lttb(ys, threshold=MAX_POINTS):
+    """
+    Indices of the points of ys (evenly spaced, None for gaps) that
+    Largest-Triangle-Three-Buckets keeps, at most threshold of them.
+
+    The first and last points are always kept; in between, each bucket
+    keeps the point forming the largest triangle with the point kept
+    before it and the average of the next bucket.
+    """
+    points = [(x, y) for x, y in enumerate(ys) if y is not None]
+    if threshold < 3 or len(points) <= threshold:
+        return [x for x, y in points]
+
+    every = (len(points) - 2) / (threshold - 2)
+    kept = [points[0]]
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        following = points[end:min(int((i + 2) * every) + 1, len(points))] or points[-1:]
+        avg_x = sum(x for x, y in following) / len(following)
+        avg_y = sum(y for x, y in following) / len(following)
+        ax, ay = kept[-1]
+        kept.append(max(
+            points[start:end],
+            key=lambda p: abs((ax - avg_x) * (p[1] - ay) - (ax - p[0]) * (avg_y - ay)),
+        ))
+    kept.append(points[-1])
+    return [x for x, y in kept]
+
+
+def thin(values, key=None, threshold=MAX_POINTS):
+    """
+    values ({date: {column: value}}) restricted to the dates LTTB keeps,
+    judged on the key column or, without one, each row's largest value.
+    """
+    dates = sorted(values)
+    if len(dates) <= threshold:
+        return values
+
+    def y(row):
+        if key is not None:
+            return row.get(key)
+        return max((v for v in row.values() if v is not None), default=None)
+
+    return {dates[i]: values[dates[i]] for i in lttb([y(values[d]) for d in dates], threshold)}
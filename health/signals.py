@@ -0,0 +1,104 @@
+"""
+Keep derived data and cached pages current when health records are
+saved or deleted.
+
+DailyEntry.save() wraps the write in a transaction and deletes run inside
+the collector's transaction, so the rollup refresh commits or rolls back
+together with the entry. Bulk writes (upsert, offline sync, imports) do
+not send these signals and call DailyEntryRollup.refresh_for_dates(),
+AssessmentSchedule.refresh(), MedicationAdherence.refresh_for_dates() and
+bump_generation() themselves.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_generation
+from .models import (
+    AssessmentSchedule, CBPIAssessment, CORQAssessment, DailyEntry, DailyEntryRollup, DailyNutritionSummary,
+    DogProfile, LymphNodeMeasurement, Medication, MedicationAdherence, MedicationDose, TimelineEntry, TreatmentSession,
+    VCOGCTCAEEvent,
+)
+
+
+def _deleted_directly(origin, model):
+    """False when the delete cascaded from another record, e.g. the dog, which takes the derived rows with it."""
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+
+@receiver(post_save, sender=DailyEntry)
+def refresh_entry_rollups(sender, instance, **kwargs):
+    DailyEntryRollup.refresh_for_dates(instance.dog_id, [instance.date])
+    bump_generation(instance.dog_id)
+
+
+@receiver(post_delete, sender=DailyEntry)
+def unroll_entry(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(origin, DailyEntry):
+        DailyEntryRollup.refresh_for_dates(instance.dog_id, [instance.date])
+    bump_generation(instance.dog_id)
+
+
+def invalidate_dog_caches(sender, instance, **kwargs):
+    bump_generation(instance.dog_id)
+
+
+# Other records shown on the tracker or dashboard
+for model in [
+    CBPIAssessment, CORQAssessment, LymphNodeMeasurement, VCOGCTCAEEvent,
+    TreatmentSession, TimelineEntry, DailyNutritionSummary, Medication, AssessmentSchedule,
+]:
+    post_save.connect(invalidate_dog_caches, sender=model)
+    post_delete.connect(invalidate_dog_caches, sender=model)
+
+
+@receiver(post_save, sender=DogProfile)
+def invalidate_profile(sender, instance, created=False, **kwargs):
+    if created:
+        AssessmentSchedule.create_for_dog(instance.pk)
+    bump_generation(instance.pk)
+
+
+def _instrument(sender):
+    return next(name for name, model in AssessmentSchedule.INSTRUMENT_MODELS.items() if model is sender)
+
+
+def schedule_assessment(sender, instance, **kwargs):
+    AssessmentSchedule.refresh(instance.dog_id, _instrument(sender))
+
+
+def unschedule_assessment(sender, instance, **kwargs):
+    AssessmentSchedule.refresh(instance.dog_id, _instrument(sender), create=False)
+
+
+for model in AssessmentSchedule.INSTRUMENT_MODELS.values():
+    post_save.connect(schedule_assessment, sender=model)
+    post_delete.connect(unschedule_assessment, sender=model)
+
+
+@receiver(post_save, sender=Medication)
+def rematch_medication(sender, instance, created=False, **kwargs):
+    # The frequency may have changed, which moves every slot
+    if not created:
+        MedicationAdherence.refresh_medication(instance)
+
+
+@receiver(post_save, sender=MedicationDose)
+def match_dose(sender, instance, created=False, **kwargs):
+    if created:
+        MedicationAdherence.refresh_for_dates(instance.medication, [timezone.localdate(instance.given_at)])
+    else:
+        # given_at may have moved to another day
+        MedicationAdherence.refresh_medication(instance.medication)
+
+
+@receiver(post_delete, sender=MedicationDose)
+def unmatch_dose(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(origin, MedicationDose):
+        MedicationAdherence.refresh_for_dates(instance.medication, [timezone.localdate(instance.given_at)])
+
+
+@receiver(post_save, sender=MedicationDose)
+@receiver(post_delete, sender=MedicationDose)
+def invalidate_dose(sender, instance, **kwargs):
+    bump_generation(instance.medication.dog_id)
@@ -0,0 +1,101 @@
+"""
+Inline SVG sparklines for the dashboard.
+
+The trend cards are drawn on the server, so the first paint shows them
+without Chart.js or a chart request. Each sparkline is cached per dog
+and day under the dog's cache generation (see health.caching), so it is
+redrawn only after a write; cached_sparklines() reads them all in one
+cache round trip.
+"""
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from .caching import generation
+from .charts import SERIES
+
+WIDTH = 120
+HEIGHT = 32
+PAD = 2
+SPARKLINE_TIMEOUT = 60 * 60 * 24
+
+# name: (series, [(column, colour)], days, (low, high), or None to fit the readings from 0)
+SPARKLINES = {
+    'overall': ('daily', [('overall', '#3b82f6')], 30, (1, 5)),
+    'cbpi': ('cbpi', [('severity', '#ef4444'), ('interference', '#f97316')], 90, (0, 10)),
+    'corq': ('corq', [('total', '#22c55e')], 90, (16, 80)),
+    'nodes': ('nodes', [
+        ('mandibular_left', '#ef4444'),
+        ('mandibular_right', '#f97316'),
+        ('popliteal_left', '#14b8a6'),
+        ('popliteal_right', '#8b5cf6'),
+    ], 90, None),
+}
+
+
+def render(lines, start, end, bounds=None):
+    """
+    SVG markup for lines ([(colour, {date: value})]) from start to end,
+    or '' when there are no readings. Missing readings are skipped; each
+    line ends on a dot at its latest reading.
+    """
+    readings = [value for colour, points in lines for value in points.values() if value is not None]
+    if not readings:
+        return ''
+    low, high = bounds or (0, max(readings))
+    days = max((end - start).days, 1)
+    scale = (high - low) or 1
+
+    def xy(day, value):
+        x = PAD + (day - start).days / days * (WIDTH - 2 * PAD)
+        y = HEIGHT - PAD - (min(max(value, low), high) - low) / scale * (HEIGHT - 2 * PAD)
+        return f'{x:.1f}', f'{y:.1f}'
+
+    shapes = []
+    for colour, points in lines:
+        coords = [xy(day, points[day]) for day in sorted(points) if points[day] is not None]
+        if not coords:
+            continue
+        shapes.append(
+            f'<polyline fill="none" stroke="{colour}" stroke-width="1.5" stroke-linejoin="round" '
+            f'points="{" ".join(f"{x},{y}" for x, y in coords)}"/>'
+        )
+        shapes.append(f'<circle cx="{coords[-1][0]}" cy="{coords[-1][1]}" r="2" fill="{colour}"/>')
+    return (
+        f'<svg class="sparkline" viewBox="0 0 {WIDTH} {HEIGHT}" width="{WIDTH}" height="{HEIGHT}" '
+        f'aria-hidden="true">{"".join(shapes)}</svg>'
+    )
+
+
+def sparkline(dog, name, today):
+    """{'svg': markup, 'latest': the first column's latest reading} for one of SPARKLINES."""
+    series, columns, days, bounds = SPARKLINES[name]
+    start = today - timedelta(days=days)
+    values = SERIES[series][0](dog, start)
+    lines = [
+        (colour, {day: row.get(column) for day, row in values.items()})
+        for column, colour in columns
+    ]
+    first = [values[day][columns[0][0]] for day in sorted(values) if values[day].get(columns[0][0]) is not None]
+    return {
+        'svg': render(lines, start, today, bounds),
+        'latest': round(first[-1], 1) if first else None,
+    }
+
+
+def cached_sparklines(dog, today=None):
+    """Every sparkline for the dog, each drawn only when its cached copy is stale."""
+    today = today or date.today()
+    version = f'{today.isoformat()}:{generation(dog.pk)}'
+    keys = {name: f'sparkline:{dog.pk}:{name}:{version}' for name in SPARKLINES}
+    found = cache.get_many(keys.values())
+    sparklines, missing = {}, {}
+    for name, key in keys.items():
+        if key in found:
+            sparklines[name] = found[key]
+        else:
+            sparklines[name] = missing[key] = sparkline(dog, name, today)
+    if missing:
+        cache.set_many(missing, SPARKLINE_TIMEOUT)
+    return {name: {**drawn, 'svg': mark_safe(drawn['svg'])} for name, drawn in sparklines.items()}
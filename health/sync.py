@@ -0,0 +1,141 @@
+"""
+Offline batch sync for the daily tracker.
+
+Phones that lose reception queue tracker saves locally and later post them
+as one batch. Each queued item carries the entry date, the client timestamp
+of the edit and the submitted tracker fields.
+
+Conflicts are resolved per field by last writer wins:
+- Within a batch, each field takes the value from the newest item for that date.
+- Against the database, a field is only applied if its client timestamp is
+  newer than the time that field was last written (see
+  DailyEntry.written_since), so a later write to other fields of the same
+  day, or an empty row created by opening the tracker, does not make the
+  offline edit lose.
+"""
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .caching import bump_generation
+from .models import DailyEntry, DailyEntryRollup
+
+
+def _parse_item(index, item):
+    """Validate one queued item and return (date, timestamp, values)."""
+    try:
+        entry_date = date.fromisoformat(item['date'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f'Entry {index}: invalid or missing date')
+    if entry_date > date.today():
+        raise ValueError(f'Entry {index}: date is in the future')
+
+    timestamp = parse_datetime(str(item.get('client_timestamp', '')))
+    if timestamp is None:
+        raise ValueError(f'Entry {index}: invalid or missing client_timestamp')
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+
+    values = {f: item[f] for f in DailyEntry.TRACKED_FIELDS if f in item}
+    try:
+        DailyEntry.validate_tracked_values(values)
+    except ValueError as e:
+        raise ValueError(f'Entry {index}: {e}')
+    return entry_date, timestamp, values
+
+
+def merge_offline_items(items):
+    """
+    Collapse queued items into {date: {field: (timestamp, value)}},
+    keeping the newest value for each field.
+    """
+    merged = {}
+    parsed = [_parse_item(i, item) for i, item in enumerate(items)]
+    for entry_date, timestamp, values in sorted(parsed, key=lambda p: p[1]):
+        fields = merged.setdefault(entry_date, {})
+        for field, value in values.items():
+            fields[field] = (timestamp, value)
+    return merged
+
+
+def apply_offline_items(dog, user, items):
+    """
+    Apply queued tracker items to the dog's entries in one transaction.
+
+    New days are inserted with one bulk_create, existing days are updated
+    with one bulk_update, and the affected rollups are refreshed in the
+    same transaction. Returns counts of created/updated entries and of
+    field values skipped because the server copy was newer.
+    """
+    merged = merge_offline_items(items)
+    now = timezone.now()
+    to_create, to_update = [], []
+    create_fields, update_fields = set(), set()
+    skipped = 0
+
+    with transaction.atomic():
+        existing = {
+            e.date: e for e in DailyEntry.objects.select_for_update().for_dog(dog).filter(
+                date__in=merged
+            )
+        }
+        for entry_date, fields in merged.items():
+            entry = existing.get(entry_date)
+            if entry is None:
+                entry = DailyEntry(dog=dog, date=entry_date, user=user)
+                for field, (timestamp, value) in fields.items():
+                    setattr(entry, field, value)
+                    entry.stamp_fields([field], timestamp)
+                create_fields.update(fields)
+                entry.refresh_scores()
+                to_create.append(entry)
+                continue
+
+            changed = set()
+            for field, (timestamp, value) in fields.items():
+                if not entry.written_since(field, timestamp):
+                    setattr(entry, field, value)
+                    entry.stamp_fields([field], timestamp)
+                    changed.add(field)
+                else:
+                    skipped += 1
+            if changed:
+                entry.user = user
+                entry.updated_at = now
+                entry.refresh_scores()
+                update_fields.update(changed)
+                to_update.append(entry)
+
+        if to_create:
+            DailyEntry.objects.bulk_create(
+                to_create,
+                update_conflicts=True,
+                unique_fields=['dog', 'date'],
+                update_fields=[
+                    *sorted(create_fields), 'user', 'updated_at', 'field_updated_at', *DailyEntry.SCORE_FIELDS,
+                ],
+            )
+        if to_update:
+            DailyEntry.objects.bulk_update(
+                to_update,
+                [*sorted(update_fields), 'user', 'updated_at', 'field_updated_at', *DailyEntry.SCORE_FIELDS],
+            )
+        if to_create or to_update:
+            DailyEntryRollup.refresh_for_dates(dog.pk, [e.date for e in to_create + to_update])
+            bump_generation(dog.pk)
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'skipped_fields': skipped,
+        'entries': [
+            {
+                'date': e.date.isoformat(),
+                'happiness_score': e.happiness_score,
+                'overall_score': e.overall_score,
+            }
+            for e in sorted(to_create + to_update, key=lambda e: e.date)
+        ],
+    }
@@ -1,18 +1,54 @@
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.contrib.auth.models import User
+from django.apps import apps as django_apps
+from django.core.cache import cache, caches
+from django.core.cache.backends import locmem as cache_backends_locmem
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from django.utils import timezone
-from datetime import date, timedelta
+from django.db import connection
+from django.db.models import Avg
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from io import BytesIO, StringIO
+import asyncio
+import importlib
 import json
+import os
+import tempfile
+import threading
+from unittest import mock
 
 from .models import (
-    DailyEntry, Medication, MedicationDose, LymphNodeMeasurement,
+    DailyEntry, DailyEntryRollup, Medication, MedicationDose, LymphNodeMeasurement,
     Provider, TimelineEntry, TimelineAttachment,
     CBPIAssessment, CORQAssessment, TreatmentSession, VCOGCTCAEEvent,
-    DogProfile, Meal, MealItem, Food, SupplementDose, MedicalRecord, LabValue
+    DogProfile, Meal, MealItem, Food, SupplementDose, MedicalRecord, LabValue, LiveEvent,
+    AssessmentSchedule, MedicationAdherence,
 )
 from datetime import time
+from time import sleep
+from .sync import apply_offline_items
+from .autosave import _locked, flush_changes, queue_changes
+from .charts import chart_data, series_table
+from .resampling import MAX_POINTS, bucket, lttb, resolve
+from .trends import METRICS, analyse, ewma, linear_fit
+from .psychometrics import analyse as analyse_instrument, cronbach_alpha, item_total
+from .sparklines import cached_sparklines, render
+from .live import RETRY_MS, _notify as notify, astream, publish
+from .imports import import_rows, read_rows
+from .dashboard import DashboardSnapshot
+from .caching import _generation_key, bump_generation, generation
+
+
+# Query budgets count the feature's own queries; keep the cache out of the
+# database for the tests that assert them
+LOCAL_CACHE = override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
 
 
 class DailyEntryModelTests(TestCase):
@@ -20,9 +56,11 @@ class DailyEntryModelTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
 
     def test_create_daily_entry(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_day='yes'
@@ -32,6 +70,7 @@ class DailyEntryModelTests(TestCase):
 
     def test_daily_entry_str(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date(2024, 1, 15)
         )
@@ -39,9 +78,11 @@ class DailyEntryModelTests(TestCase):
 
     def test_daily_entry_ordering(self):
         entry1 = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user, date=date(2024, 1, 10)
         )
         entry2 = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user, date=date(2024, 1, 15)
         )
         entries = list(DailyEntry.objects.all())
@@ -49,12 +90,13 @@ class DailyEntryModelTests(TestCase):
         self.assertEqual(entries[1], entry1)
 
     def test_daily_entry_unique_date(self):
-        DailyEntry.objects.create(user=self.user, date=date.today())
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today())
         with self.assertRaises(Exception):
-            DailyEntry.objects.create(user=self.user, date=date.today())
+            DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today())
 
     def test_happiness_score_with_values(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             tail_body_language=4,
@@ -67,6 +109,7 @@ class DailyEntryModelTests(TestCase):
 
     def test_happiness_score_partial_values(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             tail_body_language=3,
@@ -76,6 +119,7 @@ class DailyEntryModelTests(TestCase):
 
     def test_happiness_score_no_values(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today()
         )
@@ -83,6 +127,7 @@ class DailyEntryModelTests(TestCase):
 
     def test_overall_score_with_values(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             tail_body_language=4,
@@ -107,14 +152,50 @@ class DailyEntryModelTests(TestCase):
 
     def test_overall_score_no_values(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today()
         )
         self.assertIsNone(entry.overall_score)
 
+    def test_scores_are_stored(self):
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user,
+            date=date.today(),
+            tail_body_language=3,
+            interest_people=5,
+            appetite=1
+        )
+        entry = DailyEntry.objects.get(date=date.today())
+        self.assertEqual(entry.happiness_score, 4.0)
+        self.assertEqual(entry.overall_score, 3.0)
+
+    def test_scores_updated_with_update_fields(self):
+        entry = DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today(), appetite=2
+        )
+        entry.appetite = 4
+        entry.save(update_fields=['appetite'])
+        entry.refresh_from_db()
+        self.assertEqual(entry.overall_score, 4.0)
+
+    def test_scores_queryable_in_sql(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date(2024, 1, 1), appetite=2)
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date(2024, 1, 2), appetite=4)
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date(2024, 1, 3))
+        worst = DailyEntry.objects.filter(
+            overall_score__isnull=False
+        ).order_by('overall_score').first()
+        self.assertEqual(worst.date, date(2024, 1, 1))
+        avg = DailyEntry.objects.aggregate(avg=Avg('overall_score'))['avg']
+        self.assertEqual(avg, 3.0)
+
     def test_good_day_choices(self):
         for choice in ['yes', 'mixed', 'no']:
             entry = DailyEntry.objects.create(
+                dog=self.dog,
                 user=self.user,
                 date=date.today() - timedelta(days=hash(choice) % 100 + 1)
             )
@@ -124,6 +205,7 @@ class DailyEntryModelTests(TestCase):
 
     def test_meal_tracking_booleans(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             breakfast=True,
@@ -138,6 +220,7 @@ class DailyEntryModelTests(TestCase):
 
     def test_notes_fields(self):
         entry = DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_notes="Played fetch",
@@ -150,8 +233,15 @@ class DailyEntryModelTests(TestCase):
 
 
 class MedicationModelTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+
     def test_create_medication(self):
         med = Medication.objects.create(
+            dog=self.dog,
             name='Prednisone',
             dosage='5mg',
             frequency='twice'
@@ -162,6 +252,7 @@ class MedicationModelTests(TestCase):
 
     def test_medication_str(self):
         med = Medication.objects.create(
+            dog=self.dog,
             name='Prednisone',
             dosage='5mg',
             frequency='once'
@@ -171,6 +262,7 @@ class MedicationModelTests(TestCase):
     def test_medication_frequency_choices(self):
         for freq in ['once', 'twice', 'three', 'asNeeded']:
             med = Medication.objects.create(
+                dog=self.dog,
                 name=f'Med_{freq}',
                 dosage='10mg',
                 frequency=freq
@@ -179,6 +271,7 @@ class MedicationModelTests(TestCase):
 
     def test_medication_with_notes(self):
         med = Medication.objects.create(
+            dog=self.dog,
             name='Ondansetron',
             dosage='4mg',
             frequency='asNeeded',
@@ -188,6 +281,7 @@ class MedicationModelTests(TestCase):
 
     def test_medication_inactive(self):
         med = Medication.objects.create(
+            dog=self.dog,
             name='Old Med',
             dosage='1mg',
             frequency='once',
@@ -201,7 +295,9 @@ class MedicationDoseModelTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.medication = Medication.objects.create(
+            dog=self.dog,
             name='Prednisone',
             dosage='5mg',
             frequency='twice'
@@ -263,9 +359,11 @@ class LymphNodeMeasurementModelTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
 
     def test_create_measurement(self):
         measurement = LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             mandibular_left=Decimal('2.5'),
@@ -276,6 +374,7 @@ class LymphNodeMeasurementModelTests(TestCase):
 
     def test_measurement_str(self):
         measurement = LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date(2024, 1, 15)
         )
@@ -283,9 +382,11 @@ class LymphNodeMeasurementModelTests(TestCase):
 
     def test_measurement_ordering(self):
         m1 = LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user, date=date(2024, 1, 10)
         )
         m2 = LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user, date=date(2024, 1, 15)
         )
         measurements = list(LymphNodeMeasurement.objects.all())
@@ -293,16 +394,18 @@ class LymphNodeMeasurementModelTests(TestCase):
         self.assertEqual(measurements[1], m1)
 
     def test_measurement_status_choices(self):
-        for status in ['smaller', 'same', 'larger']:
+        for i, status in enumerate(['smaller', 'same', 'larger']):
             m = LymphNodeMeasurement.objects.create(
+                dog=self.dog,
                 user=self.user,
-                date=date.today() - timedelta(days=hash(status) % 100 + 1),
+                date=date.today() - timedelta(days=i + 1),
                 status=status
             )
             self.assertEqual(m.status, status)
 
     def test_measurement_all_nodes(self):
         measurement = LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             mandibular_left=Decimal('2.5'),
@@ -323,6 +426,7 @@ class LoginViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.login_url = reverse('health:login')
 
     def test_login_page_get(self):
@@ -370,6 +474,7 @@ class TrackerViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.tracker_url = reverse('health:tracker')
 
     def test_tracker_requires_login(self):
@@ -402,6 +507,7 @@ class SaveDailyEntryViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.save_url = reverse('health:save_entry')
 
     def test_save_requires_login(self):
@@ -439,7 +545,7 @@ class SaveDailyEntryViewTests(TestCase):
 
     def test_save_updates_existing_entry(self):
         self.client.login(username='testuser', password='testpass123')
-        DailyEntry.objects.create(user=self.user, date=date.today(), good_day='no')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_day='no')
 
         data = {'good_day': 'yes'}
         self.client.post(
@@ -459,6 +565,7 @@ class AddMedicationViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.add_url = reverse('health:add_medication')
 
     def test_add_requires_login(self):
@@ -492,7 +599,9 @@ class RecordDoseViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.medication = Medication.objects.create(
+            dog=self.dog,
             name='Prednisone',
             dosage='5mg',
             frequency='twice'
@@ -525,6 +634,7 @@ class SaveNodeMeasurementViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.save_url = reverse('health:save_nodes')
 
     def test_save_requires_login(self):
@@ -557,6 +667,7 @@ class SaveNodeMeasurementViewTests(TestCase):
     def test_save_updates_existing_measurement(self):
         self.client.login(username='testuser', password='testpass123')
         LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             status='smaller'
@@ -574,12 +685,619 @@ class SaveNodeMeasurementViewTests(TestCase):
         self.assertEqual(measurement.status, 'larger')
 
 
+class UpsertTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_save_entry_keeps_unsubmitted_fields(self):
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today(), appetite=2,
+            good_notes='Ate chicken', breakfast=True
+        )
+        self.client.post(
+            reverse('health:save_entry'),
+            data=json.dumps({'good_day': 'yes', 'energy_level': 4}),
+            content_type='application/json'
+        )
+        entry = DailyEntry.objects.get(date=date.today())
+        self.assertEqual(entry.good_day, 'yes')
+        self.assertEqual(entry.good_notes, 'Ate chicken')
+        self.assertTrue(entry.breakfast)
+        self.assertEqual(entry.overall_score, 3.0)
+
+    def test_save_entry_returns_happiness_score(self):
+        response = self.client.post(
+            reverse('health:save_entry'),
+            data=json.dumps({'tail_body_language': 3, 'interest_people': 4}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.json()['happiness_score'], 3.5)
+
+    def test_upsert_racing_first_insert_recomputes_scores(self):
+        today = date.today()
+        bulk_create = DailyEntry.objects.bulk_create
+        other = DailyEntry(
+            dog=self.dog, user=self.user, date=today, energy_level=1, overall_score=1.0,
+            field_updated_at={'energy_level': timezone.now().isoformat()},
+        )
+
+        def racing_bulk_create(objs, **kwargs):
+            # Another writer inserts the day after our lock found no row
+            bulk_create([other])
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(DailyEntry.objects, 'bulk_create', side_effect=racing_bulk_create):
+            DailyEntry.upsert(self.dog, today, self.user, {'appetite': 4})
+        entry = DailyEntry.objects.get(date=today)
+        self.assertEqual((entry.appetite, entry.energy_level), (4, 1))
+        self.assertEqual(entry.overall_score, 2.5)
+        self.assertEqual(set(entry.field_updated_at), {'appetite', 'energy_level'})
+
+    def test_upsert_single_insert_statement(self):
+        values = {field: 4 for field in DailyEntry.RATING_FIELDS}
+        for appetite in (4, 2):
+            with CaptureQueriesContext(connection) as ctx:
+                DailyEntry.upsert(self.dog, date.today(), self.user, dict(values, appetite=appetite))
+            entry_writes = [
+                q['sql'] for q in ctx.captured_queries
+                if 'health_dailyentry"' in q['sql'] and not q['sql'].startswith('SELECT')
+            ]
+            self.assertEqual(len(entry_writes), 1)
+            self.assertIn('ON CONFLICT', entry_writes[0])
+        entry = DailyEntry.objects.get(date=date.today())
+        self.assertEqual(entry.appetite, 2)
+        self.assertEqual(DailyEntry.objects.count(), 1)
+
+    def test_duplicate_measurement_migration_merges(self):
+        migration = importlib.import_module('health.migrations.0009_lymphnodemeasurement_unique_per_source')
+        day = date.today()
+        newest = LymphNodeMeasurement(pk=3, date=day, source='home', mandibular_left=Decimal('2.5'), notes='am')
+        older = LymphNodeMeasurement(
+            pk=2, date=day, source='home', mandibular_left=Decimal('2.5'),
+            popliteal_right=Decimal('1.1'), status='same', notes='pm',
+        )
+        self.assertEqual(migration.merge_group([newest, older]), [])
+        self.assertEqual(
+            (newest.mandibular_left, newest.popliteal_right, newest.status, newest.notes),
+            (Decimal('2.5'), Decimal('1.1'), 'same', 'am\npm'),
+        )
+        conflicting = LymphNodeMeasurement(pk=1, date=day, source='home', mandibular_left=Decimal('3.0'))
+        self.assertEqual(migration.merge_group([newest, conflicting]), [
+            f'{day} (home): mandibular_left is 2.5 in #3 but 3.0 in #1',
+        ])
+
+    def test_node_upsert_keeps_unsubmitted_fields(self):
+        LymphNodeMeasurement.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today(), mandibular_left=Decimal('2.5')
+        )
+        self.client.post(
+            reverse('health:save_nodes'),
+            data=json.dumps({'status': 'smaller'}),
+            content_type='application/json'
+        )
+        measurement = LymphNodeMeasurement.objects.get(date=date.today())
+        self.assertEqual(measurement.status, 'smaller')
+        self.assertEqual(measurement.mandibular_left, Decimal('2.5'))
+
+    def test_node_upsert_separate_clinic_row(self):
+        LymphNodeMeasurement.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today(), source='clinic', status='same'
+        )
+        LymphNodeMeasurement.upsert(self.dog, date.today(), self.user, {'status': 'larger'})
+        self.assertEqual(LymphNodeMeasurement.objects.filter(date=date.today()).count(), 2)
+
+
+class SyncDailyEntriesTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.sync_url = reverse('health:sync_entries')
+        self.now = timezone.now()
+
+    def post(self, entries):
+        return self.client.post(
+            self.sync_url,
+            data=json.dumps({'entries': entries}),
+            content_type='application/json'
+        )
+
+    def item(self, days_ago, minutes_ago=0, **fields):
+        return {
+            'date': (date.today() - timedelta(days=days_ago)).isoformat(),
+            'client_timestamp': (self.now - timedelta(minutes=minutes_ago)).isoformat(),
+            **fields,
+        }
+
+    def test_sync_requires_login(self):
+        response = self.post([])
+        self.assertEqual(response.status_code, 302)
+
+    def test_sync_requires_post(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(self.sync_url)
+        self.assertEqual(response.status_code, 405)
+
+    def test_sync_week_of_entries(self):
+        self.client.login(username='testuser', password='testpass123')
+        entries = [self.item(i, appetite=3, good_day='yes') for i in range(7)]
+        response = self.post(entries)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result['created'], 7)
+        self.assertEqual(DailyEntry.objects.count(), 7)
+        self.assertEqual(DailyEntry.objects.filter(overall_score=3.0).count(), 7)
+
+    def test_sync_query_count_is_constant(self):
+        self.client.login(username='testuser', password='testpass123')
+        for i in range(3, 6):
+            DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today() - timedelta(days=i))
+        entries = [self.item(i, minutes_ago=-1, appetite=4) for i in range(7)]
+        # session + user + current dog, savepoint, SELECT FOR UPDATE, bulk_create,
+        # bulk_update, rollup refresh (savepoint, insert, lock, read entries,
+        # bulk_update, release), release
+        with self.assertNumQueries(14):
+            self.post(entries)
+        self.assertEqual(DailyEntry.objects.filter(appetite=4).count(), 7)
+
+    def test_sync_newest_field_wins_within_batch(self):
+        self.client.login(username='testuser', password='testpass123')
+        self.post([
+            self.item(1, minutes_ago=5, appetite=2, good_notes='late'),
+            self.item(1, minutes_ago=30, appetite=5, hard_notes='early'),
+        ])
+        entry = DailyEntry.objects.get(date=date.today() - timedelta(days=1))
+        self.assertEqual(entry.appetite, 2)
+        self.assertEqual(entry.good_notes, 'late')
+        self.assertEqual(entry.hard_notes, 'early')
+
+    def test_sync_server_wins_when_newer(self):
+        self.client.login(username='testuser', password='testpass123')
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today() - timedelta(days=1), appetite=5
+        )
+        response = self.post([self.item(1, minutes_ago=60, appetite=1)])
+        self.assertEqual(response.json()['skipped_fields'], 1)
+        entry = DailyEntry.objects.get(date=date.today() - timedelta(days=1))
+        self.assertEqual(entry.appetite, 5)
+
+    def test_sync_client_wins_when_newer(self):
+        self.client.login(username='testuser', password='testpass123')
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today() - timedelta(days=1),
+            appetite=5, good_notes='keep me'
+        )
+        later = timezone.now() + timedelta(minutes=1)
+        self.post([{
+            'date': (date.today() - timedelta(days=1)).isoformat(),
+            'client_timestamp': later.isoformat(),
+            'appetite': 1,
+        }])
+        entry = DailyEntry.objects.get(date=date.today() - timedelta(days=1))
+        self.assertEqual(entry.appetite, 1)
+        self.assertEqual(entry.overall_score, 1.0)
+        self.assertEqual(entry.good_notes, 'keep me')
+
+    def test_sync_offline_edit_survives_later_write_to_other_fields(self):
+        self.client.login(username='testuser', password='testpass123')
+        # Another caregiver opens the tracker after the offline edit, which
+        # creates today's empty row, and then rates energy
+        self.client.get(reverse('health:tracker'))
+        DailyEntry.upsert(self.dog, date.today(), self.user, {'energy_level': 2})
+        response = self.post([self.item(0, minutes_ago=30, appetite=4, good_notes='ate well')])
+        self.assertEqual(response.json()['skipped_fields'], 0)
+        entry = DailyEntry.objects.get(date=date.today())
+        self.assertEqual((entry.appetite, entry.energy_level, entry.good_notes), (4, 2, 'ate well'))
+        self.assertEqual(entry.overall_score, 3.0)
+
+    def test_sync_field_conflict_uses_that_fields_write_time(self):
+        self.client.login(username='testuser', password='testpass123')
+        DailyEntry.upsert(self.dog, date.today(), self.user, {'appetite': 5})
+        response = self.post([self.item(0, minutes_ago=30, appetite=1)])
+        self.assertEqual(response.json()['skipped_fields'], 1)
+        # The same field written offline after the server write wins
+        response = self.post([self.item(0, minutes_ago=-1, appetite=2)])
+        self.assertEqual(response.json()['skipped_fields'], 0)
+        self.assertEqual(DailyEntry.objects.get(date=date.today()).appetite, 2)
+
+    def test_sync_unstamped_fields_fall_back_to_updated_at(self):
+        self.client.login(username='testuser', password='testpass123')
+        entry = DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), appetite=5)
+        DailyEntry.objects.filter(pk=entry.pk).update(field_updated_at={})
+        response = self.post([self.item(0, minutes_ago=30, appetite=1, energy_level=3)])
+        # appetite predates the row's last write; energy_level was never set
+        self.assertEqual(response.json()['skipped_fields'], 1)
+        entry.refresh_from_db()
+        self.assertEqual((entry.appetite, entry.energy_level), (5, 3))
+
+    def test_sync_rejects_invalid_batch(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.post([self.item(1, appetite=9)])
+        self.assertEqual(response.status_code, 400)
+        response = self.post([{'date': 'not-a-date', 'client_timestamp': self.now.isoformat()}])
+        self.assertEqual(response.status_code, 400)
+        response = self.post([self.item(-2, appetite=3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(DailyEntry.objects.count(), 0)
+
+    def test_sync_rejects_mistyped_fields(self):
+        self.client.login(username='testuser', password='testpass123')
+        for fields, message in (
+            ({'breakfast': 'maybe'}, 'Entry 1: breakfast must be true or false'),
+            ({'good_day': 'bogus'}, 'Entry 1: good_day must be one of yes, mixed, no or empty'),
+            ({'good_notes': 5}, 'Entry 1: good_notes must be text'),
+        ):
+            response = self.post([self.item(2, appetite=3), self.item(1, **fields)])
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['message'], message)
+        self.assertEqual(DailyEntry.objects.count(), 0)
+        self.assertEqual(self.post([self.item(1, good_day='', breakfast=False)]).status_code, 200)
+
+
+@LOCAL_CACHE
+class AutosaveLockTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.today = date.today()
+
+    def test_parallel_taps_are_all_kept(self):
+        fields = DailyEntry.RATING_FIELDS[:8]
+        barrier = threading.Barrier(len(fields))
+        get = cache_backends_locmem.LocMemCache.get
+
+        def slow_get(self, *args, **kwargs):
+            # Widen the read-modify-write window
+            value = get(self, *args, **kwargs)
+            sleep(0.005)
+            return value
+
+        def tap(field):
+            barrier.wait()
+            queue_changes(self.dog, self.user, self.today, {field: 3})
+
+        with mock.patch.object(cache_backends_locmem.LocMemCache, 'get', slow_get):
+            threads = [threading.Thread(target=tap, args=(field,)) for field in fields]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        entry = flush_changes(self.dog, self.user, self.today)
+        self.assertEqual([getattr(entry, field) for field in fields], [3] * len(fields))
+
+    def test_change_queued_during_flush_is_kept(self):
+        queue_changes(self.dog, self.user, self.today, {'appetite': 3})
+        upsert = DailyEntry.upsert
+        late = threading.Thread(
+            target=queue_changes, args=(self.dog, self.user, self.today, {'energy_level': 2})
+        )
+
+        def upsert_while_tapping(*args):
+            late.start()
+            late.join(0.1)
+            # The tap waits for the flush to finish instead of joining the batch being written
+            self.assertTrue(late.is_alive())
+            return upsert(*args)
+
+        with mock.patch.object(DailyEntry, 'upsert', side_effect=upsert_while_tapping):
+            flush_changes(self.dog, self.user, self.today)
+        late.join()
+        entry = flush_changes(self.dog, self.user, self.today)
+        self.assertEqual((entry.appetite, entry.energy_level), (3, 2))
+
+    def test_lock_wait_has_a_deadline(self):
+        # DatabaseCache.add() answers False for as long as its table is failing
+        with mock.patch.object(cache, 'add', return_value=False), \
+                mock.patch('health.autosave.LOCK_WAIT', 0.05):
+            with self.assertRaises(TimeoutError):
+                queue_changes(self.dog, self.user, self.today, {'appetite': 3})
+
+    def test_expired_lock_is_not_released_for_its_next_holder(self):
+        with _locked('batch'):
+            # This holder outlived LOCK_TIMEOUT and another request took the lock
+            cache.set('batch:lock', 'next holder')
+        self.assertEqual(cache.get('batch:lock'), 'next holder')
+        with _locked('other'):
+            pass
+        self.assertIsNone(cache.get('other:lock'))
+
+
+class PatchDailyEntryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.patch_url = reverse('health:patch_entry')
+
+    def patch(self, data):
+        return self.client.patch(
+            self.patch_url, data=json.dumps(data), content_type='application/json'
+        )
+
+    def test_patch_requires_login(self):
+        response = self.patch({'appetite': 4})
+        self.assertEqual(response.status_code, 302)
+
+    def test_patch_requires_patch_method(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.post(self.patch_url)
+        self.assertEqual(response.status_code, 405)
+
+    def test_patch_is_coalesced_until_flush(self):
+        self.client.login(username='testuser', password='testpass123')
+        self.assertEqual(self.patch({'appetite': 2}).json()['status'], 'pending')
+        self.assertEqual(self.patch({'appetite': 4}).json()['status'], 'pending')
+        self.assertEqual(self.patch({'energy_level': 2}).json()['status'], 'pending')
+        self.assertFalse(DailyEntry.objects.exists())
+
+        response = self.patch({'flush': True})
+        self.assertEqual(response.json()['status'], 'saved')
+        self.assertEqual(response.json()['overall_score'], 3.0)
+        entry = DailyEntry.objects.get(date=date.today())
+        self.assertEqual(entry.appetite, 4)
+        self.assertEqual(entry.energy_level, 2)
+
+    def test_patch_flushes_after_window(self):
+        self.client.login(username='testuser', password='testpass123')
+        with mock.patch('health.autosave.COALESCE_WINDOW', 0):
+            response = self.patch({'good_day': 'yes'})
+        self.assertEqual(response.json()['status'], 'saved')
+        self.assertEqual(DailyEntry.objects.get(date=date.today()).good_day, 'yes')
+
+    def test_patch_only_writes_changed_fields(self):
+        self.client.login(username='testuser', password='testpass123')
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today(), appetite=5, good_notes='keep me'
+        )
+        self.patch({'hard_notes': 'vomited once'})
+        self.patch({'flush': True})
+        entry = DailyEntry.objects.get(date=date.today())
+        self.assertEqual(entry.hard_notes, 'vomited once')
+        self.assertEqual(entry.good_notes, 'keep me')
+        self.assertEqual(entry.overall_score, 5.0)
+
+    def test_mistyped_patch_is_not_queued(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.patch({'breakfast': 'maybe'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'breakfast must be true or false')
+        self.patch({'appetite': 4})
+        self.assertEqual(self.patch({'flush': True}).json()['status'], 'saved')
+        entry = DailyEntry.objects.get(date=date.today())
+        self.assertEqual((entry.appetite, entry.breakfast), (4, False))
+
+    def test_patch_answers_503_when_the_lock_cannot_be_taken(self):
+        self.client.login(username='testuser', password='testpass123')
+        with mock.patch.object(cache, 'add', return_value=False), \
+                mock.patch('health.autosave.LOCK_WAIT', 0.05):
+            response = self.patch({'appetite': 4})
+        self.assertEqual(response.status_code, 503)
+
+    def test_patch_rejects_invalid_values(self):
+        self.client.login(username='testuser', password='testpass123')
+        self.assertEqual(self.patch({'appetite': 7}).status_code, 400)
+        self.assertEqual(self.patch({'user': 2}).status_code, 400)
+
+    def test_tracker_view_flushes_pending_changes(self):
+        self.client.login(username='testuser', password='testpass123')
+        self.patch({'appetite': 3})
+        response = self.client.get(reverse('health:tracker'))
+        self.assertEqual(response.context['entry'].appetite, 3)
+
+
+class DailyEntryRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        # A Wednesday, so the week and the month start on different days
+        self.day = date(2026, 7, 15)
+
+    def rollup(self, period, day=None):
+        return DailyEntryRollup.objects.get(
+            period=period, start=DailyEntryRollup.period_start(period, day or self.day)
+        )
+
+    def test_period_bounds(self):
+        self.assertEqual(DailyEntryRollup.period_start('week', self.day), date(2026, 7, 13))
+        self.assertEqual(DailyEntryRollup.period_start('month', self.day), date(2026, 7, 1))
+        self.assertEqual(DailyEntryRollup.period_end('week', date(2026, 7, 13)), date(2026, 7, 20))
+        self.assertEqual(DailyEntryRollup.period_end('month', date(2026, 12, 1)), date(2027, 1, 1))
+
+    def test_save_updates_week_and_month(self):
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=self.day, good_day='yes',
+            appetite=4, food_enjoyment=5, energy_level=2
+        )
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=self.day - timedelta(days=1), good_day='no', appetite=2
+        )
+        # Previous week, same month
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=date(2026, 7, 8), good_day='mixed'
+        )
+        week = self.rollup('week')
+        self.assertEqual((week.good_days, week.mixed_days, week.bad_days), (1, 0, 1))
+        self.assertEqual(week.good_day_percent, 50)
+        self.assertEqual(week.average('appetite'), 3.2)
+        self.assertEqual(week.average('energy'), 2.0)
+        self.assertIsNone(week.average('mood'))
+        month = self.rollup('month')
+        self.assertEqual(month.rated_days, 3)
+        self.assertEqual(month.entries_count, 3)
+
+    def test_edit_and_delete_recompute(self):
+        entry = DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.day, good_day='no')
+        entry.good_day = 'yes'
+        entry.save(update_fields=['good_day'])
+        self.assertEqual(self.rollup('week').good_days, 1)
+        self.assertEqual(self.rollup('week').bad_days, 0)
+        entry.delete()
+        self.assertEqual(self.rollup('month').entries_count, 0)
+
+    def test_deleting_dog_with_entries(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.day, good_day='yes')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.day - timedelta(days=40), good_day='no')
+        self.dog.delete()
+        # The entries' post_delete must not recreate rollups for the deleted dog
+        connection.check_constraints()
+        self.assertFalse(DailyEntryRollup.objects.exists())
+
+    def test_queryset_delete_recomputes(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.day, good_day='yes')
+        DailyEntry.objects.for_dog(self.dog).delete()
+        self.assertEqual(self.rollup('week').good_days, 0)
+
+    def test_bulk_writes_refresh_rollups(self):
+        DailyEntry.upsert(self.dog, self.day, self.user, {'good_day': 'mixed', 'appetite': 3})
+        self.assertEqual(self.rollup('week').mixed_days, 1)
+        self.assertEqual(self.rollup('week').average('overall'), 3.0)
+
+        apply_offline_items(self.dog, self.user, [{
+            'date': (self.day + timedelta(days=1)).isoformat(),
+            'client_timestamp': timezone.now().isoformat(),
+            'good_day': 'yes',
+        }])
+        self.assertEqual(self.rollup('week').rated_days, 2)
+
+    def test_rebuild_command(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.day, good_day='yes')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date(2026, 6, 30), good_day='no')
+        DailyEntryRollup.objects.update(good_days=0, bad_days=0)
+        out = StringIO()
+        call_command('rebuild_rollups', stdout=out)
+        # June 30 and July 15 share no week; two weeks + two months
+        self.assertIn('Rebuilt 4 rollups', out.getvalue())
+        self.assertEqual(self.rollup('week').good_days, 1)
+        self.assertEqual(self.rollup('month', date(2026, 6, 30)).bad_days, 1)
+
+    def test_backfill_migration_matches_rebuild(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.day, good_day='yes', appetite=4)
+        DailyEntry.objects.create(
+            dog=self.dog, user=self.user, date=date(2026, 6, 30), good_day='no', energy_level=2, pain_signs=3,
+        )
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date(2026, 7, 1), good_day='mixed')
+        columns = ['period', 'start', *DailyEntryRollup.TOTAL_FIELDS]
+        DailyEntryRollup.rebuild()
+        rebuilt = list(DailyEntryRollup.objects.order_by('period', 'start').values_list(*columns))
+        DailyEntryRollup.objects.update(good_days=0, overall_sum=0)
+        migration = importlib.import_module('health.migrations.0021_backfill_rollups')
+        migration.backfill_rollups(django_apps, None)
+        self.assertEqual(list(DailyEntryRollup.objects.order_by('period', 'start').values_list(*columns)), rebuilt)
+
+    def test_views_read_rollups(self):
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+        today = date.today()
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=today, good_day='yes')
+        # Rollup row is the source of truth for the summaries
+        DailyEntryRollup.objects.filter(period='week').update(good_days=3, bad_days=1)
+        DailyEntryRollup.objects.filter(period='month').update(mixed_days=2)
+
+        response = client.get(reverse('health:tracker'))
+        self.assertEqual(response.context['good_day_percent'], 75)
+        self.assertEqual(response.context['total_days'], 4)
+        response = client.get(reverse('health:history'))
+        self.assertEqual(response.context['total_days'], 4)
+        response = client.get(reverse('health:dashboard'))
+        self.assertEqual(response.context['mixed_days'], 2)
+        self.assertEqual(response.context['total_days'], 3)
+
+
+class UpsertConcurrencyTests(TransactionTestCase):
+    """Parallel writers for the same day must all succeed, with no retries."""
+
+    WRITERS = 8
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+
+    def run_parallel(self, target):
+        errors = []
+        barrier = threading.Barrier(self.WRITERS)
+
+        def worker(i):
+            try:
+                barrier.wait()
+                target(i)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.WRITERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_parallel_daily_entry_upserts(self):
+        today = date.today()
+        errors = self.run_parallel(
+            lambda i: DailyEntry.upsert(self.dog, today, self.user, {'appetite': i % 5 + 1})
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(DailyEntry.objects.filter(date=today).count(), 1)
+        entry = DailyEntry.objects.get(date=today)
+        self.assertEqual(entry.overall_score, float(entry.appetite))
+
+    def test_parallel_writers_keep_every_field(self):
+        today = date.today()
+        fields = DailyEntry.RATING_FIELDS[:self.WRITERS]
+        errors = self.run_parallel(
+            lambda i: DailyEntry.upsert(self.dog, today, self.user, {fields[i]: i % 5 + 1})
+        )
+        self.assertEqual(errors, [])
+        entry = DailyEntry.objects.get(date=today)
+        values = [getattr(entry, field) for field in fields]
+        self.assertEqual(values, [i % 5 + 1 for i in range(self.WRITERS)])
+        self.assertEqual(entry.overall_score, round(sum(values) / len(values), 1))
+        self.assertEqual(set(entry.field_updated_at), set(fields))
+
+    def test_parallel_node_upserts(self):
+        today = date.today()
+        errors = self.run_parallel(
+            lambda i: LymphNodeMeasurement.upsert(self.dog, today, self.user, {'notes': f'writer {i}'})
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(LymphNodeMeasurement.objects.filter(date=today).count(), 1)
+
+
 class HistoryViewTests(TestCase):
     def setUp(self):
         self.client = Client()
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.history_url = reverse('health:history')
 
     def test_history_requires_login(self):
@@ -604,12 +1322,14 @@ class HistoryViewTests(TestCase):
         self.client.login(username='testuser', password='testpass123')
         for i in range(7):
             DailyEntry.objects.create(
+                dog=self.dog,
                 user=self.user,
                 date=date.today() - timedelta(days=i),
                 good_day='yes'
             )
         for i in range(7, 14):
             DailyEntry.objects.create(
+                dog=self.dog,
                 user=self.user,
                 date=date.today() - timedelta(days=i),
                 good_day='no'
@@ -619,12 +1339,1672 @@ class HistoryViewTests(TestCase):
         self.assertEqual(response.context['trend'], 'Better')
 
 
+class HistoryAPITests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+
+    def test_history_api_requires_login(self):
+        response = self.client.get(reverse('health:api_history'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_history_api_pages_entries_by_cursor(self):
+        self.client.login(username='testuser', password='testpass123')
+        for i in range(25):
+            DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today() - timedelta(days=i))
+        url = reverse('health:api_history')
+        seen = []
+        cursor = ''
+        while True:
+            data = self.client.get(url, {'limit': 10, 'before': cursor}).json()
+            seen += [item['date'] for item in data['items']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        expected = [(date.today() - timedelta(days=i)).isoformat() for i in range(25)]
+        self.assertEqual(seen, expected)
+
+    def test_history_api_page_is_one_query(self):
+        self.client.login(username='testuser', password='testpass123')
+        for i in range(30):
+            DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today() - timedelta(days=i))
+        cursor = (date.today() - timedelta(days=20)).isoformat()
+        # session + user + current dog + one keyset SELECT
+        with self.assertNumQueries(4):
+            data = self.client.get(reverse('health:api_history'), {'before': cursor, 'limit': 5}).json()
+        self.assertEqual(data['items'][0]['date'], (date.today() - timedelta(days=21)).isoformat())
+
+    def test_history_api_nodes_cursor_splits_day(self):
+        self.client.login(username='testuser', password='testpass123')
+        for source in ('home', 'clinic'):
+            LymphNodeMeasurement.objects.create(
+                dog=self.dog,
+                user=self.user, date=date.today(), source=source, status='same'
+            )
+        LymphNodeMeasurement.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today() - timedelta(days=1), status='smaller'
+        )
+        url = reverse('health:api_history')
+        first = self.client.get(url, {'kind': 'nodes', 'limit': 1}).json()
+        self.assertEqual(first['next_cursor'], f'{date.today().isoformat()}:home')
+        rest = self.client.get(url, {'kind': 'nodes', 'before': first['next_cursor']}).json()
+        self.assertEqual([m['source'] for m in rest['items']], ['clinic', 'home'])
+        self.assertEqual(rest['items'][1]['status_display'], 'Smaller')
+        self.assertIsNone(rest['next_cursor'])
+
+    def test_history_api_rejects_bad_parameters(self):
+        self.client.login(username='testuser', password='testpass123')
+        url = reverse('health:api_history')
+        self.assertEqual(self.client.get(url, {'before': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'kind': 'meds'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 'ten'}).status_code, 400)
+
+
+class CategoryTrendTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+
+    def test_category_scores_follow_declared_fields(self):
+        entry = DailyEntry.objects.create(
+            dog=self.dog, user=self.user, date=date.today(),
+            appetite=4, food_enjoyment=5, energy_level=2, pain_signs=3,
+        )
+        scores = entry.category_scores()
+        self.assertEqual(scores['appetite'], 4.5)
+        self.assertEqual(scores['energy'], 2)
+        self.assertEqual(scores['pain'], 3)
+        self.assertIsNone(scores['mood'])
+        self.assertEqual(scores['overall'], entry.overall_score)
+
+    def test_category_trends_api(self):
+        self.client.login(username='testuser', password='testpass123')
+        DailyEntry.objects.create(
+            dog=self.dog, user=self.user, date=date.today() - timedelta(days=1),
+            appetite=2, food_enjoyment=4,
+        )
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), appetite=5)
+        DailyEntry.objects.create(
+            dog=self.dog, user=self.user, date=date.today() - timedelta(days=40), appetite=1,
+        )
+        data = self.client.get(reverse('health:api_category_trends')).json()
+        self.assertEqual(data['days'], 30)
+        self.assertEqual(len(data['dates']), 2)
+        self.assertEqual(data['appetite'], [3, 5])
+        self.assertEqual(data['mood'], [None, None])
+        self.assertEqual(data['averages']['appetite'], 4)
+
+        data = self.client.get(reverse('health:api_category_trends'), {'days': 90}).json()
+        self.assertEqual(data['appetite'], [1, 3, 5])
+
+    def test_category_trends_is_one_query(self):
+        self.client.login(username='testuser', password='testpass123')
+        for i in range(50):
+            DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today() - timedelta(days=i))
+        # session + user + current dog + one values_list SELECT
+        with self.assertNumQueries(4):
+            self.client.get(reverse('health:api_category_trends'), {'days': 365})
+
+    def test_category_trends_rejects_other_windows(self):
+        self.client.login(username='testuser', password='testpass123')
+        for days in ('7', 'abc'):
+            response = self.client.get(reverse('health:api_category_trends'), {'days': days})
+            self.assertEqual(response.status_code, 400)
+
+
+class ImportHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+
+    def rows(self, text):
+        return read_rows(BytesIO(text.encode()), 'history.csv')
+
+    def test_import_entries(self):
+        result = import_rows('entries', self.rows(
+            'Date,good_day,appetite,food_enjoyment,breakfast,good_notes\n'
+            '2026-03-01,yes,4,5,x,Ate well\n'
+            '\n'
+            '2026-03-02,mixed,2,,,\n'
+        ), self.dog, self.user)
+        self.assertEqual(result['created'], 2)
+        entry = DailyEntry.objects.for_dog(self.dog).get(date=date(2026, 3, 1))
+        self.assertTrue(entry.breakfast)
+        self.assertEqual(entry.good_notes, 'Ate well')
+        self.assertEqual(entry.overall_score, 4.5)
+        self.assertEqual(DailyEntryRollup.for_date(self.dog, 'month', date(2026, 3, 1)).good_days, 1)
+
+    def test_import_reports_invalid_rows(self):
+        result = import_rows('entries', self.rows(
+            'date,appetite,good_day\n'
+            'yesterday,3,\n'
+            '2026-03-02,7,\n'
+            '2026-03-03,3,great\n'
+            '2026-03-04,3,no\n'
+        ), self.dog, self.user)
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([line for line, message in result['errors']], [2, 3, 4])
+
+    def test_import_skips_or_overwrites_existing_days(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date(2026, 3, 1), appetite=1)
+        csv_text = 'date,appetite\n2026-03-01,5\n2026-03-02,5\n'
+        result = import_rows('entries', self.rows(csv_text), self.dog, self.user)
+        self.assertEqual((result['created'], result['skipped']), (1, 1))
+        self.assertEqual(DailyEntry.objects.get(date=date(2026, 3, 1)).appetite, 1)
+
+        result = import_rows('entries', self.rows(csv_text), self.dog, self.user, overwrite=True)
+        self.assertEqual(result['updated'], 2)
+        entry = DailyEntry.objects.get(date=date(2026, 3, 1))
+        self.assertEqual((entry.appetite, entry.overall_score), (5, 5))
+
+    def test_import_rejects_future_dates(self):
+        tomorrow = date.today() + timedelta(days=1)
+        for kind, header in (('entries', 'date,appetite'), ('nodes', 'date,mandibular_left')):
+            result = import_rows(kind, self.rows(f'{header}\n{date.today()},3\n{tomorrow},3\n'), self.dog, self.user)
+            self.assertEqual(result['created'], 1)
+            self.assertEqual(result['errors'], [(3, f'date {tomorrow} is in the future')])
+
+    def test_imported_fields_lose_to_a_later_offline_edit(self):
+        day = date.today() - timedelta(days=3)
+        import_rows('entries', self.rows(f'date,appetite\n{day},2\n'), self.dog, self.user)
+        entry = DailyEntry.objects.get(date=day)
+        self.assertEqual(
+            datetime.fromisoformat(entry.field_updated_at['appetite']),
+            timezone.make_aware(datetime.combine(day, time.min)),
+        )
+        # Edited offline on the day itself, synced after the import ran
+        apply_offline_items(self.dog, self.user, [{
+            'date': day.isoformat(),
+            'client_timestamp': timezone.make_aware(datetime.combine(day, time(20))).isoformat(),
+            'appetite': 4,
+        }])
+        self.assertEqual(DailyEntry.objects.get(date=day).appetite, 4)
+
+    def test_import_queries_per_batch(self):
+        lines = ''.join(f'{date(2025, 1, 1) + timedelta(days=i)},3\n' for i in range(100))
+        with CaptureQueriesContext(connection) as queries:
+            import_rows('entries', self.rows('date,appetite\n' + lines), self.dog, self.user, batch_size=50)
+        self.assertEqual(DailyEntry.objects.count(), 100)
+        # per batch: savepoint, existing check, insert (split in two by SQLite's
+        # parameter limit), rollup refresh (savepoint, insert, lock, read, update,
+        # release), release
+        self.assertEqual(len(queries), 2 * 11)
+
+    def test_import_nodes(self):
+        result = import_rows('nodes', self.rows(
+            'date,source,mandibular_left,status\n'
+            '2026-03-01,,2.45,Larger\n'
+            '2026-03-01,clinic,2.2,\n'
+            '2026-03-02,shelter,2,\n'
+        ), self.dog, self.user)
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(len(result['errors']), 1)
+        home = LymphNodeMeasurement.objects.get(source='home')
+        self.assertEqual(home.mandibular_left, Decimal('2.5'))
+        self.assertEqual(home.status, 'larger')
+
+    def test_xlsx_round_trip(self):
+        from openpyxl import Workbook
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['Date', 'good_day', 'appetite', 'food_enjoyment', 'breakfast', 'good_notes'])
+        # Spreadsheet cells arrive typed: dates, floats, booleans, blanks
+        sheet.append([datetime(2026, 3, 1), 'yes', 4, 5.0, True, 'Ate well'])
+        sheet.append([None, None, None, None, None, None])
+        sheet.append([date(2026, 3, 2), 'Mixed', 2, None, False, None])
+        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as f:
+            workbook.save(f)
+        self.addCleanup(os.unlink, f.name)
+
+        with open(f.name, 'rb') as upload:
+            self.assertEqual([line for line, row in read_rows(upload, f.name)], [2, 4])
+        out = StringIO()
+        call_command('import_history', f.name, stdout=out, stderr=StringIO())
+        self.assertIn('2 created', out.getvalue())
+        entry = DailyEntry.objects.for_dog(self.dog).get(date=date(2026, 3, 1))
+        self.assertEqual((entry.appetite, entry.food_enjoyment, entry.breakfast), (4, 5, True))
+        self.assertEqual(entry.overall_score, 4.5)
+        entry = DailyEntry.objects.for_dog(self.dog).get(date=date(2026, 3, 2))
+        self.assertEqual((entry.good_day, entry.breakfast, entry.good_notes), ('mixed', False, ''))
+
+    def test_import_history_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('date,appetite\n2026-03-01,4\n2026-03-02,x\n')
+        self.addCleanup(os.unlink, f.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_history', f.name, stdout=out, stderr=err)
+        self.assertIn('1 created', out.getvalue())
+        self.assertIn('Line 3', err.getvalue())
+        self.assertEqual(DailyEntry.objects.for_dog(self.dog).count(), 1)
+
+    def test_admin_upload(self):
+        admin_user = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.dog.caregivers.add(admin_user)
+        stranger = User.objects.create_user(username='stranger', password='testpass123')
+        foreign = DogProfile.objects.create(user=stranger, name='Rex', weight_kg=30)
+        self.client.login(username='admin', password='adminpass123')
+        url = reverse('admin:health_dailyentry_import')
+        response = self.client.get(url)
+        self.assertEqual(list(response.context['form'].fields['dog'].queryset), [self.dog])
+        response = self.client.post(url, {
+            'file': SimpleUploadedFile('history.csv', b'date,good_day\n2026-03-01,yes\n'),
+            'kind': 'entries',
+            'dog': foreign.pk,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(DailyEntry.objects.for_dog(foreign).exists())
+        response = self.client.post(url, {
+            'file': SimpleUploadedFile('history.csv', b'date,good_day\n2026-03-01,yes\n'),
+            'kind': 'entries',
+            'dog': self.dog.pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(DailyEntry.objects.for_dog(self.dog).filter(good_day='yes').exists())
+
+
+@LOCAL_CACHE
+class TrackerBootstrapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.url = reverse('health:api_tracker_bootstrap')
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_bootstrap_payload(self):
+        DailyEntry.objects.create(
+            dog=self.dog, user=self.user, date=date.today() - timedelta(days=1),
+            appetite=2, energy_level=4,
+        )
+        med = Medication.objects.create(dog=self.dog, name='Prednisone', dosage='5mg', frequency='once')
+        MedicationDose.objects.create(medication=med, user=self.user, given_at=timezone.now())
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['date'], date.today().isoformat())
+        self.assertIsNone(data['entry'])
+        self.assertEqual(data['defaults']['appetite'], 2)
+        self.assertEqual(data['medications'][0]['name'], 'Prednisone')
+        self.assertEqual(len(data['medications'][0]['doses_today']), 1)
+        self.assertFalse(DailyEntry.objects.filter(date=date.today()).exists())
+
+    def test_bootstrap_today_overrides_yesterday(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today() - timedelta(days=1), appetite=2)
+        DailyEntry.objects.create(
+            dog=self.dog, user=self.user, date=date.today(), energy_level=5, good_day='yes',
+        )
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['entry']['good_day'], 'yes')
+        self.assertEqual(data['defaults']['energy_level'], 5)
+        self.assertIsNone(data['defaults']['appetite'])
+        self.assertEqual(data['week']['rated_days'], 1)
+
+    def test_bootstrap_is_three_queries_then_cached(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), appetite=3)
+        Medication.objects.create(dog=self.dog, name='Prednisone', dosage='5mg', frequency='once')
+        # session + user + current dog, then entries, medications and doses
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_bootstrap_etag_revalidation(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyEntry.upsert(self.dog, date.today(), self.user, {'appetite': 4})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['entry']['appetite'], 4)
+
+    def test_bootstrap_invalidated_by_dose(self):
+        med = Medication.objects.create(dog=self.dog, name='Prednisone', dosage='5mg', frequency='once')
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            MedicationDose.objects.create(medication=med, user=self.user, given_at=timezone.now())
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data['medications'][0]['doses_today']), 1)
+
+
+class DashboardSnapshotTests(TestCase):
+    CBPI = dict(
+        worst_pain=4, least_pain=1, average_pain=2, current_pain=2, general_activity=3,
+        enjoyment_of_life=3, ability_to_rise=3, ability_to_walk=3, ability_to_run=3,
+        ability_to_climb=3, overall_quality_of_life=3,
+    )
+    CORQ = dict(
+        energy_level=1, playfulness=1, interest_in_surroundings=1, appetite=1,
+        seeks_attention=1, enjoys_interaction=1, greets_family=1, tail_wagging=1,
+        shows_pain=5, vocalizes_pain=5, avoids_touch=5, pants_restless=5,
+        walks_normally=1, rises_easily=1, climbs_stairs=1, jumps=1, global_qol=20,
+    )
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.today = date.today()
+
+    def add_history(self, days, start=0):
+        """Entries, assessments and events for days start+1..start+days ago."""
+        entries = []
+        for i in range(start + 1, start + days + 1):
+            entry = DailyEntry(
+                dog=self.dog, user=self.user, date=self.today - timedelta(days=i),
+                good_day='yes', appetite=4 if i <= 7 else 2,
+            )
+            entry.refresh_scores()
+            entries.append(entry)
+        DailyEntry.objects.bulk_create(entries)
+        DailyEntryRollup.rebuild()
+        for i in range(start, start + days, 30):
+            day = self.today - timedelta(days=i + 3)
+            CBPIAssessment.objects.create(dog=self.dog, user=self.user, date=day, **self.CBPI)
+            CORQAssessment.objects.create(dog=self.dog, user=self.user, date=day, **self.CORQ)
+            LymphNodeMeasurement.objects.create(dog=self.dog, user=self.user, date=day)
+            VCOGCTCAEEvent.objects.create(
+                dog=self.dog, user=self.user, date=day, category='gastrointestinal',
+                event='nausea', grade=1,
+            )
+            TreatmentSession.objects.create(dog=self.dog, user=self.user, date=day, treatment_type='chemo')
+            TimelineEntry.objects.create(
+                dog=self.dog, user=self.user, date=day, entry_type='vet_visit', title='Checkup', content='',
+            )
+        # Past visits never marked done stay scheduled
+        TimelineEntry.objects.update(status='scheduled')
+
+    def test_query_budget_is_fixed(self):
+        self.add_history(30)
+        with CaptureQueriesContext(connection) as small:
+            DashboardSnapshot(self.dog, self.user).context()
+        self.add_history(2 * 365, start=30)
+        with self.assertNumQueries(len(small)):
+            DashboardSnapshot(self.dog, self.user).context()
+        # summary, schedules, trend, entries, CORQ fallback, medications,
+        # appointments, events, treatments, nutrition
+        self.assertEqual(len(small), 10)
+
+    def test_snapshot_context(self):
+        self.add_history(30)
+        med = Medication.objects.create(dog=self.dog, name='Prednisone', dosage='5mg', frequency='once')
+        Medication.objects.create(dog=self.dog, name='Ondansetron', dosage='4mg', frequency='asNeeded')
+        MedicationDose.objects.create(medication=med, user=self.user, given_at=timezone.now())
+        TimelineEntry.objects.create(
+            dog=self.dog, user=self.user, date=self.today + timedelta(days=2),
+            entry_type='vet_visit', title='Recheck', content='',
+        )
+        DailyEntry.objects.filter(date=self.today - timedelta(days=9)).update(overall_score=1.5)
+
+        context = DashboardSnapshot(self.dog, self.user).context()
+        self.assertIsNone(context['today_entry'])
+        self.assertEqual(context['worst_day'].date, self.today - timedelta(days=9))
+        self.assertEqual(context['trend'], 'improving')
+        self.assertEqual(context['doses_given'], {med.pk})
+        self.assertEqual([a.title for a in context['upcoming_appointments']], ['Recheck'])
+        self.assertEqual(len(context['overdue_appointments']), 1)
+        self.assertEqual(context['recent_events'][0].date, self.today - timedelta(days=3))
+        self.assertEqual(context['latest_node_date'], self.today - timedelta(days=3))
+        self.assertEqual([r['name'] for r in context['assessment_reminders']], [])
+        self.assertEqual(context['qol_status'], 'red')
+        self.assertEqual(context['good_days'] + context['mixed_days'] + context['bad_days'], context['total_days'])
+
+    def test_snapshot_today_entry(self):
+        DailyEntry.upsert(self.dog, self.today, self.user, {'appetite': 5, 'food_enjoyment': 4})
+        context = DashboardSnapshot(self.dog, self.user).context()
+        self.assertEqual(context['today_entry'].date, self.today)
+        self.assertEqual(context['worst_day'].date, self.today)
+        self.assertEqual(context['today_scores']['appetite_stars'], 4)
+        self.assertEqual(context['qol_status'], 'green')
+        self.assertEqual(len(context['assessment_reminders']), 3)
+
+
+@LOCAL_CACHE
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('health:dashboard')
+        # The dashboard template needs today's entry
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), appetite=4)
+
+    def test_repeat_load_skips_snapshot_queries(self):
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(self.url)
+        # session + user + current dog + dog switcher list
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertLess(4, len(first))
+        self.assertEqual(response.context['today_entry'].appetite, 4)
+
+    def test_save_invalidates_cached_dashboard(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyEntry.upsert(self.dog, date.today(), self.user, {'appetite': 5, 'food_enjoyment': 5})
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['qol_status'], 'green')
+
+    def test_cached_per_user(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        DogProfile.objects.create(user=other, name='Luna', weight_kg=18)
+        TimelineEntry.objects.create(
+            dog=self.dog, user=self.user, date=date.today() + timedelta(days=1),
+            entry_type='vet_visit', title='Recheck', content='',
+        )
+        self.assertEqual(len(self.client.get(self.url).context['upcoming_appointments']), 1)
+        self.client.login(username='other', password='testpass123')
+        self.assertEqual(len(self.client.get(self.url).context['upcoming_appointments']), 0)
+
+    def test_record_writes_bump_generation(self):
+        med = Medication.objects.create(dog=self.dog, name='Prednisone', dosage='5mg', frequency='once')
+        records = [
+            lambda: DailyEntry.objects.create(dog=self.dog, user=self.user, date=date(2026, 1, 1)),
+            lambda: LymphNodeMeasurement.objects.create(dog=self.dog, user=self.user, date=date.today()),
+            lambda: MedicationDose.objects.create(medication=med, user=self.user, given_at=timezone.now()),
+            lambda: VCOGCTCAEEvent.objects.create(
+                dog=self.dog, user=self.user, date=date.today(), category='gastrointestinal',
+                event='vomiting', grade=1,
+            ),
+            lambda: TreatmentSession.objects.create(
+                dog=self.dog, user=self.user, date=date.today(), treatment_type='chemo',
+            ),
+            lambda: TimelineEntry.objects.create(
+                dog=self.dog, user=self.user, date=date.today(), entry_type='vet_visit',
+                title='Visit', content='',
+            ),
+            lambda: CBPIAssessment.objects.create(
+                dog=self.dog, user=self.user, date=date.today(), **DashboardSnapshotTests.CBPI,
+            ),
+            lambda: CORQAssessment.objects.create(
+                dog=self.dog, user=self.user, date=date.today(), **DashboardSnapshotTests.CORQ,
+            ),
+        ]
+        for create in records:
+            before = generation(self.dog.pk)
+            with self.captureOnCommitCallbacks(execute=True):
+                record = create()
+            self.assertNotEqual(generation(self.dog.pk), before, type(record).__name__)
+            before = generation(self.dog.pk)
+            with self.captureOnCommitCallbacks(execute=True):
+                record.delete()
+            self.assertNotEqual(generation(self.dog.pk), before, type(record).__name__)
+
+
+class ChartBatchTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('health:api_chart_data')
+        self.today = date.today()
+
+    def test_series_share_date_axis(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today - timedelta(days=2), appetite=4)
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today, appetite=2)
+        LymphNodeMeasurement.objects.create(
+            dog=self.dog, user=self.user, date=self.today - timedelta(days=1), mandibular_left=Decimal('2.5'),
+        )
+        CBPIAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CBPI,
+        )
+        data = self.client.get(self.url, {'types': 'daily,nodes,cbpi,corq', 'days': 90}).json()
+        self.assertEqual(data['dates'], [(self.today - timedelta(days=i)).isoformat() for i in (2, 1, 0)])
+        self.assertEqual(data['series']['daily']['overall'], [4, None, 2])
+        self.assertEqual(data['series']['nodes']['mandibular_left'], [None, 2.5, None])
+        self.assertEqual(data['series']['cbpi']['severity'], [None, None, 2.25])
+        self.assertEqual(data['series']['corq']['total'], [None, None, None])
+        self.assertEqual(data['days'], 90)
+
+    def test_nodes_prefer_clinic_reading(self):
+        for source, size in (('home', '3.0'), ('clinic', '2.0')):
+            LymphNodeMeasurement.objects.create(
+                dog=self.dog, user=self.user, date=self.today, source=source, popliteal_left=Decimal(size),
+            )
+        data = self.client.get(self.url, {'types': 'nodes'}).json()
+        self.assertEqual(data['series']['nodes']['popliteal_left'], [2.0])
+        self.assertEqual(list(data['series']), ['nodes'])
+
+    def test_batch_is_one_query_per_series(self):
+        # session + user + current dog, then per series a validator and a read
+        with self.assertNumQueries(3 + 4 + 4):
+            self.client.get(self.url, {'types': 'daily,nodes,cbpi,corq'})
+
+    def test_unknown_type_rejected(self):
+        for types in ('daily,events', ''):
+            response = self.client.get(self.url, {'types': types})
+            self.assertEqual(response.status_code, 400)
+
+
+class EventChartTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('health:api_chart_data')
+        self.today = date.today()
+
+    def add_event(self, days_ago, category, event, grade):
+        VCOGCTCAEEvent.objects.create(
+            dog=self.dog, user=self.user, date=self.today - timedelta(days=days_ago),
+            category=category, event=event, grade=grade,
+        )
+
+    def test_totals_matrix_and_weeks(self):
+        self.add_event(0, 'gastrointestinal', 'vomiting', 2)
+        self.add_event(0, 'gastrointestinal', 'vomiting', 2)
+        self.add_event(1, 'gastrointestinal', 'diarrhea', 1)
+        self.add_event(8, 'constitutional', 'lethargy', 3)
+        self.add_event(40, 'constitutional', 'lethargy', 4)
+        data = self.client.get(self.url, {'type': 'events', 'days': 30}).json()
+        self.assertEqual(data['grades'], {'grade_1': 1, 'grade_2': 2, 'grade_3': 1, 'grade_4': 0, 'grade_5': 0})
+        self.assertEqual(data['categories']['gastrointestinal'], 3)
+        self.assertEqual(data['categories']['constitutional'], 1)
+        self.assertEqual(data['categories']['renal'], 0)
+        self.assertEqual(data['matrix']['events'], ['vomiting', 'diarrhea', 'lethargy'])
+        self.assertEqual(data['matrix']['counts'], [[0, 2, 0, 0, 0], [1, 0, 0, 0, 0], [0, 0, 1, 0, 0]])
+
+        weekly = data['periods']
+        this_week = self.today - timedelta(days=self.today.weekday())
+        self.assertEqual(weekly['resolution'], 'week')
+        self.assertEqual(weekly['starts'][-1], this_week.isoformat())
+        self.assertEqual(sum(weekly['counts']), 4)
+        self.assertEqual(len(weekly['starts']), len(weekly['counts']))
+        self.assertIn(0, weekly['counts'])
+        week_of = {week: i for i, week in enumerate(weekly['starts'])}
+        eight_days_ago = self.today - timedelta(days=8)
+        week = week_of[(eight_days_ago - timedelta(days=eight_days_ago.weekday())).isoformat()]
+        self.assertEqual(weekly['grades']['grade_3'][week], 1)
+
+    def test_monthly_periods(self):
+        self.add_event(0, 'gastrointestinal', 'vomiting', 2)
+        self.add_event(400, 'gastrointestinal', 'vomiting', 2)
+        data = self.client.get(self.url, {'type': 'events', 'days': 730, 'resolution': 'month'}).json()
+        periods = data['periods']
+        self.assertEqual(periods['resolution'], 'month')
+        self.assertEqual(periods['starts'][-1], self.today.replace(day=1).isoformat())
+        self.assertIn(len(periods['starts']), (24, 25))
+        self.assertEqual(sum(periods['counts']), 2)
+
+    def test_fixed_query_count(self):
+        for days_ago, (category, _) in enumerate(VCOGCTCAEEvent.CATEGORY_CHOICES):
+            self.add_event(days_ago, category, 'other', days_ago % 5 + 1)
+        # session + user + current dog, the validator, then one grouped read
+        with self.assertNumQueries(3 + 1 + 1):
+            self.client.get(self.url, {'type': 'events', 'days': 30})
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.today = date.today()
+
+    def revalidate(self, url, params=None):
+        """Fetch url, then again with its ETag; returns (first, second)."""
+        first = self.client.get(url, params or {})
+        second = self.client.get(url, params or {}, HTTP_IF_NONE_MATCH=first['ETag'])
+        return first, second
+
+    def test_chart_data_not_modified(self):
+        entry = DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today, appetite=4)
+        url = reverse('health:api_chart_data')
+        first, second = self.revalidate(url, {'type': 'daily'})
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Last-Modified', first)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+        entry.appetite = 2
+        entry.save()
+        response = self.client.get(url, {'type': 'daily'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['overall'], [2])
+
+    def test_delete_changes_validator(self):
+        for days_ago in (0, 1):
+            DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today - timedelta(days=days_ago))
+        url = reverse('health:api_chart_data')
+        etag = self.client.get(url, {'type': 'daily'})['ETag']
+        DailyEntry.objects.filter(date=self.today - timedelta(days=1)).delete()
+        response = self.client.get(url, {'type': 'daily'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_window_is_part_of_validator(self):
+        url = reverse('health:api_chart_data')
+        etag = self.client.get(url, {'type': 'events', 'days': 30})['ETag']
+        response = self.client.get(url, {'type': 'events', 'days': 90}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified_skips_payload(self):
+        url = reverse('health:api_chart_data')
+        etag = self.client.get(url, {'types': 'daily,nodes,cbpi,corq'})['ETag']
+        # session + user + current dog, then one validator read per series
+        with self.assertNumQueries(3 + 4):
+            response = self.client.get(url, {'types': 'daily,nodes,cbpi,corq'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today)
+        url = reverse('health:api_chart_data')
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_foods(self):
+        food = Food.objects.create(name='Chicken Breast', category='protein')
+        url = reverse('health:api_foods')
+        first, second = self.revalidate(url)
+        self.assertEqual(second.status_code, 304)
+        food.status = 'avoid'
+        food.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.json()['foods'][0]['status'], 'avoid')
+
+    def test_nutrition_follows_items_and_foods(self):
+        food = Food.objects.create(name='Chicken Breast', category='protein', protein_g_per_100g=Decimal('31.0'))
+        meal = Meal.objects.create(dog=self.dog, user=self.user, date=self.today, meal_type='breakfast')
+        MealItem.objects.create(meal=meal, food=food, amount_g=100)
+        url = reverse('health:api_nutrition_summary')
+        first, second = self.revalidate(url)
+        self.assertEqual(second.status_code, 304)
+
+        food.protein_g_per_100g = Decimal('20.0')
+        food.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['protein_g'][-1], 20.0)
+
+        MealItem.objects.create(meal=meal, food=food, amount_g=50)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_lab_values(self):
+        LabValue.objects.create(
+            dog=self.dog, user=self.user, date=self.today, test_name='ALT', value=Decimal('40'), unit='U/L',
+        )
+        first, second = self.revalidate(reverse('health:api_lab_values'))
+        self.assertEqual(second.status_code, 304)
+
+    def test_calendar_follows_provider(self):
+        provider = Provider.objects.create(name='Dr. Smith')
+        TimelineEntry.objects.create(
+            dog=self.dog, user=self.user, date=self.today, entry_type='vet_visit',
+            title='Checkup', content='', provider=provider,
+        )
+        url = reverse('health:api_calendar_entries')
+        params = {'start': self.today.isoformat(), 'end': self.today.isoformat()}
+        first, second = self.revalidate(url, params)
+        self.assertEqual(second.status_code, 304)
+        provider.name = 'Dr. Jones'
+        provider.save()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.json()['entries'][0]['provider'], 'Dr. Jones')
+
+
+class DownsamplingTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('health:api_chart_data')
+        self.today = date.today()
+
+    def add_days(self, count):
+        entries = []
+        for i in range(count):
+            entry = DailyEntry(
+                dog=self.dog, user=self.user, date=self.today - timedelta(days=i), appetite=i % 5 + 1,
+            )
+            entry.refresh_scores()
+            entries.append(entry)
+        DailyEntry.objects.bulk_create(entries)
+
+    def test_lttb_keeps_ends_and_peaks(self):
+        ys = [1] * 1000
+        ys[500] = 50
+        kept = lttb(ys, 100)
+        self.assertEqual(len(kept), 100)
+        self.assertEqual((kept[0], kept[-1]), (0, 999))
+        self.assertIn(500, kept)
+        self.assertEqual(kept, sorted(kept))
+
+    def test_lttb_skips_gaps(self):
+        self.assertEqual(lttb([1, None, 3, None]), [0, 2])
+        kept = lttb([None if i % 2 else i for i in range(1000)], 10)
+        self.assertTrue(all(i % 2 == 0 for i in kept))
+
+    def test_bucket_reports_min_mean_max(self):
+        monday = date(2026, 3, 2)
+        values = {
+            monday: {'overall': 2},
+            monday + timedelta(days=1): {'overall': 4},
+            monday + timedelta(days=2): {'overall': None},
+            monday + timedelta(days=7): {'overall': 3},
+        }
+        buckets = bucket(values, ['overall'], 'week')
+        self.assertEqual(buckets[monday], {'overall': 3, 'overall_min': 2, 'overall_max': 4})
+        self.assertEqual(buckets[monday + timedelta(days=7)]['overall'], 3)
+
+    def test_auto_resolution(self):
+        self.assertEqual(resolve('auto', self.today - timedelta(days=90), self.today), 'day')
+        self.assertEqual(resolve('auto', self.today - timedelta(days=730), self.today), 'week')
+        self.assertEqual(resolve('auto', self.today - timedelta(days=3650), self.today), 'month')
+        self.assertEqual(resolve('day', self.today - timedelta(days=3650), self.today), 'day')
+
+    def test_long_span_is_bucketed(self):
+        self.add_days(400)
+        data = self.client.get(self.url, {'type': 'daily', 'days': 400}).json()
+        self.assertEqual(data['resolution'], 'week')
+        self.assertLessEqual(len(data['labels']), 60)
+        self.assertEqual(data['overall_min'][-2], 1)
+        self.assertEqual(data['overall_max'][-2], 5)
+        self.assertTrue(1 < data['overall'][-2] < 5)
+
+        data = self.client.get(self.url, {'types': 'daily', 'days': 400, 'resolution': 'month'}).json()
+        self.assertEqual(data['resolution'], 'month')
+        self.assertLessEqual(len(data['dates']), 15)
+        self.assertIn('overall_max', data['series']['daily'])
+
+    def test_day_resolution_is_capped(self):
+        self.add_days(400)
+        data = self.client.get(self.url, {'type': 'daily', 'days': 400, 'resolution': 'day'}).json()
+        self.assertEqual(len(data['labels']), MAX_POINTS)
+        self.assertEqual(len(data['overall']), MAX_POINTS)
+        data = self.client.get(self.url, {'types': 'daily,nodes', 'days': 400, 'resolution': 'day'}).json()
+        self.assertLessEqual(len(data['dates']), MAX_POINTS)
+
+    def test_batch_within_cap_is_not_thinned(self):
+        self.add_days(200)
+        data = self.client.get(self.url, {'types': 'daily,nodes,cbpi,corq', 'days': 200, 'resolution': 'day'}).json()
+        self.assertEqual(len(data['dates']), 200)
+        self.assertNotIn(None, data['series']['daily']['overall'])
+
+    def test_short_span_unchanged(self):
+        self.add_days(3)
+        data = self.client.get(self.url, {'type': 'daily', 'days': 30}).json()
+        self.assertEqual(data['resolution'], 'day')
+        self.assertEqual(len(data['labels']), 3)
+
+    def test_unknown_resolution_rejected(self):
+        response = self.client.get(self.url, {'type': 'daily', 'resolution': 'hour'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('health:api_nutrition_summary'), {'resolution': 'hour'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_nutrition_by_week(self):
+        food = Food.objects.create(name='Chicken Breast', category='protein', protein_g_per_100g=Decimal('30.0'))
+        meal = Meal.objects.create(dog=self.dog, user=self.user, date=self.today, meal_type='breakfast')
+        MealItem.objects.create(meal=meal, food=food, amount_g=140)
+        data = self.client.get(
+            reverse('health:api_nutrition_summary'), {'days': 60, 'resolution': 'week'}
+        ).json()
+        self.assertEqual(data['resolution'], 'week')
+        self.assertEqual(data['food_g_max'][-1], 140)
+        self.assertEqual(data['food_g_min'][-2], 0)
+        self.assertEqual(data['protein_g_max'][-1], 42.0)
+
+
+class CompareLatencyTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today())
+
+    def test_times_both_handlers(self):
+        out = StringIO()
+        call_command('compare_latency', 'testuser', '--requests', '2', stdout=out)
+        output = out.getvalue()
+        self.assertIn(reverse('health:dashboard'), output)
+        self.assertEqual(output.count('wsgi  median'), 3)
+        self.assertEqual(output.count('asgi  median'), 3)
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('compare_latency', 'nobody', stdout=StringIO())
+
+
+class LiveEventTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('health:live_events')
+
+    def read(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join(response.streaming_content).decode()
+
+    def test_dose_published_after_commit(self):
+        med = Medication.objects.create(dog=self.dog, name='Prednisone', dosage='20mg')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('health:record_dose', args=[med.id]))
+        event = LiveEvent.objects.for_dog(self.dog).get()
+        self.assertEqual(event.kind, 'dose')
+        self.assertEqual(event.data['medication'], med.id)
+        self.assertEqual(event.data['user'], 'testuser')
+
+    def test_entry_carries_committed_state(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), breakfast=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('health:save_entry'), json.dumps({'appetite': 4, 'energy_level': 2}),
+                content_type='application/json',
+            )
+        data = LiveEvent.objects.for_dog(self.dog).get(kind='entry').data
+        self.assertEqual(data['date'], date.today().isoformat())
+        self.assertEqual(data['scores']['appetite'], 4)
+        self.assertEqual(data['scores']['energy'], 2)
+        self.assertEqual(data['scores']['overall'], 3)
+        self.assertTrue(data['meals']['breakfast'])
+
+    def test_new_connection_starts_at_latest(self):
+        LiveEvent.objects.create(dog=self.dog, kind='dose', data={})
+        latest = LiveEvent.objects.create(dog=self.dog, kind='dose', data={})
+        body = self.read()
+        self.assertIn(f'retry: {RETRY_MS}', body)
+        self.assertIn(f'id: {latest.pk}\n\n', body)
+        self.assertNotIn('event:', body)
+
+    def test_reconnect_resumes_after_last_event_id(self):
+        first = LiveEvent.objects.create(dog=self.dog, kind='dose', data={'medication': 1})
+        second = LiveEvent.objects.create(dog=self.dog, kind='entry', data={'date': '2026-01-01'})
+        other = DogProfile.objects.create(user=self.user, name='Luna', weight_kg=18)
+        LiveEvent.objects.create(dog=other, kind='dose', data={})
+        body = self.read(last_event_id=str(first.pk))
+        self.assertEqual(body.count('event:'), 1)
+        self.assertIn(f'id: {second.pk}\nevent: entry\ndata: {{"date": "2026-01-01"}}\n\n', body)
+
+    def test_old_events_pruned(self):
+        stale = LiveEvent.objects.create(dog=self.dog, kind='dose', data={})
+        LiveEvent.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(days=2))
+        with self.captureOnCommitCallbacks(execute=True):
+            publish(self.dog, 'dose', {})
+        self.assertFalse(LiveEvent.objects.filter(pk=stale.pk).exists())
+        self.assertEqual(LiveEvent.objects.count(), 1)
+
+    async def test_astream_wakes_on_publish(self):
+        # A long poll interval, so only the in-process wake-up delivers in time
+        with mock.patch('health.live.POLL_INTERVAL', 30):
+            events = astream(self.dog.pk, 0)
+            self.assertEqual(await anext(events), f'retry: {RETRY_MS}\n\n')
+            pending = asyncio.ensure_future(anext(events))
+            await asyncio.sleep(0.1)
+            await LiveEvent.objects.acreate(dog=self.dog, kind='dose', data={'medication': 7})
+            await asyncio.get_running_loop().run_in_executor(None, notify)
+            chunk = await asyncio.wait_for(pending, 5)
+            await events.aclose()
+        self.assertIn('event: dose', chunk)
+
+
+@LOCAL_CACHE
+class SparklineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.today = date.today()
+
+    def test_render_scales_to_bounds(self):
+        start = date(2026, 1, 1)
+        svg = render([('#000', {start: 1, date(2026, 1, 3): None, date(2026, 1, 5): 5})], start, date(2026, 1, 5), (1, 5))
+        self.assertIn('points="2.0,30.0 118.0,2.0"', svg)
+        self.assertIn('<circle cx="118.0" cy="2.0"', svg)
+        self.assertEqual(render([('#000', {start: None})], start, start), '')
+
+    def test_sparklines_from_records(self):
+        for days_ago, score in [(2, 2), (1, 4)]:
+            DailyEntry.objects.create(
+                dog=self.dog, user=self.user, date=self.today - timedelta(days=days_ago), appetite=score,
+            )
+        LymphNodeMeasurement.objects.create(
+            dog=self.dog, user=self.user, date=self.today, mandibular_left=Decimal('2.5'),
+        )
+        sparklines = cached_sparklines(self.dog)
+        self.assertEqual(sparklines['overall']['latest'], 4)
+        self.assertEqual(sparklines['overall']['svg'].count('<polyline'), 1)
+        self.assertEqual(sparklines['nodes']['latest'], 2.5)
+        self.assertEqual(sparklines['cbpi'], {'svg': '', 'latest': None})
+
+    def test_cached_until_write(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today, appetite=3)
+        cached_sparklines(self.dog)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_sparklines(self.dog)['overall']['latest'], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            CORQAssessment.objects.create(
+                dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CORQ,
+            )
+        self.assertIsNotNone(cached_sparklines(self.dog)['corq']['latest'])
+
+    def test_dashboard_embeds_svg(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today, appetite=3)
+        response = self.client.get(reverse('health:dashboard'))
+        self.assertContains(response, '<svg class="sparkline"', count=1)
+        self.assertContains(response, 'No data yet', count=3)
+
+
+@LOCAL_CACHE
+class TrendEngineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('health:api_trends')
+        self.today = date.today()
+
+    def test_linear_fit(self):
+        slope, intercept, stderr, noise = linear_fit([0, 1, 2, 3], [1, 3, 5, 7])
+        self.assertAlmostEqual(slope, 2)
+        self.assertAlmostEqual(intercept, 1)
+        self.assertAlmostEqual(stderr, 0)
+        self.assertIsNone(linear_fit([0, 1], [1, 2]))
+        self.assertIsNone(linear_fit([2, 2, 2], [1, 2, 3]))
+
+    def test_ewma_weights_by_time(self):
+        self.assertEqual(ewma([0, 7], [2, 4]), [2, 3])
+        self.assertEqual(ewma([0, 14], [2, 4]), [2, 3.5])
+
+    def test_noise_reads_as_stable(self):
+        xs = list(range(14))
+        self.assertEqual(analyse(xs, [3, 4] * 7)['trend'], 'stable')
+        rising = analyse(xs, [2 + x * 0.1 for x in xs])
+        self.assertEqual(rising['trend'], 'improving')
+        self.assertAlmostEqual(rising['weekly_change'], 0.7)
+        self.assertEqual(analyse(xs, [2 + x * 0.1 for x in xs], higher_is_better=False)['trend'], 'declining')
+        # A real but tiny drift is below the smallest meaningful change
+        self.assertEqual(analyse(xs, [3 + x * 0.01 for x in xs])['trend'], 'stable')
+        self.assertEqual(analyse(xs[:4], [1, 2, 3, 4])['trend'], 'insufficient')
+
+    def test_api_reports_every_metric(self):
+        for i in range(10):
+            DailyEntry.objects.create(
+                dog=self.dog, user=self.user, date=self.today - timedelta(days=i),
+                appetite=5 if i < 5 else 1,
+            )
+        data = self.client.get(self.url, {'days': 14}).json()
+        self.assertEqual(data['days'], 14)
+        self.assertEqual(set(data['metrics']), set(METRICS))
+        self.assertEqual(data['metrics']['appetite']['trend'], 'improving')
+        self.assertEqual(data['metrics']['appetite']['points'], 10)
+        self.assertEqual(data['metrics']['cbpi_severity']['points'], 0)
+        low, high = data['metrics']['appetite']['interval']
+        self.assertLess(low, data['metrics']['appetite']['weekly_change'])
+        self.assertGreater(high, data['metrics']['appetite']['weekly_change'])
+
+    def test_cached_until_write(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today, appetite=3)
+        self.client.get(self.url, {'metrics': 'overall,corq_total'})
+        # session + user + current dog
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'metrics': 'overall,corq_total'})
+        with self.captureOnCommitCallbacks(execute=True):
+            CORQAssessment.objects.create(
+                dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CORQ,
+            )
+        data = self.client.get(self.url, {'metrics': 'corq_total'}).json()
+        self.assertEqual(data['metrics']['corq_total']['points'], 1)
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'metrics': 'overall,weight'}, {'days': '3'}, {'days': 'abc'}, {'days': '400'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class StoredAssessmentScoresTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.today = date.today()
+
+    def test_scores_stored_on_save(self):
+        cbpi = CBPIAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CBPI,
+        )
+        cbpi.refresh_from_db()
+        self.assertEqual(cbpi.pain_severity_score, 2.25)
+        self.assertEqual(cbpi.pain_interference_score, 3)
+        corq = CORQAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CORQ,
+        )
+        corq.refresh_from_db()
+        self.assertEqual(
+            [corq.vitality_score, corq.companionship_score, corq.pain_score, corq.mobility_score, corq.total_score],
+            [4, 4, 4, 4, 16],
+        )
+
+    def test_update_fields_refreshes_scores(self):
+        cbpi = CBPIAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CBPI,
+        )
+        cbpi.ability_to_run = 9
+        cbpi.save(update_fields=['ability_to_run'])
+        self.assertEqual(CBPIAssessment.objects.get().pain_interference_score, 4)
+
+    def test_filter_by_score_in_sql(self):
+        for run in (3, 9):
+            CBPIAssessment.objects.create(
+                dog=self.dog, user=self.user, date=self.today,
+                **{**DashboardSnapshotTests.CBPI, 'ability_to_run': run, 'ability_to_climb': run},
+            )
+        self.assertEqual(CBPIAssessment.objects.for_dog(self.dog).filter(pain_interference_score__gte=5).count(), 1)
+
+    def test_chart_series_build_no_instances(self):
+        CBPIAssessment.objects.create(dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CBPI)
+        CORQAssessment.objects.create(dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CORQ)
+        start = self.today - timedelta(days=30)
+        with mock.patch.object(CBPIAssessment, 'from_db') as cbpi_rows, \
+                mock.patch.object(CORQAssessment, 'from_db') as corq_rows:
+            table = series_table(self.dog, ['cbpi', 'corq'], start)
+            cbpi = chart_data(self.dog, 'cbpi', start, self.today)
+            corq = chart_data(self.dog, 'corq', start, self.today)
+        cbpi_rows.assert_not_called()
+        corq_rows.assert_not_called()
+        self.assertEqual(table['series']['cbpi']['severity'], [2.25])
+        self.assertEqual(table['series']['corq']['total'], [16])
+        self.assertEqual(cbpi['interference'], [3])
+        self.assertEqual(corq['pain'], [4])
+
+    def test_backfill(self):
+        CBPIAssessment.objects.create(dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CBPI)
+        CORQAssessment.objects.create(dog=self.dog, user=self.user, date=self.today, **DashboardSnapshotTests.CORQ)
+        CBPIAssessment.objects.update(pain_severity_score=0, pain_interference_score=0)
+        CORQAssessment.objects.update(pain_score=0, total_score=0)
+        migration = importlib.import_module('health.migrations.0016_assessment_scores')
+        migration.backfill_scores(django_apps, None)
+        self.assertEqual(CBPIAssessment.objects.get().pain_severity_score, 2.25)
+        self.assertEqual(CORQAssessment.objects.values_list('pain_score', 'total_score').get(), (4, 16))
+
+
+@LOCAL_CACHE
+class PsychometricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.today = date.today()
+
+    def add_cbpi(self, days_ago, severity, interference):
+        CBPIAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today - timedelta(days=days_ago),
+            **{**DashboardSnapshotTests.CBPI, **dict(zip(CBPIAssessment.SEVERITY_FIELDS, severity)),
+               **dict(zip(CBPIAssessment.INTERFERENCE_FIELDS, interference))},
+        )
+
+    def test_cronbach_alpha(self):
+        # Perfectly parallel items are fully consistent
+        self.assertEqual(cronbach_alpha([[1, 2, 3], [1, 2, 3]]), 1)
+        # 3 items, 4 assessments: 1.5 * (1 - 3.9375 / 10.6875)
+        self.assertEqual(cronbach_alpha([[1, 2, 3, 4], [2, 2, 3, 5], [1, 3, 3, 4]]), 0.947)
+        self.assertIsNone(cronbach_alpha([[1, 2, 3]]))
+        self.assertIsNone(cronbach_alpha([[3, 3], [2, 2]]))
+
+    def test_item_total_is_corrected(self):
+        # c against a + b = [2, 4, 7], not against a total that includes c
+        results = item_total([[1, 2, 3], [1, 2, 4], [3, 2, 1]], ['a', 'b', 'c'])
+        self.assertGreater(results['a'], 0)
+        self.assertEqual(results['c'], -0.993)
+        self.assertIsNone(item_total([[1, 2], [3, 3]], ['a', 'b'])['a'])
+
+    def test_cbpi_change_flags(self):
+        self.add_cbpi(21, [6, 6, 6, 6], [6, 6, 6, 6, 6, 6])
+        self.add_cbpi(14, [5, 6, 5, 6], [6, 5, 6, 5, 6, 5])
+        self.add_cbpi(7, [4, 5, 5, 5], [3, 4, 4, 3, 4, 4])
+        self.add_cbpi(0, [8, 7, 7, 8], [9, 8, 9, 8, 9, 8])
+        results = analyse_instrument(self.dog, 'cbpi')
+        self.assertEqual(results['assessments'], 4)
+        self.assertEqual(results['baseline']['scores'], {'severity': 6, 'interference': 6})
+        first, second, third = results['changes']
+        self.assertEqual(first['change'], {'severity': -0.5, 'interference': -0.5})
+        self.assertEqual(first['flags'], {})
+        self.assertEqual(second['flags'], {'severity': 'improved', 'interference': 'improved'})
+        self.assertEqual(third['flags'], {'severity': 'worsened', 'interference': 'worsened'})
+        self.assertIsNotNone(results['factors']['severity']['alpha'])
+        self.assertEqual(set(results['factors']['interference']['item_total']), set(CBPIAssessment.INTERFERENCE_FIELDS))
+
+    def test_corq_flags_half_sd_of_totals(self):
+        for days_ago, item in [(14, 2), (7, 3), (0, 4)]:
+            CORQAssessment.objects.create(
+                dog=self.dog, user=self.user, date=self.today - timedelta(days=days_ago),
+                **{**DashboardSnapshotTests.CORQ, 'energy_level': item, 'playfulness': item},
+            )
+        results = analyse_instrument(self.dog, 'corq')
+        # totals 18, 20, 22: half an SD is 0.82
+        self.assertEqual([row['change']['total'] for row in results['changes']], [2, 4])
+        self.assertEqual(results['changes'][1]['flags'], {'total': 'improved'})
+        self.assertEqual(results['factors']['vitality']['alpha'], 0.667)
+
+    def test_api_reads_each_instrument_once_and_caches(self):
+        self.add_cbpi(7, [6, 6, 6, 6], [6, 6, 6, 6, 6, 6])
+        url = reverse('health:api_psychometrics')
+        # session + user + current dog + one item-matrix query per instrument
+        with self.assertNumQueries(5):
+            data = self.client.get(url).json()
+        self.assertEqual(data['cbpi']['assessments'], 1)
+        self.assertEqual(data['corq'], {'assessments': 0, 'factors': mock.ANY, 'baseline': None, 'changes': []})
+        with self.assertNumQueries(3):
+            self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_cbpi(0, [2, 2, 2, 2], [2, 2, 2, 2, 2, 2])
+        self.assertEqual(self.client.get(url).json()['cbpi']['changes'][0]['flags']['severity'], 'improved')
+
+    def test_dashboard_panel(self):
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today, appetite=3)
+        self.add_cbpi(7, [6, 6, 6, 6], [6, 6, 6, 6, 6, 6])
+        self.add_cbpi(0, [2, 3, 2, 3], [2, 2, 2, 2, 2, 2])
+        response = self.client.get(reverse('health:dashboard'))
+        self.assertContains(response, 'Assessment Analysis')
+        self.assertContains(response, 'PSS -3.50')
+        self.assertContains(response, 'No CBPI or CORQ', count=0)
+
+
+class AssessmentScheduleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.today = date.today()
+
+    def schedule(self, instrument, dog=None):
+        return AssessmentSchedule.objects.get(dog=dog or self.dog, instrument=instrument)
+
+    def test_new_dog_is_due_for_everything(self):
+        self.assertEqual(
+            sorted(AssessmentSchedule.objects.for_dog(self.dog).values_list('instrument', 'cadence_days', 'next_due')),
+            [('cbpi', 7, self.today), ('corq', 14, self.today), ('nodes', 7, self.today)],
+        )
+
+    def test_next_due_follows_records(self):
+        CBPIAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today - timedelta(days=3), **DashboardSnapshotTests.CBPI,
+        )
+        self.assertEqual(self.schedule('cbpi').next_due, self.today + timedelta(days=4))
+        node = LymphNodeMeasurement.objects.create(dog=self.dog, user=self.user, date=self.today - timedelta(days=20))
+        self.assertEqual(self.schedule('nodes').last_done, self.today - timedelta(days=20))
+        node.delete()
+        self.assertIsNone(self.schedule('nodes').last_done)
+
+    def test_deleting_last_record_makes_it_due_today(self):
+        node = LymphNodeMeasurement.objects.create(dog=self.dog, user=self.user, date=self.today - timedelta(days=2))
+        self.assertEqual(self.schedule('nodes').next_due, self.today + timedelta(days=5))
+        node.delete()
+        self.assertEqual(self.schedule('nodes').next_due, timezone.localdate())
+
+    def test_due_uses_local_date(self):
+        ahead = self.today + timedelta(days=1)
+        CBPIAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today - timedelta(days=6), **DashboardSnapshotTests.CBPI,
+        )
+        with mock.patch('health.models.timezone.localdate', return_value=ahead):
+            self.assertIn('cbpi', AssessmentSchedule.objects.due().values_list('instrument', flat=True))
+
+    def test_cadence_is_configurable(self):
+        CORQAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today - timedelta(days=10), **DashboardSnapshotTests.CORQ,
+        )
+        schedule = self.schedule('corq')
+        self.assertEqual(schedule.next_due, self.today + timedelta(days=4))
+        schedule.cadence_days = 7
+        schedule.save(update_fields=['cadence_days'])
+        self.assertEqual(self.schedule('corq').next_due, self.today - timedelta(days=3))
+
+    def test_due_across_all_dogs_in_one_query(self):
+        other = DogProfile.objects.create(user=self.user, name='Luna', weight_kg=18)
+        for dog in (self.dog, other):
+            CBPIAssessment.objects.create(dog=dog, user=self.user, date=self.today, **DashboardSnapshotTests.CBPI)
+        LymphNodeMeasurement.objects.create(dog=other, user=self.user, date=self.today - timedelta(days=9))
+        with self.assertNumQueries(1):
+            due = [(s.dog_id, s.instrument) for s in AssessmentSchedule.objects.due(self.today)]
+        self.assertEqual(due[0], (other.pk, 'nodes'))
+        self.assertEqual(len(due), 4)
+        self.assertNotIn((self.dog.pk, 'cbpi'), due)
+
+    def test_dashboard_reminders(self):
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=self.today)
+        CBPIAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today - timedelta(days=7), **DashboardSnapshotTests.CBPI,
+        )
+        LymphNodeMeasurement.objects.create(dog=self.dog, user=self.user, date=self.today - timedelta(days=9))
+        reminders = {
+            r['name']: (r['days'], r['overdue'])
+            for r in client.get(reverse('health:dashboard')).context['assessment_reminders']
+        }
+        self.assertEqual(reminders, {'CBPI Pain': (7, False), 'CORQ QoL': (None, True), 'Lymph Nodes': (9, True)})
+
+    def test_node_form_moves_schedule(self):
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+        client.post(
+            reverse('health:save_nodes'), json.dumps({'mandibular_left': '2.5'}), content_type='application/json'
+        )
+        self.assertEqual(self.schedule('nodes').last_done, self.today)
+        reminders = client.get(reverse('health:dashboard')).context['assessment_reminders']
+        self.assertNotIn('Lymph Nodes', [r['name'] for r in reminders])
+
+    def test_node_import_moves_schedule(self):
+        rows = [(2, {'date': (self.today - timedelta(days=2)).isoformat(), 'mandibular_left': '2.1'})]
+        import_rows('nodes', rows, self.dog, self.user)
+        self.assertEqual(self.schedule('nodes').last_done, self.today - timedelta(days=2))
+
+    def test_backfill_for_existing_dogs(self):
+        CBPIAssessment.objects.create(
+            dog=self.dog, user=self.user, date=self.today - timedelta(days=2), **DashboardSnapshotTests.CBPI,
+        )
+        AssessmentSchedule.objects.all().delete()
+        migration = importlib.import_module('health.migrations.0017_assessment_schedules')
+        migration.create_schedules(django_apps, None)
+        self.assertEqual(self.schedule('cbpi').next_due, self.today + timedelta(days=5))
+        self.assertEqual(self.schedule('corq').next_due, self.today)
+
+
+class AssessmentImportTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.today = date.today()
+
+    def cbpi(self, days_ago, **items):
+        return {'date': (self.today - timedelta(days=days_ago)).isoformat(), **DashboardSnapshotTests.CBPI, **items}
+
+    def post(self, url_name, assessments):
+        return self.client.post(
+            reverse(url_name), json.dumps({'assessments': assessments}), content_type='application/json',
+        )
+
+    def test_backdated_batch_in_one_transaction(self):
+        stack = [self.cbpi(days) for days in (28, 21, 14)]
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post('health:import_cbpi', stack)
+        self.assertEqual(response.json(), {'status': 'success', 'created': 3, 'skipped': 0})
+        self.assertEqual(sum('INSERT INTO "health_cbpiassessment"' in q['sql'] for q in queries), 1)
+        rows = CBPIAssessment.objects.for_dog(self.dog).order_by('date')
+        self.assertEqual([r.date for r in rows], [self.today - timedelta(days=d) for d in (28, 21, 14)])
+        self.assertEqual({r.source for r in rows}, {'clinic'})
+        self.assertEqual(rows[0].pain_severity_score, 2.25)
+        self.assertEqual(
+            AssessmentSchedule.objects.get(dog=self.dog, instrument='cbpi').last_done,
+            self.today - timedelta(days=14),
+        )
+
+    def test_invalid_item_rejects_whole_stack(self):
+        response = self.post('health:import_cbpi', [
+            self.cbpi(14), self.cbpi(7, worst_pain=11), self.cbpi(3, jumps=2),
+            {**self.cbpi(1), 'date': (self.today + timedelta(days=1)).isoformat()},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [
+            {'index': 1, 'message': 'worst_pain must be between 0 and 10'},
+            {'index': 3, 'message': f'date {self.today + timedelta(days=1)} is in the future'},
+        ])
+        self.assertFalse(CBPIAssessment.objects.exists())
+
+    def test_missing_item_and_bad_body(self):
+        row = self.cbpi(7)
+        del row['least_pain']
+        response = self.post('health:import_cbpi', [row])
+        self.assertEqual(response.json()['errors'][0]['message'], 'least_pain is required')
+        self.assertEqual(self.post('health:import_cbpi', 'not a list').status_code, 400)
+
+    def test_reimport_skips_recorded(self):
+        stack = [self.cbpi(14), self.cbpi(7, source='home')]
+        self.post('health:import_cbpi', stack)
+        response = self.post('health:import_cbpi', stack + [self.cbpi(3)])
+        self.assertEqual(response.json(), {'status': 'success', 'created': 1, 'skipped': 2})
+        self.assertEqual(CBPIAssessment.objects.filter(source='home').count(), 1)
+
+    def test_duplicate_rows_keep_the_last(self):
+        response = self.post('health:import_cbpi', [self.cbpi(7), self.cbpi(7, worst_pain=9), self.cbpi(7, source='home')])
+        self.assertEqual(response.json(), {'status': 'success', 'created': 2, 'skipped': 1})
+        self.assertEqual(CBPIAssessment.objects.get(source='clinic').worst_pain, 9)
+
+    def test_corq_endpoint(self):
+        corq = {'date': (self.today - timedelta(days=5)).isoformat(), **DashboardSnapshotTests.CORQ}
+        response = self.post('health:import_corq', [corq, {**corq, 'global_qol': 101}])
+        self.assertEqual(response.json()['errors'], [{'index': 1, 'message': 'global_qol must be between 0 and 100'}])
+        response = self.post('health:import_corq', [corq])
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(CORQAssessment.objects.get().total_score, 16)
+
+    def test_command_reads_csv_and_json(self):
+        fields = ['date', *CBPIAssessment.SEVERITY_FIELDS, *CBPIAssessment.INTERFERENCE_FIELDS, 'overall_quality_of_life']
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, 'stack.csv')
+            with open(csv_path, 'w') as f:
+                f.write(','.join(fields) + '\n')
+                f.write(','.join(str(self.cbpi(10)[field]) for field in fields) + '\n')
+            json_path = os.path.join(directory, 'stack.json')
+            with open(json_path, 'w') as f:
+                json.dump([self.cbpi(3)], f)
+            out = StringIO()
+            call_command('import_assessments', 'cbpi', csv_path, stdout=out)
+            call_command('import_assessments', 'cbpi', json_path, stdout=out)
+            self.assertIn('1 created', out.getvalue())
+            with open(json_path, 'w') as f:
+                json.dump([self.cbpi(1, current_pain=-1)], f)
+            with self.assertRaisesMessage(CommandError, 'Nothing imported: 1 invalid rows'):
+                call_command('import_assessments', 'cbpi', json_path, stdout=out, stderr=StringIO())
+        self.assertEqual(CBPIAssessment.objects.count(), 2)
+
+
+@LOCAL_CACHE
+class MedicationAdherenceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.client.login(username='testuser', password='testpass123')
+        self.today = date.today()
+        self.med = self.medication('Prednisone', 'twice')
+
+    def medication(self, name, frequency, added_days_ago=10, **kwargs):
+        med = Medication.objects.create(dog=self.dog, name=name, dosage='10mg', frequency=frequency, **kwargs)
+        Medication.objects.filter(pk=med.pk).update(
+            created_at=self.at(added_days_ago, 12)
+        )
+        med.refresh_from_db()
+        return med
+
+    def at(self, days_ago, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.today - timedelta(days=days_ago), time(hour, minute)))
+
+    def dose(self, days_ago, hour, minute=0, medication=None):
+        return MedicationDose.objects.create(
+            medication=medication or self.med, user=self.user, given_at=self.at(days_ago, hour, minute)
+        )
+
+    def row(self, days_ago):
+        return MedicationAdherence.objects.filter(
+            medication=self.med, date=self.today - timedelta(days=days_ago)
+        ).values_list('doses', 'taken', 'on_time').first()
+
+    def test_match_assigns_doses_to_slot_intervals(self):
+        self.assertEqual(MedicationAdherence.match([8, 20], [7.5, 13.9]), (1, 1))
+        self.assertEqual(MedicationAdherence.match([8, 20], [11, 21]), (2, 1))
+        self.assertEqual(MedicationAdherence.match([8, 14, 20], [14.5, 1]), (2, 1))
+        self.assertEqual(MedicationAdherence.match([8, 20], []), (0, 0))
+        self.assertEqual(MedicationAdherence.match([], [9]), (0, 0))
+
+    def test_rows_follow_dose_writes(self):
+        morning = self.dose(2, 8)
+        self.dose(2, 19, 30)
+        self.assertEqual(self.row(2), (2, 2, 2))
+        self.dose(2, 23)
+        self.assertEqual(self.row(2), (3, 2, 2))
+        morning.delete()
+        self.assertEqual(self.row(2), (2, 1, 1))
+        late = MedicationDose.objects.get(given_at=self.at(2, 23))
+        late.given_at = self.at(1, 9)
+        late.save()
+        self.assertEqual(self.row(2), (1, 1, 1))
+        self.assertEqual(self.row(1), (1, 1, 1))
+        MedicationDose.objects.filter(medication=self.med).get(given_at=self.at(2, 19, 30)).delete()
+        self.assertIsNone(self.row(2))
+
+    def test_frequency_change_rematches(self):
+        self.dose(1, 8)
+        self.dose(1, 14)
+        self.assertEqual(self.row(1), (2, 2, 1))
+        self.med.frequency = 'three'
+        self.med.save()
+        self.assertEqual(self.row(1), (2, 2, 2))
+
+    def test_deleting_medication_or_dog_drops_rows(self):
+        self.dose(1, 8)
+        self.med.delete()
+        self.assertFalse(MedicationAdherence.objects.exists())
+        self.dose(1, 8, medication=self.medication('Gabapentin', 'once'))
+        self.dog.delete()
+        self.assertFalse(MedicationAdherence.objects.exists())
+
+    def test_rebuild_command(self):
+        self.dose(3, 8)
+        self.dose(1, 20)
+        MedicationAdherence.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_adherence', stdout=out)
+        self.assertIn('Rebuilt 2 adherence rows', out.getvalue())
+        self.assertEqual(self.row(3), (1, 1, 1))
+
+    def test_api_heatmap_from_stored_rows(self):
+        self.dose(3, 8)
+        self.dose(3, 20, 30)
+        self.dose(2, 11)
+        as_needed = self.medication('Tramadol', 'asNeeded')
+        self.dose(2, 9, medication=as_needed)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('health:api_adherence'), {'days': 14})
+        # session + user + current dog + medications + adherence rows
+        self.assertEqual(len(queries), 5)
+        data = response.json()
+        self.assertEqual([m['name'] for m in data['medications']], ['Prednisone'])
+        heatmap = {cell['date']: cell for cell in data['heatmap']}
+        self.assertEqual(len(heatmap), 14)
+        day = lambda days_ago: heatmap[(self.today - timedelta(days=days_ago)).isoformat()]
+        self.assertEqual((day(10)['expected'], day(10)['adherence']), (0, None))
+        self.assertEqual(day(9)['adherence'], 0)
+        self.assertEqual(day(3)['adherence'], 100)
+        self.assertEqual((day(2)['taken'], day(2)['on_time'], day(2)['adherence']), (1, 0, 50))
+        self.assertEqual(data['total'], {'expected': 20, 'taken': 3, 'on_time': 2, 'adherence': 15})
+        self.assertEqual(sum(week['expected'] for week in data['weeks']), 20)
+        self.assertTrue(all(date.fromisoformat(week['start']).weekday() == 0 for week in data['weeks']))
+
+    def test_inactive_medication_ends_at_last_dose(self):
+        stopped = self.medication('Chlorambucil', 'once', active=False)
+        self.dose(7, 9, medication=stopped)
+        self.dose(5, 9, medication=stopped)
+        response = self.client.get(reverse('health:api_adherence'), {'days': 14, 'medication': stopped.pk})
+        self.assertEqual(response.json()['total'], {'expected': 5, 'taken': 2, 'on_time': 2, 'adherence': 40})
+
+    def test_api_rejects_bad_parameters(self):
+        other = DogProfile.objects.create(user=self.user, name='Other', weight_kg=8)
+        foreign = Medication.objects.create(dog=other, name='X', dosage='1', frequency='once')
+        for params in ({'medication': 'abc'}, {'medication': foreign.pk}, {'days': 3}):
+            response = self.client.get(reverse('health:api_adherence'), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+
+    def test_cached_until_a_dose_is_logged(self):
+        url = reverse('health:api_adherence')
+        self.assertEqual(self.client.get(url).json()['total']['taken'], 0)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertEqual(len(queries), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('health:record_dose', args=[self.med.pk]))
+        self.assertEqual(self.client.get(url).json()['total']['taken'], 1)
+
+
+class SharedCacheTests(TestCase):
+    def test_generation_bumps_reach_other_processes(self):
+        # Another worker or a management command reads through its own
+        # connection; a process-local cache would never see the bump
+        self.assertNotIn('locmem', caches['default'].__class__.__module__)
+        other = caches.create_connection('default')
+        before = generation(42)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation(42)
+        self.assertNotEqual(generation(42), before)
+        self.assertEqual(other.get(_generation_key(42)), generation(42))
+
+
+class DogScopingTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
+        self.other = DogProfile.objects.create(user=self.user, name='Luna', weight_kg=18)
+
+    def test_two_dogs_can_have_entries_on_same_date(self):
+        DailyEntry.upsert(self.dog, date.today(), self.user, {'good_day': 'yes'})
+        DailyEntry.upsert(self.other, date.today(), self.user, {'good_day': 'no'})
+        self.assertEqual(DailyEntry.objects.filter(date=date.today()).count(), 2)
+        self.assertEqual(DailyEntry.objects.for_dog(self.other).get().good_day, 'no')
+
+    def test_rollups_are_per_dog(self):
+        DailyEntry.upsert(self.dog, date.today(), self.user, {'good_day': 'yes'})
+        DailyEntry.upsert(self.other, date.today(), self.user, {'good_day': 'no'})
+        self.assertEqual(DailyEntryRollup.for_date(self.dog, 'week', date.today()).good_days, 1)
+        self.assertEqual(DailyEntryRollup.for_date(self.other, 'week', date.today()).bad_days, 1)
+
+    def test_views_show_only_current_dog(self):
+        self.client.login(username='testuser', password='testpass123')
+        DailyEntry.objects.create(dog=self.other, user=self.user, date=date.today(), good_notes='Luna day')
+        response = self.client.get(reverse('health:history'))
+        self.assertNotContains(response, 'Luna day')
+
+    def test_select_dog_switches_session(self):
+        self.client.login(username='testuser', password='testpass123')
+        DailyEntry.objects.create(dog=self.other, user=self.user, date=date.today())
+        response = self.client.post(reverse('health:select_dog'), {'dog_id': self.other.pk})
+        self.assertEqual(response.status_code, 302)
+        data = self.client.get(reverse('health:api_history')).json()
+        self.assertEqual(len(data['items']), 1)
+
+    def test_other_users_dog_is_denied(self):
+        stranger = User.objects.create_user(username='stranger', password='testpass123')
+        own = DogProfile.objects.create(user=stranger, name='Rex', weight_kg=30)
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_notes='Bruno day')
+        self.client.login(username='stranger', password='testpass123')
+        response = self.client.post(reverse('health:select_dog'), {'dog_id': self.dog.pk})
+        self.assertEqual(response.status_code, 404)
+        # A session pointing at someone else's dog falls back to the user's own
+        session = self.client.session
+        session['dog_id'] = self.dog.pk
+        session.save()
+        self.assertNotContains(self.client.get(reverse('health:history')), 'Bruno day')
+        self.client.post(
+            reverse('health:save_entry'),
+            json.dumps({'date': date.today().isoformat(), 'good_day': 'no'}),
+            content_type='application/json'
+        )
+        self.assertEqual(DailyEntry.objects.for_dog(self.dog).get().good_day, '')
+        self.assertEqual(DailyEntry.objects.for_dog(own).get().good_day, 'no')
+        response = self.client.get(reverse('health:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([dog.pk for dog in response.context['all_dogs']], [own.pk])
+
+    def test_user_without_dog_adds_one_explicitly(self):
+        User.objects.create_user(username='newcomer', password='testpass123')
+        self.client.login(username='newcomer', password='testpass123')
+        self.assertRedirects(self.client.get(reverse('health:tracker')), reverse('health:add_dog'))
+        self.assertEqual(self.client.get(reverse('health:add_dog')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('health:api_tracker_bootstrap')).status_code, 409)
+        self.assertEqual(
+            self.client.post(
+                reverse('health:save_entry'), json.dumps({'good_day': 'yes'}), content_type='application/json'
+            ).status_code,
+            409,
+        )
+        # Looking around creates nothing
+        self.assertFalse(DogProfile.objects.filter(user__username='newcomer').exists())
+
+        response = self.client.post(reverse('health:add_dog'), {'name': 'Rex', 'weight_kg': '0'})
+        self.assertContains(response, 'Enter a weight of at least 1 kg')
+        response = self.client.post(reverse('health:add_dog'), {'name': 'Rex', 'weight_kg': '30.5'})
+        self.assertRedirects(response, reverse('health:tracker'))
+        dog = DogProfile.objects.get(user__username='newcomer')
+        self.assertEqual((dog.name, dog.weight_kg), ('Rex', Decimal('30.5')))
+        self.assertEqual(self.client.session['dog_id'], dog.pk)
+
+    def test_caregiver_can_switch_to_shared_dog(self):
+        caregiver = User.objects.create_user(username='caregiver', password='testpass123')
+        self.other.caregivers.add(caregiver)
+        self.client.login(username='caregiver', password='testpass123')
+        self.client.post(
+            reverse('health:save_entry'),
+            json.dumps({'date': date.today().isoformat(), 'good_day': 'yes'}),
+            content_type='application/json'
+        )
+        self.assertEqual(DailyEntry.objects.for_dog(self.other).get().good_day, 'yes')
+        self.assertEqual(
+            self.client.post(reverse('health:select_dog'), {'dog_id': self.dog.pk}).status_code, 404
+        )
+        self.assertEqual(list(DogProfile.objects.for_user(caregiver)), [self.other])
+
+    def test_save_writes_to_current_dog(self):
+        self.client.login(username='testuser', password='testpass123')
+        self.client.post(reverse('health:select_dog'), {'dog_id': self.other.pk})
+        self.client.post(
+            reverse('health:save_entry'),
+            json.dumps({'date': date.today().isoformat(), 'good_day': 'yes'}),
+            content_type='application/json'
+        )
+        self.assertTrue(DailyEntry.objects.for_dog(self.other).exists())
+        self.assertFalse(DailyEntry.objects.for_dog(self.dog).exists())
+
+
 class MedicationsViewTests(TestCase):
     def setUp(self):
         self.client = Client()
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.medications_url = reverse('health:medications')
 
     def test_medications_requires_login(self):
@@ -639,7 +3019,7 @@ class MedicationsViewTests(TestCase):
 
     def test_medications_context(self):
         self.client.login(username='testuser', password='testpass123')
-        Medication.objects.create(name='Test Med', dosage='5mg', frequency='once')
+        Medication.objects.create(dog=self.dog, name='Test Med', dosage='5mg', frequency='once')
         response = self.client.get(self.medications_url)
         self.assertIn('medications', response.context)
         self.assertIn('today_doses', response.context)
@@ -647,8 +3027,8 @@ class MedicationsViewTests(TestCase):
 
     def test_medications_only_active(self):
         self.client.login(username='testuser', password='testpass123')
-        Medication.objects.create(name='Active', dosage='5mg', frequency='once', active=True)
-        Medication.objects.create(name='Inactive', dosage='5mg', frequency='once', active=False)
+        Medication.objects.create(dog=self.dog, name='Active', dosage='5mg', frequency='once', active=True)
+        Medication.objects.create(dog=self.dog, name='Inactive', dosage='5mg', frequency='once', active=False)
         response = self.client.get(self.medications_url)
         self.assertEqual(response.context['medications'].count(), 1)
 
@@ -659,6 +3039,7 @@ class NodesViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.nodes_url = reverse('health:nodes')
 
     def test_nodes_requires_login(self):
@@ -680,6 +3061,7 @@ class NodesViewTests(TestCase):
     def test_nodes_shows_today_measurement(self):
         self.client.login(username='testuser', password='testpass123')
         measurement = LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             mandibular_left=Decimal('2.5')
@@ -736,6 +3118,7 @@ class TimelineEntryModelTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.provider = Provider.objects.create(
             name='Dr. Test',
             trust_rating=5
@@ -743,6 +3126,7 @@ class TimelineEntryModelTests(TestCase):
 
     def test_create_timeline_entry(self):
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -754,6 +3138,7 @@ class TimelineEntryModelTests(TestCase):
 
     def test_timeline_entry_str(self):
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date(2024, 12, 15),
             entry_type='symptom',
@@ -763,6 +3148,7 @@ class TimelineEntryModelTests(TestCase):
 
     def test_timeline_entry_with_provider(self):
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -773,12 +3159,14 @@ class TimelineEntryModelTests(TestCase):
 
     def test_timeline_entry_ordering(self):
         entry1 = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date(2024, 12, 10),
             entry_type='symptom',
             title='Earlier Entry'
         )
         entry2 = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date(2024, 12, 15),
             entry_type='symptom',
@@ -791,6 +3179,7 @@ class TimelineEntryModelTests(TestCase):
     def test_timeline_entry_mood_choices(self):
         for mood in ['great', 'good', 'okay', 'poor', 'bad', 'unknown']:
             entry = TimelineEntry.objects.create(
+                dog=self.dog,
                 user=self.user,
                 date=date.today() - timedelta(days=hash(mood) % 100 + 1),
                 entry_type='symptom',
@@ -805,6 +3194,7 @@ class TimelineEntryModelTests(TestCase):
                        'milestone', 'concern', 'research', 'other']
         for i, entry_type in enumerate(entry_types):
             entry = TimelineEntry.objects.create(
+                dog=self.dog,
                 user=self.user,
                 date=date.today() - timedelta(days=i + 1),
                 entry_type=entry_type,
@@ -820,11 +3210,13 @@ class TimelineEntryStatusTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
 
     def test_future_date_auto_scheduled(self):
         """Future dates should automatically be marked as scheduled."""
         future_date = date.today() + timedelta(days=7)
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=future_date,
             entry_type='vet_visit',
@@ -836,6 +3228,7 @@ class TimelineEntryStatusTests(TestCase):
         """Past dates should remain completed."""
         past_date = date.today() - timedelta(days=7)
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=past_date,
             entry_type='vet_visit',
@@ -846,6 +3239,7 @@ class TimelineEntryStatusTests(TestCase):
     def test_today_date_is_completed(self):
         """Today's date should be completed (not future)."""
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -857,6 +3251,7 @@ class TimelineEntryStatusTests(TestCase):
         """Cancelled status should not be auto-changed for future dates."""
         future_date = date.today() + timedelta(days=7)
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=future_date,
             entry_type='vet_visit',
@@ -869,6 +3264,7 @@ class TimelineEntryStatusTests(TestCase):
         """Cancelled status should not be auto-changed for past dates."""
         past_date = date.today() - timedelta(days=7)
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=past_date,
             entry_type='vet_visit',
@@ -880,6 +3276,7 @@ class TimelineEntryStatusTests(TestCase):
     def test_is_future_property_true(self):
         """Test is_future property returns True for future dates."""
         future_entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() + timedelta(days=1),
             entry_type='vet_visit',
@@ -890,6 +3287,7 @@ class TimelineEntryStatusTests(TestCase):
     def test_is_future_property_false(self):
         """Test is_future property returns False for past dates."""
         past_entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() - timedelta(days=1),
             entry_type='vet_visit',
@@ -902,6 +3300,7 @@ class TimelineEntryStatusTests(TestCase):
         past_date = date.today() - timedelta(days=1)
         # Create entry then force status to scheduled
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=past_date,
             entry_type='vet_visit',
@@ -915,6 +3314,7 @@ class TimelineEntryStatusTests(TestCase):
         """Completed entries should not be overdue."""
         past_date = date.today() - timedelta(days=1)
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=past_date,
             entry_type='vet_visit',
@@ -926,6 +3326,7 @@ class TimelineEntryStatusTests(TestCase):
     def test_is_overdue_false_for_future(self):
         """Future scheduled entries should not be overdue."""
         future_entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() + timedelta(days=1),
             entry_type='vet_visit',
@@ -937,6 +3338,7 @@ class TimelineEntryStatusTests(TestCase):
         """Test all status choices are valid."""
         # Scheduled - use future date so it stays scheduled
         entry1 = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() + timedelta(days=10),
             entry_type='vet_visit',
@@ -947,6 +3349,7 @@ class TimelineEntryStatusTests(TestCase):
 
         # Completed - use past date
         entry2 = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() - timedelta(days=10),
             entry_type='vet_visit',
@@ -957,6 +3360,7 @@ class TimelineEntryStatusTests(TestCase):
 
         # Cancelled - use past date, should stay cancelled
         entry3 = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() - timedelta(days=10),
             entry_type='vet_visit',
@@ -968,6 +3372,7 @@ class TimelineEntryStatusTests(TestCase):
     def test_default_status_is_completed(self):
         """Default status for past entries should be completed."""
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() - timedelta(days=5),
             entry_type='vet_visit',
@@ -979,6 +3384,7 @@ class TimelineEntryStatusTests(TestCase):
         """Updating date should update status appropriately."""
         # Create past entry
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() - timedelta(days=5),
             entry_type='vet_visit',
@@ -1002,6 +3408,7 @@ class TimelineViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.timeline_url = reverse('health:timeline')
 
     def test_timeline_requires_login(self):
@@ -1024,6 +3431,7 @@ class TimelineViewTests(TestCase):
     def test_timeline_shows_entries(self):
         self.client.login(username='testuser', password='testpass123')
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -1039,8 +3447,10 @@ class TimelineDetailViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         # Create multiple entries for navigation testing
         self.entry1 = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date(2024, 12, 10),
             time=time(10, 0),
@@ -1049,6 +3459,7 @@ class TimelineDetailViewTests(TestCase):
             content='First content'
         )
         self.entry2 = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date(2024, 12, 15),
             time=time(14, 0),
@@ -1057,6 +3468,7 @@ class TimelineDetailViewTests(TestCase):
             content='Second content'
         )
         self.entry3 = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date(2024, 12, 20),
             time=time(9, 0),
@@ -1128,6 +3540,7 @@ class TimelineDetailViewTests(TestCase):
         other_user = User.objects.create_user(
             username='otheruser', password='testpass456'
         )
+        DogProfile.objects.create(user=other_user, name='Luna', weight_kg=18)
         self.client.login(username='otheruser', password='testpass456')
         url = reverse('health:timeline_detail', args=[self.entry1.id])
         response = self.client.get(url)
@@ -1140,6 +3553,7 @@ class TimelineCreateViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.create_url = reverse('health:timeline_create')
 
     def test_create_requires_login(self):
@@ -1217,10 +3631,13 @@ class TimelineEditViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.other_user = User.objects.create_user(
             username='otheruser', password='otherpass123'
         )
+        DogProfile.objects.create(user=self.other_user, name='Luna', weight_kg=18)
         self.entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             time=time(10, 30),
@@ -1335,6 +3752,7 @@ class LoginViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.login_url = reverse('health:login')
         self.logout_url = reverse('health:logout')
 
@@ -1378,6 +3796,7 @@ class DashboardViewTests(TestCase):
     """Tests for dashboard view."""
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
@@ -1398,6 +3817,7 @@ class HistoryViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.history_url = reverse('health:history')
 
     def test_history_requires_login(self):
@@ -1415,7 +3835,7 @@ class HistoryViewTests(TestCase):
     def test_history_shows_entries(self):
         """Test that history view shows daily entries."""
         self.client.login(username='testuser', password='testpass123')
-        DailyEntry.objects.create(user=self.user, date=date.today(), good_day='yes')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_day='yes')
         response = self.client.get(self.history_url)
         self.assertEqual(response.status_code, 200)
         self.assertIn('entries', response.context)
@@ -1429,6 +3849,7 @@ class MedicationsViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.medications_url = reverse('health:medications')
 
     def test_medications_requires_login(self):
@@ -1446,7 +3867,7 @@ class MedicationsViewTests(TestCase):
     def test_medications_context(self):
         """Test that medications view has correct context."""
         self.client.login(username='testuser', password='testpass123')
-        Medication.objects.create(name='Test Med', dosage='10mg', frequency='daily', active=True)
+        Medication.objects.create(dog=self.dog, name='Test Med', dosage='10mg', frequency='daily', active=True)
         response = self.client.get(self.medications_url)
         self.assertIn('medications', response.context)
 
@@ -1459,6 +3880,7 @@ class AddMedicationViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.add_med_url = reverse('health:add_medication')
 
     def test_add_medication_requires_login(self):
@@ -1493,7 +3915,9 @@ class RecordDoseViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.medication = Medication.objects.create(
+            dog=self.dog,
             name='Test Med', dosage='10mg', frequency='daily', active=True
         )
 
@@ -1521,6 +3945,7 @@ class NodesViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.nodes_url = reverse('health:nodes')
 
     def test_nodes_requires_login(self):
@@ -1544,6 +3969,7 @@ class CBPIViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.cbpi_url = reverse('health:cbpi')
         self.save_cbpi_url = reverse('health:save_cbpi')
 
@@ -1599,6 +4025,7 @@ class CORQViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.corq_url = reverse('health:corq')
         self.save_corq_url = reverse('health:save_corq')
 
@@ -1660,6 +4087,7 @@ class TreatmentsViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.treatments_url = reverse('health:treatments')
         self.save_treatment_url = reverse('health:save_treatment')
 
@@ -1710,6 +4138,7 @@ class EventsViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.events_url = reverse('health:events')
         self.save_event_url = reverse('health:save_event')
 
@@ -1760,6 +4189,7 @@ class NutritionViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.nutrition_url = reverse('health:nutrition')
 
     def test_nutrition_requires_login(self):
@@ -1806,6 +4236,7 @@ class MealPlanningViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.meal_planning_url = reverse('health:meal_planning')
 
     def test_meal_planning_requires_login(self):
@@ -1829,6 +4260,7 @@ class RecordsViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.records_url = reverse('health:records')
 
     def test_records_requires_login(self):
@@ -1852,6 +4284,7 @@ class APIChartDataTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.chart_url = reverse('health:api_chart_data')
 
     def test_chart_data_requires_login(self):
@@ -1898,6 +4331,7 @@ class APINutritionSummaryTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.summary_url = reverse('health:api_nutrition_summary')
 
     def test_api_nutrition_summary_requires_login(self):
@@ -1937,10 +4371,13 @@ class TimelineDeleteViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.other_user = User.objects.create_user(
             username='otheruser', password='otherpass123'
         )
+        DogProfile.objects.create(user=self.other_user, name='Luna', weight_kg=18)
         self.entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -1982,6 +4419,7 @@ class SaveDailyEntryViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.save_url = reverse('health:save_entry')
 
     def test_save_requires_login(self):
@@ -2017,6 +4455,7 @@ class SaveNodeMeasurementViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.save_url = reverse('health:save_nodes')
 
     def test_save_requires_login(self):
@@ -2099,6 +4538,7 @@ class APILabValuesTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.lab_values_url = reverse('health:api_lab_values')
 
     def test_api_lab_values_requires_login(self):
@@ -2118,16 +4558,19 @@ class DashboardViewWithDataTests(TestCase):
     """Tests for dashboard view with actual data."""
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.dashboard_url = reverse('health:dashboard')
 
     def test_dashboard_with_daily_entry(self):
         """Test dashboard shows today's entry data."""
         self.client.login(username='testuser', password='testpass123')
         DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_day='yes',
@@ -2144,11 +4587,13 @@ class DashboardViewWithDataTests(TestCase):
         """Test dashboard shows CBPI data."""
         self.client.login(username='testuser', password='testpass123')
         DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_day='yes'
         )
         CBPIAssessment.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             worst_pain=3,
@@ -2170,11 +4615,13 @@ class DashboardViewWithDataTests(TestCase):
         """Test dashboard shows CORQ data."""
         self.client.login(username='testuser', password='testpass123')
         DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_day='yes'
         )
         CORQAssessment.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             energy_level=3,
@@ -2202,11 +4649,13 @@ class DashboardViewWithDataTests(TestCase):
         """Test dashboard shows lymph node data."""
         self.client.login(username='testuser', password='testpass123')
         DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_day='yes'
         )
         LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             mandibular_left=Decimal('2.5'),
@@ -2224,12 +4673,14 @@ class APIChartDataExtendedTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.chart_url = reverse('health:api_chart_data')
 
     def test_cbpi_chart_data(self):
         """Test CBPI chart data retrieval."""
         self.client.login(username='testuser', password='testpass123')
         CBPIAssessment.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             worst_pain=5,
@@ -2255,6 +4706,7 @@ class APIChartDataExtendedTests(TestCase):
         """Test CORQ chart data retrieval."""
         self.client.login(username='testuser', password='testpass123')
         CORQAssessment.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             energy_level=3,
@@ -2285,6 +4737,7 @@ class APIChartDataExtendedTests(TestCase):
         """Test lymph node chart data retrieval."""
         self.client.login(username='testuser', password='testpass123')
         LymphNodeMeasurement.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             mandibular_left=Decimal('2.5'),
@@ -2302,6 +4755,7 @@ class APIChartDataExtendedTests(TestCase):
         """Test adverse events chart data retrieval."""
         self.client.login(username='testuser', password='testpass123')
         VCOGCTCAEEvent.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             category='gastrointestinal',
@@ -2331,6 +4785,7 @@ class SaveMealWithItemsTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.save_url = reverse('health:save_meal')
         self.food = Food.objects.create(
             name='Chicken Breast',
@@ -2399,6 +4854,7 @@ class SaveSupplementWithDataTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.save_url = reverse('health:save_supplement')
 
     def test_save_supplement_calcium(self):
@@ -2453,8 +4909,8 @@ class UpdateWeightWithDataTests(TestCase):
         )
         self.update_url = reverse('health:update_weight')
 
-    def test_update_weight_creates_profile(self):
-        """Test updating weight creates profile if not exists."""
+    def test_update_weight_requires_profile(self):
+        """Test updating weight without a profile asks for one instead of creating it."""
         self.client.login(username='testuser', password='testpass123')
         data = {
             'weight_kg': 31.5
@@ -2464,10 +4920,8 @@ class UpdateWeightWithDataTests(TestCase):
             json.dumps(data),
             content_type='application/json'
         )
-        self.assertEqual(response.status_code, 200)
-        response_data = json.loads(response.content)
-        self.assertEqual(response_data['status'], 'success')
-        self.assertTrue(DogProfile.objects.filter(user=self.user).exists())
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(DogProfile.objects.filter(user=self.user).exists())
 
     def test_update_weight_updates_existing(self):
         """Test updating weight updates existing profile."""
@@ -2499,12 +4953,14 @@ class APINutritionSummaryWithDataTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.nutrition_url = reverse('health:api_nutrition_summary')
 
     def test_nutrition_summary_with_meals(self):
         """Test nutrition summary returns meal data."""
         self.client.login(username='testuser', password='testpass123')
         meal = Meal.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             meal_type='breakfast',
@@ -2538,21 +4994,25 @@ class RecordViewsTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.other_user = User.objects.create_user(
             username='otheruser', password='testpass123'
         )
+        DogProfile.objects.create(user=self.other_user, name='Luna', weight_kg=18)
         self.records_url = reverse('health:records')
 
     def test_records_view_with_lab_values(self):
         """Test records view shows lab values."""
         self.client.login(username='testuser', password='testpass123')
         record = MedicalRecord.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             record_type='lab_work',
             title='Blood Panel'
         )
         LabValue.objects.create(
+            dog=self.dog,
             medical_record=record,
             user=self.user,
             date=date.today(),
@@ -2568,6 +5028,7 @@ class RecordViewsTests(TestCase):
         """Test record detail view."""
         self.client.login(username='testuser', password='testpass123')
         record = MedicalRecord.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             record_type='lab_work',
@@ -2582,6 +5043,7 @@ class RecordViewsTests(TestCase):
         """Test record detail returns 404 for other user's record."""
         self.client.login(username='testuser', password='testpass123')
         record = MedicalRecord.objects.create(
+            dog=self.dog,
             user=self.other_user,
             date=date.today(),
             record_type='lab_work',
@@ -2595,6 +5057,7 @@ class RecordViewsTests(TestCase):
         """Test edit record form loads."""
         self.client.login(username='testuser', password='testpass123')
         record = MedicalRecord.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             record_type='lab_work',
@@ -2608,6 +5071,7 @@ class RecordViewsTests(TestCase):
         """Test editing a record."""
         self.client.login(username='testuser', password='testpass123')
         record = MedicalRecord.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             record_type='lab_work',
@@ -2629,6 +5093,7 @@ class RecordViewsTests(TestCase):
         """Test deleting a record."""
         self.client.login(username='testuser', password='testpass123')
         record = MedicalRecord.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             record_type='lab_work',
@@ -2643,6 +5108,7 @@ class RecordViewsTests(TestCase):
         """Test deleting a record via AJAX."""
         self.client.login(username='testuser', password='testpass123')
         record = MedicalRecord.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             record_type='lab_work',
@@ -2666,10 +5132,13 @@ class TimelineDeleteAttachmentTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.other_user = User.objects.create_user(
             username='otheruser', password='testpass123'
         )
+        DogProfile.objects.create(user=self.other_user, name='Luna', weight_kg=18)
         self.entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -2789,6 +5258,7 @@ class UploadRecordTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.upload_url = reverse('health:upload_record')
 
     def test_upload_requires_login(self):
@@ -2815,12 +5285,14 @@ class APILabValuesExtendedTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.lab_values_url = reverse('health:api_lab_values')
 
     def test_api_lab_values_with_test_name(self):
         """Test lab values API with specific test name."""
         self.client.login(username='testuser', password='testpass123')
         LabValue.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             test_name='wbc',
@@ -2842,6 +5314,7 @@ class TimelineCreatePostTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.create_url = reverse('health:timeline_create')
 
     def test_create_entry_post(self):
@@ -2866,7 +5339,9 @@ class TimelineEditPostTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -2899,7 +5374,9 @@ class TimelineDeleteWithAjaxTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -2925,16 +5402,19 @@ class DashboardQolStatusTests(TestCase):
     """Tests for dashboard QoL status colors."""
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.dashboard_url = reverse('health:dashboard')
 
     def test_dashboard_green_status(self):
         """Test dashboard shows green status for high score."""
         self.client.login(username='testuser', password='testpass123')
         DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_day='yes',
@@ -2956,6 +5436,7 @@ class DashboardQolStatusTests(TestCase):
         """Test dashboard shows red status for low score."""
         self.client.login(username='testuser', password='testpass123')
         DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_day='no',
@@ -2977,12 +5458,14 @@ class DashboardQolStatusTests(TestCase):
         """Test dashboard trend calculation."""
         self.client.login(username='testuser', password='testpass123')
         DailyEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             good_day='yes'
         )
         for i in range(1, 8):
             DailyEntry.objects.create(
+                dog=self.dog,
                 user=self.user,
                 date=date.today() - timedelta(days=i),
                 good_day='yes',
@@ -2992,6 +5475,41 @@ class DashboardQolStatusTests(TestCase):
         response = self.client.get(self.dashboard_url)
         self.assertEqual(response.status_code, 200)
 
+    def test_dashboard_trend_improving(self):
+        """Test trend reports the fitted weekly change of the stored scores."""
+        self.client.login(username='testuser', password='testpass123')
+        # Create today's DailyEntry to avoid template errors
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_day='yes')
+        for i in range(1, 8):
+            DailyEntry.objects.create(
+                dog=self.dog,
+                user=self.user, date=date.today() - timedelta(days=i), appetite=4
+            )
+        for i in range(8, 15):
+            DailyEntry.objects.create(
+                dog=self.dog,
+                user=self.user, date=date.today() - timedelta(days=i), appetite=2
+            )
+        response = self.client.get(self.dashboard_url)
+        self.assertEqual(response.context['trend'], 'improving')
+        self.assertEqual(response.context['trend_value'], 1.6)
+
+    def test_dashboard_worst_day(self):
+        """Test the lowest-scoring day of the last 30 days is in context."""
+        self.client.login(username='testuser', password='testpass123')
+        # Create today's DailyEntry to avoid template errors
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_day='yes')
+        DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today() - timedelta(days=3), appetite=4
+        )
+        hard_day = DailyEntry.objects.create(
+            dog=self.dog,
+            user=self.user, date=date.today() - timedelta(days=5), appetite=1
+        )
+        response = self.client.get(self.dashboard_url)
+        self.assertEqual(response.context['worst_day'], hard_day)
+
 
 # ============================================================================
 # Calendar View Tests
@@ -3005,6 +5523,7 @@ class CalendarMonthViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.calendar_url = reverse('health:calendar')
 
     def test_calendar_requires_login(self):
@@ -3041,6 +5560,7 @@ class CalendarMonthViewTests(TestCase):
         """Calendar shows entries on correct days."""
         self.client.login(username='testuser', password='testpass123')
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -3097,6 +5617,7 @@ class CalendarWeekViewTests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.week_url = reverse('health:calendar_week')
 
     def test_week_view_requires_login(self):
@@ -3122,6 +5643,7 @@ class CalendarWeekViewTests(TestCase):
         """Week view shows entries on correct days."""
         self.client.login(username='testuser', password='testpass123')
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today(),
             entry_type='vet_visit',
@@ -3153,6 +5675,7 @@ class CalendarAPITests(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.api_url = reverse('health:api_calendar_entries')
 
     def test_api_requires_login(self):
@@ -3173,6 +5696,7 @@ class CalendarAPITests(TestCase):
         self.client.login(username='testuser', password='testpass123')
         today = date.today()
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=today,
             entry_type='vet_visit',
@@ -3194,6 +5718,7 @@ class CalendarAPITests(TestCase):
         today = date.today()
         # Entry in range
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=today,
             entry_type='vet_visit',
@@ -3201,6 +5726,7 @@ class CalendarAPITests(TestCase):
         )
         # Entry out of range
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=today - timedelta(days=10),
             entry_type='vet_visit',
@@ -3219,6 +5745,7 @@ class CalendarAPITests(TestCase):
         self.client.login(username='testuser', password='testpass123')
         future_date = date.today() + timedelta(days=5)
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=future_date,
             entry_type='vet_visit',
@@ -3243,20 +5770,23 @@ class DashboardAppointmentsTests(TestCase):
     """Tests for dashboard upcoming/overdue appointments."""
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(
             username='testuser', password='testpass123'
         )
+        self.dog = DogProfile.objects.create(user=self.user, name='Bruno', weight_kg=22)
         self.dashboard_url = reverse('health:dashboard')
 
     def test_upcoming_appointments_in_context(self):
         """Dashboard shows upcoming scheduled appointments."""
         self.client.login(username='testuser', password='testpass123')
         # Create today's DailyEntry to avoid template errors
-        DailyEntry.objects.create(user=self.user, date=date.today(), good_day='yes')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_day='yes')
         # Create future appointment
         future_date = date.today() + timedelta(days=3)
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=future_date,
             entry_type='vet_visit',
@@ -3269,10 +5799,11 @@ class DashboardAppointmentsTests(TestCase):
     def test_overdue_appointments_in_context(self):
         """Dashboard shows overdue scheduled appointments."""
         self.client.login(username='testuser', password='testpass123')
-        DailyEntry.objects.create(user=self.user, date=date.today(), good_day='yes')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_day='yes')
         past_date = date.today() - timedelta(days=1)
         # Create entry then force status to scheduled
         entry = TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=past_date,
             entry_type='vet_visit',
@@ -3287,7 +5818,7 @@ class DashboardAppointmentsTests(TestCase):
     def test_no_appointments_empty(self):
         """Dashboard handles no appointments gracefully."""
         self.client.login(username='testuser', password='testpass123')
-        DailyEntry.objects.create(user=self.user, date=date.today(), good_day='yes')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_day='yes')
         response = self.client.get(self.dashboard_url)
         self.assertEqual(len(response.context['upcoming_appointments']), 0)
         self.assertEqual(len(response.context['overdue_appointments']), 0)
@@ -3295,9 +5826,10 @@ class DashboardAppointmentsTests(TestCase):
     def test_upcoming_limited_to_7_days(self):
         """Upcoming appointments only shows next 7 days."""
         self.client.login(username='testuser', password='testpass123')
-        DailyEntry.objects.create(user=self.user, date=date.today(), good_day='yes')
+        DailyEntry.objects.create(dog=self.dog, user=self.user, date=date.today(), good_day='yes')
         # Appointment within 7 days
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() + timedelta(days=5),
             entry_type='vet_visit',
@@ -3305,6 +5837,7 @@ class DashboardAppointmentsTests(TestCase):
         )
         # Appointment beyond 7 days
         TimelineEntry.objects.create(
+            dog=self.dog,
             user=self.user,
             date=date.today() + timedelta(days=10),
             entry_type='vet_visit',
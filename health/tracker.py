@@ -0,0 +1,81 @@
+"""
+JSON bootstrap for the daily tracker page.
+
+Everything the tracker needs is read in three queries: the entries since
+the start of the week (today's values, yesterday's defaults and the
+week's good-day share), the active medications and today's doses. The
+payload is cached per dog, user and day under the dog's cache generation
+and carries an ETag so clients can revalidate with a 304.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .caching import generation
+from .models import DailyEntry, DailyEntryRollup, Medication, MedicationDose
+
+BOOTSTRAP_TIMEOUT = 60 * 60 * 24
+
+ENTRY_FIELDS = ['date', 'updated_at', *DailyEntry.TRACKED_FIELDS, *DailyEntry.SCORE_FIELDS]
+
+
+def build_bootstrap(dog, user, today):
+    """The tracker payload for the dog's entry on today."""
+    yesterday = today - timedelta(days=1)
+    week = DailyEntryRollup(dog=dog, period='week', start=DailyEntryRollup.period_start('week', today))
+
+    entries = {}
+    for row in DailyEntry.objects.for_dog(dog).filter(
+        date__range=(min(week.start, yesterday), today)
+    ).values('user_id', *ENTRY_FIELDS):
+        entries[row['date']] = row
+        if row['date'] >= week.start:
+            week.add_entry(row)
+
+    # Ratings default to today's value, or for a new day to yesterday's
+    # entry by the same user
+    entry = entries.get(today)
+    previous = entries.get(yesterday) if entry is None else None
+    if previous and previous['user_id'] != user.pk:
+        previous = None
+    defaults = {
+        field: (entry or previous or {}).get(field) for field in DailyEntry.RATING_FIELDS
+    }
+
+    medications = list(Medication.objects.for_dog(dog).filter(active=True).values(
+        'id', 'name', 'dosage', 'frequency'
+    ))
+    doses = {}
+    for dose in MedicationDose.objects.for_dog(dog).filter(
+        given_at__date=today
+    ).order_by('given_at').values('medication_id', 'given_at'):
+        doses.setdefault(dose['medication_id'], []).append(dose['given_at'])
+    for medication in medications:
+        medication['doses_today'] = doses.get(medication['id'], [])
+
+    if entry:
+        entry = {field: entry[field] for field in ENTRY_FIELDS}
+    return {
+        'date': today,
+        'entry': entry,
+        'defaults': defaults,
+        'medications': medications,
+        'week': {'good_day_percent': week.good_day_percent, 'rated_days': week.rated_days},
+    }
+
+
+def cached_bootstrap(dog, user, today):
+    """
+    (etag, json_body) for the tracker payload, built once per dog, user,
+    day and cache generation.
+    """
+    key = f'tracker-bootstrap:{dog.pk}:{user.pk}:{today.isoformat()}:{generation(dog.pk)}'
+    cached = cache.get(key)
+    if cached is None:
+        body = json.dumps(build_bootstrap(dog, user, today), cls=DjangoJSONEncoder)
+        cached = (f'"{hashlib.md5(body.encode()).hexdigest()}"', body)
+        cache.set(key, cached, BOOTSTRAP_TIMEOUT)
+    return cached
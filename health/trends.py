@@ -0,0 +1,192 @@
+"""
+Trend statistics for every tracked metric.
+
+Each metric is read over a window as a compact (day offset, value)
+series, one query per underlying table, and summarised with:
+
+- an exponentially weighted moving average whose weights halve every
+  HALF_LIFE days, so uneven gaps between readings are weighted by time
+  rather than by count;
+- an ordinary least-squares slope with its 95% confidence interval
+  (Student's t on n - 2 degrees of freedom);
+- a classification that calls a metric improving or declining only when
+  the interval excludes zero and the weekly change is at least the
+  metric's smallest meaningful change, so day-to-day noise reads as
+  stable.
+
+The arithmetic is plain Python: a window holds at most a year of daily
+readings, well below the size where an array library would pay for its
+import. cached_trends() keeps results per dog and day under the dog's
+cache generation (see health.caching).
+"""
+from datetime import date, timedelta
+from math import sqrt
+
+from django.core.cache import cache
+
+from .caching import generation
+from .charts import SERIES
+from .models import DailyEntry
+
+HALF_LIFE = 7
+MIN_POINTS = 5
+MIN_DAYS = 7
+MAX_DAYS = 365
+TREND_TIMEOUT = 60 * 60 * 24
+
+# Two-sided 95% critical values of Student's t by degrees of freedom;
+# between entries the next lower one is used, which is conservative
+T_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+    9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042,
+    40: 2.021, 60: 2.000, 120: 1.980,
+}
+Z_95 = 1.960
+
+
+def _categories(dog, start_date):
+    columns = [f for fields in DailyEntry.CATEGORY_FIELDS.values() for f in fields]
+    rows = DailyEntry.objects.for_dog(dog).filter(date__gte=start_date).values_list('date', *columns)
+    return {day: DailyEntry.category_averages(dict(zip(columns, ratings))) for day, *ratings in rows}
+
+
+LOADERS = {name: loader for name, (loader, columns) in SERIES.items()}
+LOADERS['categories'] = _categories
+
+# metric: (loader, column, higher is better, smallest meaningful change per week)
+METRICS = {
+    'overall': ('daily', 'overall', True, 0.2),
+    'happiness': ('daily', 'happiness', True, 0.2),
+    **{category: ('categories', category, True, 0.2) for category in DailyEntry.CATEGORY_FIELDS},
+    'cbpi_severity': ('cbpi', 'severity', False, 0.5),
+    'cbpi_interference': ('cbpi', 'interference', False, 0.5),
+    'corq_vitality': ('corq', 'vitality', True, 1),
+    'corq_companionship': ('corq', 'companionship', True, 1),
+    'corq_pain': ('corq', 'pain', True, 1),
+    'corq_mobility': ('corq', 'mobility', True, 1),
+    'corq_total': ('corq', 'total', True, 2),
+    **{field: ('nodes', field, False, 0.1) for field in SERIES['nodes'][1]},
+}
+
+
+def parse_metrics(value):
+    """Metric names from a comma-separated ?metrics= value (all if empty), raising ValueError if unknown."""
+    metrics = [m.strip() for m in (value or '').split(',') if m.strip()] or list(METRICS)
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise ValueError(f'Unknown metric: {", ".join(unknown)}')
+    return list(dict.fromkeys(metrics))
+
+
+def parse_days(value, default=30):
+    """The ?days= window, raising ValueError outside MIN_DAYS-MAX_DAYS."""
+    try:
+        days = int(value) if value else default
+    except ValueError:
+        days = None
+    if days is None or not MIN_DAYS <= days <= MAX_DAYS:
+        raise ValueError(f'days must be between {MIN_DAYS} and {MAX_DAYS}')
+    return days
+
+
+def ewma(xs, ys, half_life=HALF_LIFE):
+    """The time-weighted moving average of ys at each reading, xs in days."""
+    averages = []
+    for x, y in zip(xs, ys):
+        if not averages:
+            averages.append(y)
+        else:
+            weight = 1 - 0.5 ** ((x - previous) / half_life)
+            averages.append(averages[-1] + weight * (y - averages[-1]))
+        previous = x
+    return averages
+
+
+def t_critical(df):
+    if df > max(T_95):
+        return Z_95
+    return T_95[max(k for k in T_95 if k <= df)]
+
+
+def linear_fit(xs, ys):
+    """
+    (slope, intercept, slope standard error, residual standard deviation)
+    of the least-squares line through the points, or None with fewer than
+    three points or a single x.
+    """
+    n = len(xs)
+    if n < 3:
+        return None
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if not sxx:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    intercept = mean_y - slope * mean_x
+    noise = sqrt(sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, ys)) / (n - 2))
+    return slope, intercept, noise / sqrt(sxx), noise
+
+
+def analyse(xs, ys, higher_is_better=True, min_change=0.2, half_life=HALF_LIFE):
+    """
+    Summary of a series (xs in days, ascending): count, mean, latest EWMA,
+    slope per day, weekly change with its 95% interval, residual noise
+    and trend, one of improving, declining, stable or insufficient.
+    """
+    result = {
+        'points': len(ys), 'mean': None, 'ewma': None, 'slope': None,
+        'weekly_change': None, 'interval': None, 'noise': None, 'trend': 'insufficient',
+    }
+    if ys:
+        result['mean'] = round(sum(ys) / len(ys), 2)
+        result['ewma'] = round(ewma(xs, ys, half_life)[-1], 2)
+    fit = linear_fit(xs, ys)
+    if fit is None:
+        return result
+    slope, intercept, stderr, noise = fit
+    margin = t_critical(len(ys) - 2) * stderr
+    result.update(
+        slope=round(slope, 4),
+        weekly_change=round(slope * 7, 2),
+        interval=[round((slope - margin) * 7, 2), round((slope + margin) * 7, 2)],
+        noise=round(noise, 2),
+    )
+    if len(ys) >= MIN_POINTS:
+        significant = slope - margin > 0 or slope + margin < 0
+        if significant and abs(slope * 7) >= min_change:
+            result['trend'] = 'improving' if (slope > 0) == higher_is_better else 'declining'
+        else:
+            result['trend'] = 'stable'
+    return result
+
+
+def trends(dog, metrics, days, today=None):
+    """analyse() of each metric over the days up to today, each table read once."""
+    today = today or date.today()
+    start = today - timedelta(days=days - 1)
+    loaded = {}
+    results = {}
+    for metric in metrics:
+        loader, column, higher_is_better, min_change = METRICS[metric]
+        if loader not in loaded:
+            loaded[loader] = LOADERS[loader](dog, start)
+        values = loaded[loader]
+        points = [(day, values[day].get(column)) for day in sorted(values) if day <= today]
+        points = [((day - start).days, value) for day, value in points if value is not None]
+        results[metric] = analyse(
+            [x for x, y in points], [float(y) for x, y in points], higher_is_better, min_change,
+        )
+    return results
+
+
+def cached_trends(dog, metrics, days, today=None):
+    """trends(), computing only the metrics whose cached copy is stale."""
+    today = today or date.today()
+    version = f'{days}:{today.isoformat()}:{generation(dog.pk)}'
+    keys = {metric: f'trend:{dog.pk}:{metric}:{version}' for metric in metrics}
+    found = cache.get_many(keys.values())
+    stale = [metric for metric, key in keys.items() if key not in found]
+    computed = trends(dog, stale, days, today) if stale else {}
+    if computed:
+        cache.set_many({keys[metric]: result for metric, result in computed.items()}, TREND_TIMEOUT)
+    return {metric: computed[metric] if metric in computed else found[keys[metric]] for metric in metrics}
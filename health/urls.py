@@ -7,7 +7,13 @@ urlpatterns = [
     path('', views.tracker_view, name='tracker'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
+    path('dog/', views.select_dog, name='select_dog'),
+    path('dog/add/', views.add_dog, name='add_dog'),
     path('save/', views.save_daily_entry, name='save_entry'),
+    path('sync/', views.sync_daily_entries, name='sync_entries'),
+    path('entry/', views.patch_daily_entry, name='patch_entry'),
+    path('api/tracker/', views.api_tracker_bootstrap, name='api_tracker_bootstrap'),
+    path('api/live/', views.live_events, name='live_events'),
     path('medications/', views.medications_view, name='medications'),
     path('medications/add/', views.add_medication, name='add_medication'),
     path('medications/<int:med_id>/dose/', views.record_dose, name='record_dose'),
@@ -18,14 +24,21 @@ urlpatterns = [
     # Dashboard
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('api/chart-data/', views.api_chart_data, name='api_chart_data'),
+    path('api/history/', views.api_history, name='api_history'),
+    path('api/category-trends/', views.api_category_trends, name='api_category_trends'),
+    path('api/trends/', views.api_trends, name='api_trends'),
+    path('api/psychometrics/', views.api_psychometrics, name='api_psychometrics'),
+    path('api/adherence/', views.api_adherence, name='api_adherence'),
 
     # CBPI (Canine Brief Pain Inventory)
     path('cbpi/', views.cbpi_view, name='cbpi'),
     path('cbpi/save/', views.save_cbpi, name='save_cbpi'),
+    path('cbpi/import/', views.import_assessment_batch, {'kind': 'cbpi'}, name='import_cbpi'),
 
     # CORQ (Canine Owner-Reported QoL)
     path('corq/', views.corq_view, name='corq'),
     path('corq/save/', views.save_corq, name='save_corq'),
+    path('corq/import/', views.import_assessment_batch, {'kind': 'corq'}, name='import_corq'),
 
     # Treatments
     path('treatments/', views.treatments_view, name='treatments'),
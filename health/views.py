@@ -1,23 +1,42 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST, require_http_methods
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils import timezone
-from django.utils.translation import gettext as _
+from django.utils.translation import get_language, gettext as _
 from django.conf import settings
 from datetime import date, timedelta
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+import hashlib
 import json
 
 from .models import (
-    DailyEntry, Medication, MedicationDose, LymphNodeMeasurement,
+    DailyEntry, DailyEntryRollup, Medication, MedicationDose, LymphNodeMeasurement,
     CBPIAssessment, CORQAssessment, VCOGCTCAEEvent, TreatmentSession,
-    DogProfile, Food, Meal, MealItem, SupplementDose, DailyNutritionSummary,
+    DogProfile, Food, Meal, MealItem, SupplementDose,
     MedicalRecord, LabValue, SiteSettings,
     Provider, TimelineEntry, TimelineAttachment
 )
+from .autosave import queue_changes, flush_changes
+from .live import astream, publish_dose, publish_entry, stream
+from .sync import apply_offline_items
+from .imports import import_assessments
+from .history import entry_page, node_page, parse_limit
+from .categories import TREND_DAYS, category_series
+from .tracker import cached_bootstrap
+from .dashboard import cached_context
+from .sparklines import cached_sparklines
+from .psychometrics import cached_psychometrics
+from .adherence import DEFAULT_DAYS as ADHERENCE_DAYS, cached_adherence, parse_medication
+from .trends import cached_trends, parse_days, parse_metrics
+from .caching import table_state
+from .charts import MODELS as CHART_MODELS, chart_data, parse_types, series_table, window
+from .resampling import bucket, bucket_columns, label, parse_resolution, resolve, thin
 
 
 def login_view(request):
@@ -42,12 +61,91 @@ def logout_view(request):
     return redirect('health:login')
 
 
+class NoDogProfile(Exception):
+    """The user owns and cares for no dog yet (see health.middleware)."""
+
+
+def _current_dog(request):
+    """
+    The dog this session is tracking: the one picked with select_dog,
+    else the first profile the user owns or cares for. Raises
+    NoDogProfile for a user with no dogs; profiles are only created by
+    add_dog.
+    """
+    dogs = DogProfile.objects.for_user(request.user)
+    dog_id = request.session.get('dog_id')
+    dog = dogs.filter(pk=dog_id).first() if dog_id else None
+    if dog is None:
+        dog = dogs.order_by('pk').first()
+    if dog is None:
+        raise NoDogProfile(_('Add a dog profile first'))
+    return dog
+
+
+@login_required(login_url='health:login')
+def add_dog(request):
+    """Create a dog profile owned by the user and start tracking it."""
+    error = None
+    if request.method == 'POST':
+        name = request.POST.get('name', '').strip()
+        try:
+            weight = Decimal(request.POST.get('weight_kg', ''))
+        except InvalidOperation:
+            weight = None
+        if not name:
+            error = _('Enter the dog\'s name')
+        elif weight is None or not 1 <= weight < 1000:
+            error = _('Enter a weight of at least 1 kg')
+        else:
+            dog = DogProfile.objects.create(user=request.user, name=name, weight_kg=weight)
+            request.session['dog_id'] = dog.pk
+            return redirect('health:tracker')
+    return render(request, 'health/add_dog.html', {'error': error})
+
+
+def _conditional_json(request, states, build):
+    """
+    Answer a GET with 304 Not Modified when the client's ETag or
+    Last-Modified still matches, otherwise with build()'s JsonResponse.
+
+    states are table_state() results for the rows the payload is built
+    from; the ETag also covers the query string, today's date and the
+    language, so a different window or translation never matches.
+    """
+    latest = max((state[0] for state in states if state[0] is not None), default=None)
+    validator = repr((request.get_full_path(), date.today(), get_language(), states))
+    etag = f'"{hashlib.md5(validator.encode()).hexdigest()}"'
+    last_modified = int(latest.timestamp()) if latest else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    ) or build()
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@login_required(login_url='health:login')
+@require_POST
+def select_dog(request):
+    """Switch the dog this session is tracking."""
+    dog = get_object_or_404(DogProfile.objects.for_user(request.user), pk=request.POST.get('dog_id'))
+    request.session['dog_id'] = dog.pk
+    return redirect(request.META.get('HTTP_REFERER', '/health/'))
+
+
 @login_required(login_url='health:login')
 def tracker_view(request):
+    dog = _current_dog(request)
     today = date.today()
     yesterday = today - timedelta(days=1)
 
+    # Write any autosaved changes still waiting in the cache
+    flush_changes(dog, request.user, today)
+
     entry, created = DailyEntry.objects.get_or_create(
+        dog=dog,
         date=today,
         defaults={'user': request.user}
     )
@@ -55,21 +153,13 @@ def tracker_view(request):
     # Get yesterday's entry for pre-fill defaults (only if today is new)
     yesterday_entry = None
     if created:
-        yesterday_entry = DailyEntry.objects.filter(
+        yesterday_entry = DailyEntry.objects.for_dog(dog).filter(
             date=yesterday, user=request.user
         ).first()
 
     # Build default values: today's value > yesterday's value > None
-    rating_fields = [
-        'tail_body_language', 'interest_people', 'interest_environment',
-        'enjoyment_favorites', 'overall_spark', 'appetite', 'food_enjoyment',
-        'nausea_signs', 'weight_condition', 'energy_level', 'willingness_move',
-        'walking_comfort', 'resting_comfort', 'breathing_comfort', 'pain_signs',
-        'sleep_quality', 'response_touch'
-    ]
-
     default_values = {}
-    for field in rating_fields:
+    for field in DailyEntry.RATING_FIELDS:
         today_val = getattr(entry, field)
         if today_val is not None:
             default_values[field] = today_val
@@ -78,78 +168,144 @@ def tracker_view(request):
         else:
             default_values[field] = None
 
-    medications = Medication.objects.filter(active=True)
+    medications = Medication.objects.for_dog(dog).filter(active=True)
 
-    today_doses = MedicationDose.objects.filter(
+    today_doses = MedicationDose.objects.for_dog(dog).filter(
         given_at__date=today
     ).select_related('medication')
 
-    week_ago = today - timedelta(days=7)
-    recent_entries = DailyEntry.objects.filter(date__gte=week_ago)
-
-    good_days = recent_entries.filter(good_day='yes').count()
-    total_days = recent_entries.exclude(good_day='').count()
-    good_day_percent = round(good_days / total_days * 100) if total_days > 0 else 0
+    this_week = DailyEntryRollup.for_date(dog, 'week', today)
 
     context = {
         'entry': entry,
         'default_values': default_values,
         'medications': medications,
         'today_doses': today_doses,
-        'good_day_percent': good_day_percent,
-        'total_days': total_days,
+        'good_day_percent': this_week.good_day_percent,
+        'total_days': this_week.rated_days,
     }
     return render(request, 'health/tracker.html', context)
 
 
 @login_required(login_url='health:login')
-@require_POST
-def save_daily_entry(request):
+def api_tracker_bootstrap(request):
+    """
+    Everything the tracker page needs as JSON, cached per user and day.
+
+    Responses carry an ETag; a request with a matching If-None-Match gets
+    an empty 304 so the page can keep painting from its local copy.
+    """
+    dog = _current_dog(request)
     today = date.today()
-    entry, created = DailyEntry.objects.get_or_create(
-        date=today,
-        defaults={'user': request.user}
+    flush_changes(dog, request.user, today)
+    etag, body = cached_bootstrap(dog, request.user, today)
+    response = get_conditional_response(request, etag=etag) or HttpResponse(
+        body, content_type='application/json'
     )
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
+
+@login_required(login_url='health:login')
+@require_POST
+def save_daily_entry(request):
     data = json.loads(request.body)
+    values = {
+        field: data[field] for field in DailyEntry.TRACKED_FIELDS if field in data
+    }
 
-    entry.good_day = data.get('good_day', '')
-    entry.tail_body_language = data.get('tail_body_language')
-    entry.interest_people = data.get('interest_people')
-    entry.interest_environment = data.get('interest_environment')
-    entry.enjoyment_favorites = data.get('enjoyment_favorites')
-    entry.overall_spark = data.get('overall_spark')
-    entry.appetite = data.get('appetite')
-    entry.food_enjoyment = data.get('food_enjoyment')
-    entry.nausea_signs = data.get('nausea_signs')
-    entry.weight_condition = data.get('weight_condition')
-    entry.breakfast = data.get('breakfast', False)
-    entry.lunch = data.get('lunch', False)
-    entry.dinner = data.get('dinner', False)
-    entry.treats = data.get('treats', False)
-    entry.energy_level = data.get('energy_level')
-    entry.willingness_move = data.get('willingness_move')
-    entry.walking_comfort = data.get('walking_comfort')
-    entry.resting_comfort = data.get('resting_comfort')
-    entry.breathing_comfort = data.get('breathing_comfort')
-    entry.pain_signs = data.get('pain_signs')
-    entry.sleep_quality = data.get('sleep_quality')
-    entry.response_touch = data.get('response_touch')
-    entry.good_notes = data.get('good_notes', '')
-    entry.hard_notes = data.get('hard_notes', '')
-    entry.other_notes = data.get('other_notes', '')
-    entry.user = request.user
-    entry.save()
+    dog = _current_dog(request)
+    # Pending autosave changes are older than this full save
+    flush_changes(dog, request.user, date.today())
+    entry = DailyEntry.upsert(dog, date.today(), request.user, values)
+    publish_entry(dog, request.user, date.today())
 
     return JsonResponse({'status': 'success', 'happiness_score': entry.happiness_score})
 
 
+@login_required(login_url='health:login')
+@require_http_methods(['PATCH'])
+def patch_daily_entry(request):
+    """
+    Autosave changed tracker fields for today.
+
+    Changes are merged in the cache and written once per coalescing
+    window; send {"flush": true} to write them immediately.
+    """
+    data = json.loads(request.body or '{}')
+    flush = data.pop('flush', False)
+
+    try:
+        values = DailyEntry.validate_tracked_values(data)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    dog = _current_dog(request)
+    today = date.today()
+    try:
+        due = queue_changes(dog, request.user, today, values)
+        entry = flush_changes(dog, request.user, today) if due or flush else None
+    except TimeoutError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=503)
+    if not (due or flush):
+        return JsonResponse({'status': 'pending'})
+
+    if entry:
+        publish_entry(dog, request.user, today)
+    return JsonResponse({
+        'status': 'saved',
+        'happiness_score': entry.happiness_score if entry else None,
+        'overall_score': entry.overall_score if entry else None,
+    })
+
+
+@login_required(login_url='health:login')
+@require_POST
+def sync_daily_entries(request):
+    """Apply a batch of tracker entries queued offline on the phone."""
+    data = json.loads(request.body)
+    items = data.get('entries')
+    if not isinstance(items, list):
+        return JsonResponse({'status': 'error', 'message': 'entries must be a list'}, status=400)
+
+    dog = _current_dog(request)
+    try:
+        result = apply_offline_items(dog, request.user, items)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    # Open pages only show today, so only today's entry is pushed
+    if any(e['date'] == date.today().isoformat() for e in result['entries']):
+        publish_entry(dog, request.user, date.today())
+
+    return JsonResponse({'status': 'success', **result})
+
+
+@login_required(login_url='health:login')
+def live_events(request):
+    """
+    Server-Sent Events stream of the household's changes to the current
+    dog, resumed from the Last-Event-ID the browser sends on reconnect.
+    """
+    dog = _current_dog(request)
+    last_id = request.headers.get('Last-Event-ID', '')
+    last_id = int(last_id) if last_id.isdigit() else None
+    # Only an ASGI worker can hold the connection open
+    events = astream if isinstance(request, ASGIRequest) else stream
+    response = StreamingHttpResponse(events(dog.pk, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required(login_url='health:login')
 @require_POST
 def add_medication(request):
     data = json.loads(request.body)
 
     med = Medication.objects.create(
+        dog=_current_dog(request),
         name=data['name'],
         dosage=data['dosage'],
         frequency=data.get('frequency', 'once'),
@@ -167,13 +323,14 @@ def add_medication(request):
 @login_required(login_url='health:login')
 @require_POST
 def record_dose(request, med_id):
-    medication = get_object_or_404(Medication, id=med_id)
+    medication = get_object_or_404(Medication, id=med_id, dog=_current_dog(request))
 
     dose = MedicationDose.objects.create(
         medication=medication,
         user=request.user,
         given_at=timezone.now()
     )
+    publish_dose(medication.dog, request.user, dose)
 
     return JsonResponse({
         'status': 'success',
@@ -185,46 +342,41 @@ def record_dose(request, med_id):
 @require_POST
 def save_node_measurement(request):
     data = json.loads(request.body)
-    today = date.today()
 
-    measurement, created = LymphNodeMeasurement.objects.get_or_create(
-        date=today,
-        defaults={'user': request.user}
-    )
+    values = {
+        field: data[field] or None
+        for field in LymphNodeMeasurement.NODE_FIELDS if field in data
+    }
+    for field in ('status', 'notes'):
+        if field in data:
+            values[field] = data[field]
 
-    measurement.mandibular_left = data.get('mandibular_left') or None
-    measurement.mandibular_right = data.get('mandibular_right') or None
-    measurement.popliteal_left = data.get('popliteal_left') or None
-    measurement.popliteal_right = data.get('popliteal_right') or None
-    measurement.status = data.get('status', '')
-    measurement.notes = data.get('notes', '')
-    measurement.user = request.user
-    measurement.save()
+    LymphNodeMeasurement.upsert(_current_dog(request), date.today(), request.user, values)
 
     return JsonResponse({'status': 'success'})
 
 
 @login_required(login_url='health:login')
 def history_view(request):
-    entries = DailyEntry.objects.all()[:14]
-    node_measurements = LymphNodeMeasurement.objects.all()[:10]
-
-    week_ago = date.today() - timedelta(days=7)
-    recent = DailyEntry.objects.filter(date__gte=week_ago)
-
-    good_days = recent.filter(good_day='yes').count()
-    mixed_days = recent.filter(good_day='mixed').count()
-    bad_days = recent.filter(good_day='no').count()
-    total = good_days + mixed_days + bad_days
-
-    two_weeks_ago = date.today() - timedelta(days=14)
-    prev_week = DailyEntry.objects.filter(date__gte=two_weeks_ago, date__lt=week_ago)
-    prev_good = prev_week.filter(good_day='yes').count()
-    prev_total = prev_week.exclude(good_day='').count()
+    dog = _current_dog(request)
+    entries, entries_cursor = entry_page(dog, limit=14)
+    node_measurements, nodes_cursor = node_page(dog, limit=10)
+
+    # This week vs last week, from the weekly rollups
+    week_start = DailyEntryRollup.period_start('week', date.today())
+    prev_start = week_start - timedelta(days=7)
+    weeks = {
+        r.start: r for r in DailyEntryRollup.objects.for_dog(dog).filter(
+            period='week', start__in=[week_start, prev_start]
+        )
+    }
+    this_week = weeks.get(week_start) or DailyEntryRollup(dog=dog, period='week', start=week_start)
+    prev_week = weeks.get(prev_start) or DailyEntryRollup(dog=dog, period='week', start=prev_start)
+    total = this_week.rated_days
 
-    if total > 0 and prev_total > 0:
-        current_pct = good_days / total
-        prev_pct = prev_good / prev_total
+    if total > 0 and prev_week.rated_days > 0:
+        current_pct = this_week.good_days / total
+        prev_pct = prev_week.good_days / prev_week.rated_days
         if current_pct > prev_pct:
             trend = 'Better'
         elif current_pct < prev_pct:
@@ -236,20 +388,100 @@ def history_view(request):
 
     context = {
         'entries': entries,
+        'entries_cursor': entries_cursor,
         'node_measurements': node_measurements,
-        'good_day_percent': round(good_days / total * 100) if total > 0 else 0,
+        'nodes_cursor': nodes_cursor,
+        'good_day_percent': this_week.good_day_percent,
         'total_days': total,
         'trend': trend,
     }
     return render(request, 'health/history.html', context)
 
 
+@login_required(login_url='health:login')
+def api_history(request):
+    """
+    Cursor-paginated history, newest first.
+
+    ?kind=entries|nodes selects the list, ?before=<next_cursor from the
+    previous page> continues it and ?limit= sets the page size.
+    """
+    kind = request.GET.get('kind', 'entries')
+    pages = {'entries': entry_page, 'nodes': node_page}
+    if kind not in pages:
+        return JsonResponse({'error': 'kind must be entries or nodes'}, status=400)
+    try:
+        limit = parse_limit(request.GET.get('limit'))
+        rows, next_cursor = pages[kind](_current_dog(request), request.GET.get('before'), limit)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'items': rows, 'next_cursor': next_cursor})
+
+
+@login_required(login_url='health:login')
+def api_category_trends(request):
+    """Daily mood/appetite/energy/pain scores for the last ?days=30|90|365."""
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = None
+    if days not in TREND_DAYS:
+        return JsonResponse({'error': 'days must be 30, 90 or 365'}, status=400)
+    end_date = date.today()
+    data = category_series(_current_dog(request), end_date - timedelta(days=days - 1), end_date)
+    data['days'] = days
+    return JsonResponse(data)
+
+
+@login_required(login_url='health:login')
+def api_trends(request):
+    """
+    Trend statistics for ?metrics= (comma-separated, default all) over the
+    last ?days= (7-365, default 30): EWMA, slope, weekly change with its
+    95% interval and an improving/declining/stable call. See health.trends.
+    """
+    try:
+        metrics = parse_metrics(request.GET.get('metrics'))
+        days = parse_days(request.GET.get('days'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'days': days, 'metrics': cached_trends(_current_dog(request), metrics, days)})
+
+
+@login_required(login_url='health:login')
+def api_psychometrics(request):
+    """
+    CBPI and CORQ analytics over the whole history: Cronbach's alpha and
+    item-total correlations per factor, and change from baseline with
+    clinically meaningful changes flagged. See health.psychometrics.
+    """
+    return JsonResponse(cached_psychometrics(_current_dog(request)))
+
+
+@login_required(login_url='health:login')
+def api_adherence(request):
+    """
+    Medication adherence over the last ?days= (7-365, default 91): expected
+    dose slots against logged doses per day, for a heatmap, and per week,
+    for every scheduled medication or just ?medication=<id>. See
+    health.adherence.
+    """
+    try:
+        days = parse_days(request.GET.get('days'), default=ADHERENCE_DAYS)
+        medication_id = parse_medication(request.GET.get('medication'))
+        result = cached_adherence(_current_dog(request), days, medication_id=medication_id)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'days': days, **result})
+
+
 @login_required(login_url='health:login')
 def medications_view(request):
-    medications = Medication.objects.filter(active=True)
+    dog = _current_dog(request)
+    medications = Medication.objects.for_dog(dog).filter(active=True)
     today = date.today()
 
-    today_doses = MedicationDose.objects.filter(
+    today_doses = MedicationDose.objects.for_dog(dog).filter(
         given_at__date=today
     ).select_related('medication')
 
@@ -262,9 +494,10 @@ def medications_view(request):
 
 @login_required(login_url='health:login')
 def nodes_view(request):
+    dog = _current_dog(request)
     today = date.today()
-    measurement = LymphNodeMeasurement.objects.filter(date=today).first()
-    history = LymphNodeMeasurement.objects.all()[:10]
+    measurement = LymphNodeMeasurement.objects.for_dog(dog).filter(date=today).first()
+    history = LymphNodeMeasurement.objects.for_dog(dog)[:10]
 
     context = {
         'measurement': measurement,
@@ -276,324 +509,61 @@ def nodes_view(request):
 @login_required(login_url='health:login')
 def dashboard_view(request):
     """Main QoL dashboard with validated assessment summaries."""
-    today = date.today()
-    thirty_days_ago = today - timedelta(days=30)
-
-    # Get today's entry
-    today_entry = DailyEntry.objects.filter(date=today).first()
-
-    # Calculate today's category scores
-    # For star display: round to nearest integer (4.5+ = 5, below 4.5 = 4)
-    today_scores = {
-        'mood': None,
-        'appetite': None,
-        'energy': None,
-        'pain': None,
-        'overall': None,
-        'mood_stars': None,
-        'appetite_stars': None,
-        'energy_stars': None,
-        'pain_stars': None,
-        'overall_stars': None,
-    }
-    if today_entry:
-        # Mood (5 fields)
-        mood_fields = [today_entry.tail_body_language, today_entry.interest_people,
-                       today_entry.interest_environment, today_entry.enjoyment_favorites,
-                       today_entry.overall_spark]
-        mood_valid = [f for f in mood_fields if f is not None]
-        if mood_valid:
-            avg = sum(mood_valid) / len(mood_valid)
-            today_scores['mood'] = round(avg, 1)
-            today_scores['mood_stars'] = round(avg)  # Round to nearest int for stars
-
-        # Appetite (2 fields)
-        appetite_fields = [today_entry.appetite, today_entry.food_enjoyment]
-        appetite_valid = [f for f in appetite_fields if f is not None]
-        if appetite_valid:
-            avg = sum(appetite_valid) / len(appetite_valid)
-            today_scores['appetite'] = round(avg, 1)
-            today_scores['appetite_stars'] = round(avg)
-
-        # Energy (2 fields)
-        energy_fields = [today_entry.energy_level, today_entry.willingness_move]
-        energy_valid = [f for f in energy_fields if f is not None]
-        if energy_valid:
-            avg = sum(energy_valid) / len(energy_valid)
-            today_scores['energy'] = round(avg, 1)
-            today_scores['energy_stars'] = round(avg)
-
-        # Pain/Comfort (2 fields - higher is better/less pain)
-        pain_fields = [today_entry.pain_signs, today_entry.breathing_comfort]
-        pain_valid = [f for f in pain_fields if f is not None]
-        if pain_valid:
-            avg = sum(pain_valid) / len(pain_valid)
-            today_scores['pain'] = round(avg, 1)
-            today_scores['pain_stars'] = round(avg)
-
-        today_scores['overall'] = today_entry.overall_score
-        if today_entry.overall_score:
-            today_scores['overall_stars'] = round(today_entry.overall_score)
-
-    # Get latest assessments
-    latest_cbpi = CBPIAssessment.objects.first()
-    latest_corq = CORQAssessment.objects.first()
-    latest_node = LymphNodeMeasurement.objects.first()
-
-    # Assessment reminders - days since last
-    assessment_reminders = []
-    if latest_cbpi:
-        days_since_cbpi = (today - latest_cbpi.date).days
-        if days_since_cbpi >= 7:
-            assessment_reminders.append({
-                'name': 'CBPI Pain',
-                'days': days_since_cbpi,
-                'overdue': days_since_cbpi > 7,
-                'url': 'health:cbpi'
-            })
-    else:
-        assessment_reminders.append({
-            'name': 'CBPI Pain',
-            'days': None,
-            'overdue': True,
-            'url': 'health:cbpi'
-        })
-
-    if latest_corq:
-        days_since_corq = (today - latest_corq.date).days
-        if days_since_corq >= 14:
-            assessment_reminders.append({
-                'name': 'CORQ QoL',
-                'days': days_since_corq,
-                'overdue': days_since_corq > 14,
-                'url': 'health:corq'
-            })
-    else:
-        assessment_reminders.append({
-            'name': 'CORQ QoL',
-            'days': None,
-            'overdue': True,
-            'url': 'health:corq'
-        })
-
-    if latest_node:
-        days_since_nodes = (today - latest_node.date).days
-        if days_since_nodes >= 7:
-            assessment_reminders.append({
-                'name': 'Lymph Nodes',
-                'days': days_since_nodes,
-                'overdue': days_since_nodes > 7,
-                'url': 'health:nodes'
-            })
-    else:
-        assessment_reminders.append({
-            'name': 'Lymph Nodes',
-            'days': None,
-            'overdue': True,
-            'url': 'health:nodes'
-        })
-
-    # Recent adverse events
-    recent_events = VCOGCTCAEEvent.objects.filter(
-        date__gte=thirty_days_ago
-    ).order_by('-date')[:5]
-
-    # Recent treatments
-    recent_treatments = TreatmentSession.objects.filter(
-        date__gte=thirty_days_ago
-    ).order_by('-date')[:5]
-
-    # Daily entry stats
-    entries = DailyEntry.objects.filter(date__gte=thirty_days_ago)
-    good_days = entries.filter(good_day='yes').count()
-    mixed_days = entries.filter(good_day='mixed').count()
-    bad_days = entries.filter(good_day='no').count()
-    total_days = good_days + mixed_days + bad_days
-
-    # Nutrition data
-    today_nutrition = DailyNutritionSummary.objects.filter(date=today).first()
-    dog_profile = DogProfile.objects.first()
-
-    # Medication data
-    active_meds = Medication.objects.filter(active=True)
-    today_doses = MedicationDose.objects.filter(
-        given_at__date=today
-    ).select_related('medication')
-    doses_given = {dose.medication_id for dose in today_doses}
-
-    # Calculate trend (compare last 7 days to previous 7 days)
-    seven_days_ago = today - timedelta(days=7)
-    fourteen_days_ago = today - timedelta(days=14)
-
-    recent_entries = DailyEntry.objects.filter(date__gte=seven_days_ago, date__lt=today)
-    previous_entries = DailyEntry.objects.filter(date__gte=fourteen_days_ago, date__lt=seven_days_ago)
-
-    recent_scores = [e.overall_score for e in recent_entries if e.overall_score]
-    previous_scores = [e.overall_score for e in previous_entries if e.overall_score]
-
-    trend = 'stable'
-    trend_value = 0
-    if recent_scores and previous_scores:
-        recent_avg = sum(recent_scores) / len(recent_scores)
-        previous_avg = sum(previous_scores) / len(previous_scores)
-        trend_value = round(recent_avg - previous_avg, 1)
-        if trend_value > 0.2:
-            trend = 'improving'
-        elif trend_value < -0.2:
-            trend = 'declining'
-
-    # Calculate QoL status color based on today's entry or CORQ
-    qol_status = 'gray'
-    qol_message = _('No entry yet today')
-    if today_scores['overall']:
-        score = today_scores['overall']
-        if score >= 4:
-            qol_status = 'green'
-            qol_message = _('Great day!')
-        elif score >= 3:
-            qol_status = 'yellow'
-            qol_message = _('Good day')
-        elif score >= 2:
-            qol_status = 'orange'
-            qol_message = _('Difficult day')
-        else:
-            qol_status = 'red'
-            qol_message = _('Hard day - monitor closely')
-    elif latest_corq:
-        total = latest_corq.total_score
-        if total >= 60:
-            qol_status = 'green'
-            qol_message = _('Good quality of life')
-        elif total >= 45:
-            qol_status = 'yellow'
-            qol_message = _('Fair - monitor closely')
-        elif total >= 30:
-            qol_status = 'orange'
-            qol_message = _('Declining - consult vet')
-        else:
-            qol_status = 'red'
-            qol_message = _('Poor - urgent consultation needed')
-
-    # Upcoming appointments (next 7 days, scheduled)
-    seven_days_from_now = today + timedelta(days=7)
-    upcoming_appointments = TimelineEntry.objects.filter(
-        user=request.user,
-        date__gte=today,
-        date__lte=seven_days_from_now,
-        status='scheduled'
-    ).order_by('date', 'time')[:5]
-
-    # Overdue appointments (past dates still marked as scheduled)
-    overdue_appointments = TimelineEntry.objects.filter(
-        user=request.user,
-        date__lt=today,
-        status='scheduled'
-    ).order_by('date')[:3]
-
+    dog = _current_dog(request)
     context = {
-        'today_entry': today_entry,
-        'today_scores': today_scores,
-        'latest_cbpi': latest_cbpi,
-        'latest_corq': latest_corq,
-        'latest_node': latest_node,
-        'assessment_reminders': assessment_reminders,
-        'recent_events': recent_events,
-        'recent_treatments': recent_treatments,
-        'good_days': good_days,
-        'mixed_days': mixed_days,
-        'bad_days': bad_days,
-        'total_days': total_days,
-        'today_nutrition': today_nutrition,
-        'dog_profile': dog_profile,
-        'active_meds': active_meds,
-        'doses_given': doses_given,
-        'trend': trend,
-        'trend_value': trend_value,
-        'qol_status': qol_status,
-        'qol_message': qol_message,
-        'upcoming_appointments': upcoming_appointments,
-        'overdue_appointments': overdue_appointments,
+        **cached_context(dog, request.user),
+        'sparklines': cached_sparklines(dog),
+        'psychometrics': cached_psychometrics(dog),
     }
     return render(request, 'health/dashboard.html', context)
 
 
 @login_required(login_url='health:login')
 def api_chart_data(request):
-    """API endpoint for chart data."""
+    """
+    API endpoint for chart data.
+
+    ?type= returns one chart's data; ?types=daily,nodes,... returns several
+    series on a shared date axis in one response. ?resolution= (auto, day,
+    week, month) buckets long spans; see health.resampling. Unchanged data
+    is answered with a 304 (see _conditional_json).
+    """
+    dog = _current_dog(request)
     chart_type = request.GET.get('type', 'daily')
     days = int(request.GET.get('days', 30))
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
+    try:
+        resolution = resolve(parse_resolution(request.GET.get('resolution')), start_date, end_date)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if 'types' in request.GET:
+        try:
+            types = parse_types(request.GET['types'])
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return _conditional_json(
+            request,
+            [table_state(window(dog, t, start_date)) for t in types],
+            lambda: JsonResponse({**series_table(dog, types, start_date, resolution), 'days': days}),
+        )
 
-    if chart_type == 'daily':
-        entries = DailyEntry.objects.filter(
-            date__gte=start_date
-        ).order_by('date')
-        data = {
-            'labels': [e.date.strftime('%m/%d') for e in entries],
-            'happiness': [e.happiness_score or 0 for e in entries],
-            'overall': [e.overall_score or 0 for e in entries],
-        }
-
-    elif chart_type == 'cbpi':
-        assessments = CBPIAssessment.objects.filter(
-            date__gte=start_date
-        ).order_by('date')
-        data = {
-            'labels': [a.date.strftime('%m/%d') for a in assessments],
-            'severity': [a.pain_severity_score for a in assessments],
-            'interference': [a.pain_interference_score for a in assessments],
-        }
-
-    elif chart_type == 'corq':
-        assessments = CORQAssessment.objects.filter(
-            date__gte=start_date
-        ).order_by('date')
-        data = {
-            'labels': [a.date.strftime('%m/%d') for a in assessments],
-            'vitality': [a.vitality_score for a in assessments],
-            'companionship': [a.companionship_score for a in assessments],
-            'pain': [a.pain_score for a in assessments],
-            'mobility': [a.mobility_score for a in assessments],
-            'total': [a.total_score for a in assessments],
-        }
-
-    elif chart_type == 'nodes':
-        measurements = LymphNodeMeasurement.objects.filter(
-            date__gte=start_date
-        ).order_by('date')
-        data = {
-            'labels': [m.date.strftime('%m/%d') for m in measurements],
-            'mandibular_left': [float(m.mandibular_left) if m.mandibular_left else None for m in measurements],
-            'mandibular_right': [float(m.mandibular_right) if m.mandibular_right else None for m in measurements],
-            'popliteal_left': [float(m.popliteal_left) if m.popliteal_left else None for m in measurements],
-            'popliteal_right': [float(m.popliteal_right) if m.popliteal_right else None for m in measurements],
-        }
-
-    elif chart_type == 'events':
-        events = VCOGCTCAEEvent.objects.filter(date__gte=start_date)
-        grade_counts = {}
-        for grade in range(1, 6):
-            grade_counts[f'grade_{grade}'] = events.filter(grade=grade).count()
-        category_counts = {}
-        for cat, _ in VCOGCTCAEEvent.CATEGORY_CHOICES:
-            category_counts[cat] = events.filter(category=cat).count()
-        data = {
-            'grades': grade_counts,
-            'categories': category_counts,
-        }
-
-    else:
-        data = {'error': 'Unknown chart type'}
-
-    return JsonResponse(data)
+    if chart_type not in CHART_MODELS:
+        return JsonResponse({'error': 'Unknown chart type'})
+    return _conditional_json(
+        request,
+        [table_state(window(dog, chart_type, start_date))],
+        lambda: JsonResponse(chart_data(dog, chart_type, start_date, end_date, resolution)),
+    )
 
 
 @login_required(login_url='health:login')
 def cbpi_view(request):
     """CBPI assessment form and history."""
+    dog = _current_dog(request)
     today = date.today()
-    assessments = CBPIAssessment.objects.all()[:10]
+    assessments = CBPIAssessment.objects.for_dog(dog)[:10]
     latest = assessments.first() if assessments else None
 
     context = {
@@ -607,10 +577,12 @@ def cbpi_view(request):
 @require_POST
 def save_cbpi(request):
     """Save CBPI assessment."""
+    dog = _current_dog(request)
     data = json.loads(request.body)
     today = date.today()
 
     assessment = CBPIAssessment.objects.create(
+        dog=dog,
         user=request.user,
         date=today,
         worst_pain=data['worst_pain'],
@@ -634,10 +606,34 @@ def save_cbpi(request):
     })
 
 
+@login_required(login_url='health:login')
+@require_POST
+def import_assessment_batch(request, kind):
+    """
+    Record a stack of backdated CBPI or CORQ assessments at once, all or
+    nothing: {"assessments": [{"date": ..., <items>}, ...]}. source
+    defaults to clinic; see health.imports.import_assessments.
+    """
+    data = json.loads(request.body)
+    items = data.get('assessments')
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return JsonResponse({'status': 'error', 'message': 'assessments must be a list of objects'}, status=400)
+
+    result = import_assessments(kind, enumerate(items), _current_dog(request), request.user)
+    if result['errors']:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'No assessments were saved',
+            'errors': [{'index': index, 'message': message} for index, message in result['errors']],
+        }, status=400)
+    return JsonResponse({'status': 'success', 'created': result['created'], 'skipped': result['skipped']})
+
+
 @login_required(login_url='health:login')
 def corq_view(request):
     """CORQ assessment form and history."""
-    assessments = CORQAssessment.objects.all()[:10]
+    dog = _current_dog(request)
+    assessments = CORQAssessment.objects.for_dog(dog)[:10]
     latest = assessments.first() if assessments else None
 
     context = {
@@ -651,10 +647,12 @@ def corq_view(request):
 @require_POST
 def save_corq(request):
     """Save CORQ assessment."""
+    dog = _current_dog(request)
     data = json.loads(request.body)
     today = date.today()
 
     assessment = CORQAssessment.objects.create(
+        dog=dog,
         user=request.user,
         date=today,
         energy_level=data['energy_level'],
@@ -690,7 +688,8 @@ def save_corq(request):
 @login_required(login_url='health:login')
 def treatments_view(request):
     """Treatment sessions history."""
-    treatments = TreatmentSession.objects.all()[:20]
+    dog = _current_dog(request)
+    treatments = TreatmentSession.objects.for_dog(dog)[:20]
 
     context = {
         'treatments': treatments,
@@ -702,9 +701,11 @@ def treatments_view(request):
 @require_POST
 def save_treatment(request):
     """Save treatment session."""
+    dog = _current_dog(request)
     data = json.loads(request.body)
 
     treatment = TreatmentSession.objects.create(
+        dog=dog,
         user=request.user,
         date=data.get('date', date.today()),
         treatment_type=data['treatment_type'],
@@ -722,8 +723,9 @@ def save_treatment(request):
 @login_required(login_url='health:login')
 def events_view(request):
     """Adverse events (VCOG-CTCAE) tracking."""
-    events = VCOGCTCAEEvent.objects.all()[:20]
-    unresolved = VCOGCTCAEEvent.objects.filter(resolved=False)
+    dog = _current_dog(request)
+    events = VCOGCTCAEEvent.objects.for_dog(dog)[:20]
+    unresolved = VCOGCTCAEEvent.objects.for_dog(dog).filter(resolved=False)
 
     context = {
         'events': events,
@@ -736,9 +738,11 @@ def events_view(request):
 @require_POST
 def save_event(request):
     """Save adverse event."""
+    dog = _current_dog(request)
     data = json.loads(request.body)
 
     event = VCOGCTCAEEvent.objects.create(
+        dog=dog,
         user=request.user,
         date=data.get('date', date.today()),
         category=data['category'],
@@ -775,19 +779,14 @@ def nutrition_view(request):
     - Ogilvie GK et al. Cancer. 2000;88(8):1916-1928.
     - Vail DM, Ogilvie GK et al. J Vet Intern Med. 1990;4(1):8-14.
     """
+    profile = _current_dog(request)
     today = date.today()
 
-    # Get or create dog profile
-    profile, created = DogProfile.objects.get_or_create(
-        user=request.user,
-        defaults={'name': 'Bruno', 'weight_kg': 22}
-    )
-
     # Today's meals
-    meals = Meal.objects.filter(user=request.user, date=today)
+    meals = Meal.objects.for_dog(profile).filter(user=request.user, date=today)
 
     # Today's supplements
-    supplements = SupplementDose.objects.filter(user=request.user, date=today)
+    supplements = SupplementDose.objects.for_dog(profile).filter(user=request.user, date=today)
 
     # Calculate today's totals
     total_food_g = sum(m.total_grams for m in meals)
@@ -847,9 +846,11 @@ def nutrition_view(request):
 @require_POST
 def save_meal(request):
     """Save a meal with items."""
+    dog = _current_dog(request)
     data = json.loads(request.body)
 
     meal = Meal.objects.create(
+        dog=dog,
         user=request.user,
         date=data.get('date', date.today()),
         meal_type=data['meal_type'],
@@ -896,9 +897,11 @@ def save_meal(request):
 @require_POST
 def save_supplement(request):
     """Save a supplement dose."""
+    dog = _current_dog(request)
     data = json.loads(request.body)
 
     supplement = SupplementDose.objects.create(
+        dog=dog,
         user=request.user,
         date=data.get('date', date.today()),
         supplement_type=data['supplement_type'],
@@ -923,16 +926,11 @@ def update_weight(request):
     """Update dog's weight."""
     data = json.loads(request.body)
 
-    profile, created = DogProfile.objects.get_or_create(
-        user=request.user,
-        defaults={'name': 'Bruno', 'weight_kg': data['weight_kg']}
-    )
-
-    if not created:
-        profile.weight_kg = data['weight_kg']
-        if 'target_weight_kg' in data:
-            profile.target_weight_kg = data['target_weight_kg']
-        profile.save()
+    profile = _current_dog(request)
+    profile.weight_kg = data['weight_kg']
+    if 'target_weight_kg' in data:
+        profile.target_weight_kg = data['target_weight_kg']
+    profile.save()
 
     return JsonResponse({
         'status': 'success',
@@ -971,81 +969,84 @@ def api_foods(request):
     if status:
         foods = foods.filter(status=status)
 
-    data = [{
-        'id': f.id,
-        'name': f.name,
-        'category': f.category,
-        'status': f.status,
-        'calories_per_100g': f.calories_per_100g,
-        'protein_g_per_100g': float(f.protein_g_per_100g) if f.protein_g_per_100g else None,
-        'fat_g_per_100g': float(f.fat_g_per_100g) if f.fat_g_per_100g else None,
-        'carbs_g_per_100g': float(f.carbs_g_per_100g) if f.carbs_g_per_100g else None,
-        'warning': f.warning,
-        'notes': f.notes,
-    } for f in foods]
+    def build():
+        data = [{
+            'id': f.id,
+            'name': f.name,
+            'category': f.category,
+            'status': f.status,
+            'calories_per_100g': f.calories_per_100g,
+            'protein_g_per_100g': float(f.protein_g_per_100g) if f.protein_g_per_100g else None,
+            'fat_g_per_100g': float(f.fat_g_per_100g) if f.fat_g_per_100g else None,
+            'carbs_g_per_100g': float(f.carbs_g_per_100g) if f.carbs_g_per_100g else None,
+            'warning': f.warning,
+            'notes': f.notes,
+        } for f in foods]
+        return JsonResponse({'foods': data})
+
+    return _conditional_json(request, [table_state(foods)], build)
 
-    return JsonResponse({'foods': data})
+
+NUTRIENTS = ['food_g', 'protein_g', 'fat_g', 'carbs_g']
 
 
 @login_required(login_url='health:login')
 def api_nutrition_summary(request):
-    """API endpoint for nutrition summary over time."""
+    """
+    API endpoint for nutrition summary over time: daily totals, or at
+    ?resolution=week/month each period's mean, min and max daily total.
+    """
+    dog = _current_dog(request)
     days = int(request.GET.get('days', 7))
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
+    try:
+        resolution = resolve(parse_resolution(request.GET.get('resolution')), start_date, end_date)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    def build():
+        # Get meals for the period
+        meals_by_date = {}
+        meals = Meal.objects.for_dog(dog).filter(
+            user=request.user,
+            date__gte=start_date,
+            date__lte=end_date
+        ).order_by('date').prefetch_related('items__food')
+
+        for meal in meals:
+            if meal.date not in meals_by_date:
+                meals_by_date[meal.date] = dict.fromkeys(NUTRIENTS, 0)
+            meals_by_date[meal.date]['food_g'] += meal.total_grams
+            meals_by_date[meal.date]['protein_g'] += meal.total_protein_g
+            meals_by_date[meal.date]['fat_g'] += meal.total_fat_g
+            meals_by_date[meal.date]['carbs_g'] += meal.total_carbs_g
+
+        # Every day of the period, zero when nothing was eaten
+        daily = {}
+        current = start_date
+        while current <= end_date:
+            daily[current] = meals_by_date.get(current, dict.fromkeys(NUTRIENTS, 0))
+            current += timedelta(days=1)
+
+        values = thin(bucket(daily, NUTRIENTS, resolution), 'food_g')
+        dates = sorted(values)
+        return JsonResponse({
+            'labels': [label(d, resolution) for d in dates],
+            'resolution': resolution,
+            **{
+                column: [values[d][column] for d in dates]
+                for column in bucket_columns(NUTRIENTS, resolution)
+            },
+        })
 
-    # Get meals for the period
-    meals_by_date = {}
-    meals = Meal.objects.filter(
-        user=request.user,
-        date__gte=start_date,
-        date__lte=end_date
-    ).order_by('date')
-
-    for meal in meals:
-        d = meal.date.isoformat()
-        if d not in meals_by_date:
-            meals_by_date[d] = {
-                'food_g': 0,
-                'protein_g': 0,
-                'fat_g': 0,
-                'carbs_g': 0,
-            }
-        meals_by_date[d]['food_g'] += meal.total_grams
-        meals_by_date[d]['protein_g'] += meal.total_protein_g
-        meals_by_date[d]['fat_g'] += meal.total_fat_g
-        meals_by_date[d]['carbs_g'] += meal.total_carbs_g
-
-    # Build response
-    labels = []
-    food_data = []
-    protein_data = []
-    fat_data = []
-    carbs_data = []
-
-    current = start_date
-    while current <= end_date:
-        d = current.isoformat()
-        labels.append(current.strftime('%m/%d'))
-        if d in meals_by_date:
-            food_data.append(meals_by_date[d]['food_g'])
-            protein_data.append(meals_by_date[d]['protein_g'])
-            fat_data.append(meals_by_date[d]['fat_g'])
-            carbs_data.append(meals_by_date[d]['carbs_g'])
-        else:
-            food_data.append(0)
-            protein_data.append(0)
-            fat_data.append(0)
-            carbs_data.append(0)
-        current += timedelta(days=1)
-
-    return JsonResponse({
-        'labels': labels,
-        'food_g': food_data,
-        'protein_g': protein_data,
-        'fat_g': fat_data,
-        'carbs_g': carbs_data,
-    })
+    items = MealItem.objects.filter(
+        meal__dog=dog, meal__user=request.user, meal__date__range=(start_date, end_date)
+    )
+    # Totals change with the items, their meals and the foods' nutrients
+    return _conditional_json(
+        request, [table_state(items, 'updated_at', 'meal__updated_at', 'food__updated_at')], build
+    )
 
 
 @login_required(login_url='health:login')
@@ -1060,11 +1061,7 @@ def meal_planning_view(request):
     - Shopping lists
     - Portion calculators based on weight
     """
-    # Get or create dog profile
-    profile, created = DogProfile.objects.get_or_create(
-        user=request.user,
-        defaults={'name': 'Bruno', 'weight_kg': 22}
-    )
+    profile = _current_dog(request)
 
     # Calculate daily food targets
     weight_kg = float(profile.weight_kg)
@@ -1185,10 +1182,11 @@ def records_view(request):
     and other medical documents. Records can be parsed by AI to
     extract lab values automatically.
     """
-    records = MedicalRecord.objects.filter(user=request.user).order_by('-date')
+    dog = _current_dog(request)
+    records = MedicalRecord.objects.for_dog(dog).filter(user=request.user).order_by('-date')
 
     # Get recent lab values with trends
-    recent_lab_values = LabValue.objects.filter(user=request.user).order_by('-date')[:50]
+    recent_lab_values = LabValue.objects.for_dog(dog).filter(user=request.user).order_by('-date')[:50]
 
     # Group lab values by test name for trend display
     lab_trends = {}
@@ -1221,6 +1219,7 @@ def records_view(request):
 @require_POST
 def upload_record(request):
     """Upload a medical record file."""
+    dog = _current_dog(request)
     record_type = request.POST.get('record_type')
     record_date = request.POST.get('date', date.today())
     title = request.POST.get('title', '')
@@ -1234,6 +1233,7 @@ def upload_record(request):
         return JsonResponse({'status': 'error', 'message': 'No file uploaded'}, status=400)
 
     record = MedicalRecord.objects.create(
+        dog=dog,
         user=request.user,
         date=record_date,
         record_type=record_type,
@@ -1255,7 +1255,8 @@ def upload_record(request):
 @login_required(login_url='health:login')
 def record_detail(request, record_id):
     """View a single medical record with its lab values."""
-    record = get_object_or_404(MedicalRecord, id=record_id, user=request.user)
+    dog = _current_dog(request)
+    record = get_object_or_404(MedicalRecord, id=record_id, user=request.user, dog=dog)
     lab_values = record.lab_values.all().order_by('test_name')
 
     context = {
@@ -1269,7 +1270,8 @@ def record_detail(request, record_id):
 @login_required(login_url='health:login')
 def edit_record(request, record_id):
     """Edit a medical record."""
-    record = get_object_or_404(MedicalRecord, id=record_id, user=request.user)
+    dog = _current_dog(request)
+    record = get_object_or_404(MedicalRecord, id=record_id, user=request.user, dog=dog)
 
     if request.method == 'POST':
         record.record_type = request.POST.get('record_type', record.record_type)
@@ -1298,7 +1300,8 @@ def edit_record(request, record_id):
 @require_POST
 def delete_record(request, record_id):
     """Delete a medical record."""
-    record = get_object_or_404(MedicalRecord, id=record_id, user=request.user)
+    dog = _current_dog(request)
+    record = get_object_or_404(MedicalRecord, id=record_id, user=request.user, dog=dog)
 
     # Delete the file from storage
     if record.file:
@@ -1315,12 +1318,13 @@ def delete_record(request, record_id):
 @login_required(login_url='health:login')
 def api_lab_values(request):
     """API endpoint for lab value trends over time."""
+    dog = _current_dog(request)
     test_name = request.GET.get('test')
     days = int(request.GET.get('days', 365))
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
 
-    lab_values = LabValue.objects.filter(
+    lab_values = LabValue.objects.for_dog(dog).filter(
         user=request.user,
         date__gte=start_date,
         date__lte=end_date
@@ -1329,26 +1333,29 @@ def api_lab_values(request):
     if test_name:
         lab_values = lab_values.filter(test_name=test_name)
 
-    # Group by test type
-    data = {}
-    for lv in lab_values:
-        test = lv.test_name
-        if test not in data:
-            data[test] = {
-                'labels': [],
-                'values': [],
-                'reference_low': None,
-                'reference_high': None,
-                'unit': lv.unit,
-            }
-        data[test]['labels'].append(lv.date.strftime('%Y-%m-%d'))
-        data[test]['values'].append(float(lv.value))
-        if lv.reference_low and not data[test]['reference_low']:
-            data[test]['reference_low'] = float(lv.reference_low)
-        if lv.reference_high and not data[test]['reference_high']:
-            data[test]['reference_high'] = float(lv.reference_high)
-
-    return JsonResponse(data)
+    def build():
+        # Group by test type
+        data = {}
+        for lv in lab_values:
+            test = lv.test_name
+            if test not in data:
+                data[test] = {
+                    'labels': [],
+                    'values': [],
+                    'reference_low': None,
+                    'reference_high': None,
+                    'unit': lv.unit,
+                }
+            data[test]['labels'].append(lv.date.strftime('%Y-%m-%d'))
+            data[test]['values'].append(float(lv.value))
+            if lv.reference_low and not data[test]['reference_low']:
+                data[test]['reference_low'] = float(lv.reference_low)
+            if lv.reference_high and not data[test]['reference_high']:
+                data[test]['reference_high'] = float(lv.reference_high)
+
+        return JsonResponse(data)
+
+    return _conditional_json(request, [table_state(lab_values)], build)
 
 
 # ============================================================================
@@ -1358,7 +1365,8 @@ def api_lab_values(request):
 @login_required(login_url='health:login')
 def timeline_view(request):
     """Timeline list view showing all entries in reverse chronological order."""
-    entries = TimelineEntry.objects.filter(user=request.user).order_by('-date', '-time')
+    dog = _current_dog(request)
+    entries = TimelineEntry.objects.for_dog(dog).filter(user=request.user).order_by('-date', '-time')
     providers = Provider.objects.all().order_by('name')
 
     context = {
@@ -1374,10 +1382,12 @@ def timeline_view(request):
 @login_required(login_url='health:login')
 def timeline_create(request):
     """Create a new timeline entry."""
+    dog = _current_dog(request)
     if request.method == 'POST':
         # Get status from form, but let model save() handle auto-detection
         status = request.POST.get('status', 'completed')
         entry = TimelineEntry.objects.create(
+            dog=dog,
             user=request.user,
             date=request.POST.get('date', date.today()),
             time=request.POST.get('time') or None,
@@ -1435,11 +1445,12 @@ def timeline_create(request):
 @login_required(login_url='health:login')
 def timeline_detail(request, entry_id):
     """View a single timeline entry with attachments."""
-    entry = get_object_or_404(TimelineEntry, id=entry_id, user=request.user)
+    dog = _current_dog(request)
+    entry = get_object_or_404(TimelineEntry, id=entry_id, user=request.user, dog=dog)
     attachments = entry.attachments.all()
 
     # Get all entries for navigation (ordered by date desc, time desc)
-    all_entries = list(TimelineEntry.objects.filter(user=request.user).order_by('-date', '-time').values_list('id', flat=True))
+    all_entries = list(TimelineEntry.objects.for_dog(dog).filter(user=request.user).order_by('-date', '-time').values_list('id', flat=True))
 
     # Find current position and get prev/next
     try:
@@ -1464,7 +1475,8 @@ def timeline_detail(request, entry_id):
 @login_required(login_url='health:login')
 def timeline_edit(request, entry_id):
     """Edit a timeline entry."""
-    entry = get_object_or_404(TimelineEntry, id=entry_id, user=request.user)
+    dog = _current_dog(request)
+    entry = get_object_or_404(TimelineEntry, id=entry_id, user=request.user, dog=dog)
 
     if request.method == 'POST':
         entry.date = request.POST.get('date', entry.date)
@@ -1516,7 +1528,8 @@ def timeline_edit(request, entry_id):
 @require_POST
 def timeline_delete(request, entry_id):
     """Delete a timeline entry and its attachments."""
-    entry = get_object_or_404(TimelineEntry, id=entry_id, user=request.user)
+    dog = _current_dog(request)
+    entry = get_object_or_404(TimelineEntry, id=entry_id, user=request.user, dog=dog)
 
     # Delete attachment files
     for attachment in entry.attachments.all():
@@ -1625,6 +1638,8 @@ def calendar_month_view(request, year=None, month=None):
     """Monthly calendar view showing timeline entries."""
     from calendar import monthrange
 
+    dog = _current_dog(request)
+
     today = date.today()
     year = int(year) if year else today.year
     month = int(month) if month else today.month
@@ -1642,7 +1657,7 @@ def calendar_month_view(request, year=None, month=None):
     calendar_end = last_day + timedelta(days=(6 - end_weekday))
 
     # Get entries for the visible range
-    entries = TimelineEntry.objects.filter(
+    entries = TimelineEntry.objects.for_dog(dog).filter(
         user=request.user,
         date__gte=calendar_start,
         date__lte=calendar_end
@@ -1699,6 +1714,7 @@ def calendar_month_view(request, year=None, month=None):
 @login_required(login_url='health:login')
 def calendar_week_view(request, year=None, week=None):
     """Weekly calendar view with more detail per day."""
+    dog = _current_dog(request)
     today = date.today()
 
     if year and week:
@@ -1711,7 +1727,7 @@ def calendar_week_view(request, year=None, week=None):
     last_day = first_day + timedelta(days=6)
 
     # Get entries for the week
-    entries = TimelineEntry.objects.filter(
+    entries = TimelineEntry.objects.for_dog(dog).filter(
         user=request.user,
         date__gte=first_day,
         date__lte=last_day
@@ -1767,6 +1783,7 @@ def calendar_week_view(request, year=None, week=None):
 @login_required(login_url='health:login')
 def api_calendar_entries(request):
     """API endpoint for calendar data (JSON)."""
+    dog = _current_dog(request)
     start_date = request.GET.get('start')
     end_date = request.GET.get('end')
 
@@ -1779,23 +1796,28 @@ def api_calendar_entries(request):
     except ValueError:
         return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
 
-    entries = TimelineEntry.objects.filter(
+    entries = TimelineEntry.objects.for_dog(dog).filter(
         user=request.user,
         date__gte=start,
         date__lte=end
     ).select_related('provider').order_by('date', 'time')
 
-    data = [{
-        'id': e.id,
-        'title': e.title,
-        'date': e.date.isoformat(),
-        'time': e.time.strftime('%H:%M') if e.time else None,
-        'entry_type': e.entry_type,
-        'entry_type_display': e.get_entry_type_display(),
-        'status': e.status,
-        'status_display': e.get_status_display(),
-        'provider': e.provider.name if e.provider else None,
-        'url': reverse('health:timeline_detail', args=[e.id]),
-    } for e in entries]
-
-    return JsonResponse({'entries': data})
+    def build():
+        data = [{
+            'id': e.id,
+            'title': e.title,
+            'date': e.date.isoformat(),
+            'time': e.time.strftime('%H:%M') if e.time else None,
+            'entry_type': e.entry_type,
+            'entry_type_display': e.get_entry_type_display(),
+            'status': e.status,
+            'status_display': e.get_status_display(),
+            'provider': e.provider.name if e.provider else None,
+            'url': reverse('health:timeline_detail', args=[e.id]),
+        } for e in entries]
+
+        return JsonResponse({'entries': data})
+
+    return _conditional_json(
+        request, [table_state(entries, 'updated_at', 'provider__updated_at')], build
+    )